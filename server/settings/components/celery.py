@@ -1,5 +1,6 @@
 import sys
 
+from celery.schedules import crontab
 from django.conf import settings
 
 from server.settings.components import config
@@ -17,4 +18,16 @@ CELERY = {
     'task_always_eager': settings.TESTING,  # type: ignore
     'worker_hijack_root_logger': False,
     'timezone': settings.TIME_ZONE,
+    'beat_schedule': {
+        # Сверка счетчиков друзей с запросами в друзья и дружбой.
+        'nova_friend.reconcile_friend_counters': {
+            'task': 'nova_friend.reconcile_friend_counters',
+            'schedule': crontab(hour=4, minute=0),
+        },
+        # Пересчет возможных друзей пользователей, у которых менялась дружба.
+        'nova_friend.refresh_friend_suggestions': {
+            'task': 'nova_friend.refresh_friend_suggestions',
+            'schedule': crontab(minute=30),
+        },
+    },
 }
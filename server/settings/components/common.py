@@ -159,6 +159,8 @@ MEDIA_ROOT = BASE_DIR.joinpath('media')
 # https://docs.djangoproject.com/en/2.2/topics/auth/
 
 AUTHENTICATION_BACKENDS = (
+    # Объектные права nova_friend (rules).
+    'rules.permissions.ObjectPermissionBackend',
     'django.contrib.auth.backends.ModelBackend',
 )
 
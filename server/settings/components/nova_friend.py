@@ -1,5 +1,4 @@
 """Настройки для создаваемой app."""
-from nova_friend.api.serializers import UpdateReferralCodeeSerializer
 from server.settings.components import config
 
 MAX_STRING_LENGTH = 255
@@ -8,3 +7,74 @@ BASE_USER_SERIALIZER = config(
     'NOVA_USER_DRIVER',
     default='nova_friend.api.serializers.referral_code.ReferralCodeSerializer',
 )
+
+# Размер LRU-кэша нормализации номеров телефонов.
+NOVA_FRIEND_PHONE_CACHE_SIZE = 10000
+
+# Отправка сигналов nova_friend: 'sync' - сразу в запросе, 'async' - задачей
+# Celery после фиксации транзакции.
+NOVA_FRIEND_SIGNAL_DISPATCH = config(
+    'NOVA_FRIEND_SIGNAL_DISPATCH',
+    default='sync',
+)
+
+# Объединять сигналы одного типа за окно в одну задачу Celery (например,
+# приглашения из разных запросов). Нужен кэш, общий для приложения и worker.
+NOVA_FRIEND_SIGNAL_COALESCE = config(
+    'NOVA_FRIEND_SIGNAL_COALESCE',
+    default=False,
+    cast=bool,
+)
+# Длительность окна объединения сигналов (секунды).
+NOVA_FRIEND_SIGNAL_COALESCE_WINDOW = 2
+
+# Время жизни кэша реферальных кодов (секунды) и кэша отсутствия кода.
+NOVA_FRIEND_REFERRAL_CODE_CACHE_TIMEOUT = 60 * 60
+NOVA_FRIEND_REFERRAL_CODE_NEGATIVE_CACHE_TIMEOUT = 60
+
+# Количество строк, которое выгрузка CSV/XLSX читает из БД за один раз.
+NOVA_FRIEND_EXPORT_CHUNK_SIZE = 2000
+
+# Время жизни кэша счетчиков друзей (секунды). Кэш сбрасывается при
+# изменении счетчиков.
+NOVA_FRIEND_COUNTERS_CACHE_TIMEOUT = 5 * 60
+
+# Количество возможных друзей, которое хранится для каждого пользователя.
+NOVA_FRIEND_SUGGESTIONS_LIMIT = 50
+
+# Память на блок произведений матриц смежности при пересчете общих друзей
+# через CSR (байты). Сама матрица занимает около 8 байт на ребро.
+NOVA_FRIEND_MUTUAL_FRIENDS_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Ключ HMAC-SHA256 хэшей контактов (индекс контактов), обязательный. Хэши
+# считают и клиенты, поэтому ключ попадает в клиентские сборки и должен
+# отличаться от SECRET_KEY. После смены ключа нужен запуск
+# backfill_contact_index.
+NOVA_FRIEND_CONTACT_HASH_KEY = config(
+    'NOVA_FRIEND_CONTACT_HASH_KEY',
+    default='',
+)
+
+# Максимальное количество хэшей в одном запросе поиска контактов.
+NOVA_FRIEND_CONTACT_LOOKUP_MAX_HASHES = 5000
+
+# Ограничения частоты создания запросов в друзья ('количество/период',
+# период s, m, h, d; None - без ограничения). Счетчики хранятся в кэше
+# Django, при превышении возвращается 429 с заголовком Retry-After.
+NOVA_FRIEND_THROTTLE_RATES = {
+    # Запросы одного пользователя.
+    'friend_request_user': '30/m',
+    # Запросы на один контакт от всех пользователей.
+    'friend_request_contact': '10/h',
+    # Ненайденные контакты (приглашения по SMS/e-mail) одного пользователя.
+    'friend_request_not_found_user': '20/h',
+    # Приглашения на один ненайденный контакт от всех пользователей.
+    'friend_request_not_found_contact': '3/d',
+    # Создание запросов по адресной книге одного пользователя.
+    'friend_request_bulk_user': '10/h',
+    # Проверка реферального кода с одного IP-адреса.
+    'referral_code_resolve': '30/m',
+    # Хэши контактов, проверенные одним пользователем (в хэшах, а не в
+    # запросах).
+    'contact_hash_lookup_user': '20000/d',
+}
@@ -117,7 +117,6 @@ NPLUSONE_LOGGER = logging.getLogger('django')
 NPLUSONE_LOG_LEVEL = logging.WARN
 NPLUSONE_WHITELIST = [
     {'model': 'admin.*'},
-    {'model': '*'},
 ]
 
 # django-test-migrations
@@ -1,19 +1,31 @@
+from nova_friend.api.serializers.contact_hash import ContactHashLookupSerializer
 from nova_friend.api.serializers.friend_request import (
+    BulkCreateFriendRequestSerializer,
+    BulkFriendRequestActionSerializer,
     CreateFriendRequestSerializer,
+    FriendRequestMutualFriendsSerializer,
     FriendRequestSerializer,
 )
+from nova_friend.api.serializers.friend_suggestion import (
+    FriendSuggestionSerializer,
+)
 from nova_friend.api.serializers.referral_code import (
-    CreateReferralCodeeSerializer,
+    CreateReferralCodeSerializer,
     ReferralCodeSerializer,
-    UpdateReferralCodeeSerializer,
+    UpdateReferralCodeSerializer,
 )
 from nova_friend.api.serializers.referral_invite import ReferralInviteSerializer
 
 __all__ = [
+    'ContactHashLookupSerializer',
+    'BulkCreateFriendRequestSerializer',
+    'BulkFriendRequestActionSerializer',
     'CreateFriendRequestSerializer',
+    'FriendRequestMutualFriendsSerializer',
     'FriendRequestSerializer',
+    'FriendSuggestionSerializer',
     'ReferralInviteSerializer',
-    'CreateReferralCodeeSerializer',
+    'CreateReferralCodeSerializer',
     'ReferralCodeSerializer',
-    'UpdateReferralCodeeSerializer',
+    'UpdateReferralCodeSerializer',
 ]
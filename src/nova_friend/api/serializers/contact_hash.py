@@ -0,0 +1,13 @@
+from rest_framework import serializers
+
+from nova_friend.services.contact_index import LOOKUP_MAX_HASHES
+
+
+class ContactHashLookupSerializer(serializers.Serializer):
+    """Сериализатор для поиска зарегистрированных хэшей контактов."""
+
+    hashes = serializers.ListField(
+        child=serializers.RegexField(r'^[0-9a-fA-F]{64}$'),
+        min_length=1,
+        max_length=LOOKUP_MAX_HASHES,
+    )
@@ -4,7 +4,7 @@ from rest_framework import serializers
 
 from nova_friend.models import FriendRequest
 from nova_friend.services.absolute_url import get_absolute_url_before_avatar
-from nova_friend.services.enums import FriendRequestMode
+from nova_friend.services.friend_request_mode import set_request_mode
 
 
 class CreateFriendRequestSerializer(serializers.ModelSerializer):
@@ -22,12 +22,49 @@ class CreateFriendRequestSerializer(serializers.ModelSerializer):
         }
 
 
+class BulkCreateFriendRequestSerializer(serializers.Serializer):
+    """Сериализатор для создания запросов в друзья по адресной книге."""
+
+    contacts = serializers.ListField(
+        child=serializers.CharField(max_length=100),  # noqa: WPS432
+        min_length=1,
+        max_length=2000,  # noqa: WPS432
+    )
+
+
+class BulkFriendRequestActionSerializer(serializers.Serializer):
+    """Сериализатор для массовых действий с запросами в друзья."""
+
+    tokens = serializers.ListField(
+        child=serializers.UUIDField(),
+        min_length=1,
+        max_length=1000,  # noqa: WPS432
+    )
+
+
+class AvatarUrlField(serializers.Field):
+    """Абсолютный url аватарки по пути к файлу или файлу поля avatar."""
+
+    def to_representation(self, avatar) -> Optional[str]:
+        """Url аватарки или None."""
+        return get_absolute_url_before_avatar(avatar)
+
+
 class FriendRequestSerializer(serializers.ModelSerializer):
-    """Сериализатор для запроса в друзья."""
+    """Сериализатор для запроса в друзья.
 
-    avatar = serializers.SerializerMethodField()
-    request_mode = serializers.SerializerMethodField()
-    contact_info = serializers.SerializerMethodField()
+    Строка выводится из плоских значений with_request_mode: тип запроса и
+    данные второго участника вычисляются в SQL. Для объекта, загруженного
+    без аннотаций, значения один раз вычисляются в to_representation.
+    """
+
+    avatar = AvatarUrlField(source='counterpart_avatar', read_only=True)
+    request_mode = serializers.CharField(read_only=True, allow_null=True)
+    contact_info = serializers.CharField(
+        source='counterpart_full_name',
+        read_only=True,
+        allow_null=True,
+    )
 
     class Meta(object):
         model = FriendRequest
@@ -38,43 +75,33 @@ class FriendRequestSerializer(serializers.ModelSerializer):
             'contact_info',
             'token',
         )
+        # Строки .values() (values_plan) уже содержат аннотации
+        # with_request_mode, to_representation для них не нужен.
+        values_compatible = True
+
+    def to_representation(self, friend_request: FriendRequest):
+        """Вычисление типа запроса, если его нет в аннотациях."""
+        if not hasattr(friend_request, 'request_mode'):
+            set_request_mode(friend_request, self.context['request'].user)
+        return super().to_representation(friend_request)
+
+
+class FriendRequestMutualFriendsSerializer(FriendRequestSerializer):
+    """Запрос в друзья с количеством общих друзей со вторым участником.
 
-    def get_request_mode(  # noqa: WPS615
-        self,
-        friend_request: FriendRequest,
-    ) -> Optional[FriendRequestMode]:
-        """Тип запроса: входящий-исходящий."""
-        user = self.context['request'].user
-        if friend_request.sending_user == user:
-            return FriendRequestMode.OUTCOMING
-        elif friend_request.receiving_user == user:
-            return FriendRequestMode.INCOMING
-        return None
-
-    def get_contact_info(  # noqa: WPS615
-        self,
-        friend_request: FriendRequest,
-    ) -> Optional[str]:
-        """Получение информации о пользователе исходя из типа запроса."""
-        request_mode = self.get_request_mode(friend_request)
-        if request_mode == FriendRequestMode.INCOMING:
-            return friend_request.sending_user.full_name
-        elif request_mode == FriendRequestMode.OUTCOMING:
-            return friend_request.receiving_user.full_name
-        return None
-
-    def get_avatar(  # noqa: WPS615
-        self,
-        friend_request: FriendRequest,
-    ) -> Optional[str]:
-        """Получение аватарки исходя из типа запроса."""
-        request_mode = self.get_request_mode(friend_request)
-        if request_mode == FriendRequestMode.OUTCOMING:
-            return get_absolute_url_before_avatar(
-                friend_request.receiving_user.avatar,
-            )
-        elif request_mode == FriendRequestMode.INCOMING:
-            return get_absolute_url_before_avatar(
-                friend_request.sending_user.avatar,
-            )
-        return None
+    Значение добавляется view сразу для всей страницы
+    (FriendRequestViewSet.extend_page), для запроса без второго участника
+    (приглашение по контакту) - None.
+    """
+
+    mutual_friends_count = serializers.IntegerField(
+        read_only=True,
+        allow_null=True,
+    )
+
+    class Meta(FriendRequestSerializer.Meta):
+        fields = (
+            *FriendRequestSerializer.Meta.fields,
+            'mutual_friends_count',
+        )
+        values_extra = ('mutual_friends_count',)
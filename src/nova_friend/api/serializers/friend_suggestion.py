@@ -0,0 +1,18 @@
+from rest_framework import serializers
+
+from nova_friend.models import FriendSuggestion
+from nova_friend.services.base_user_serializer import BaseUserSerializer
+
+
+class FriendSuggestionSerializer(serializers.ModelSerializer):
+    """Сериализатор для просмотра возможных друзей."""
+
+    suggested_user = BaseUserSerializer()
+
+    class Meta(object):
+        model = FriendSuggestion
+        fields = (
+            'id',
+            'suggested_user',
+            'mutual_friends_count',
+        )
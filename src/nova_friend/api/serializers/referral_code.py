@@ -4,10 +4,34 @@ from nova_friend.models import ReferralCode
 from nova_friend.services.base_user_serializer import BaseUserSerializer
 
 
+class InviteCountField(serializers.IntegerField):
+    """Количество приглашений по коду, 0 - если статистики еще нет."""
+
+    def get_attribute(self, instance):
+        """Значение счетчика или 0."""
+        return super().get_attribute(instance) or 0
+
+    def values_representation(self, invite_count):
+        """Значение из строки .values() (values_plan)."""
+        return self.to_representation(invite_count or 0)
+
+
 class ReferralCodeSerializer(serializers.ModelSerializer):
-    """Сериализатор реферального кода."""
+    """Сериализатор реферального кода.
+
+    invite_count и last_invite_at берутся из ReferralStats, которая
+    загружается через select_related (queryset_for_serializer).
+    """
 
     user = BaseUserSerializer()
+    invite_count = InviteCountField(
+        source='referral_stats.invite_count',
+        read_only=True,
+    )
+    last_invite_at = serializers.DateTimeField(
+        source='referral_stats.last_invite_at',
+        read_only=True,
+    )
 
     class Meta(object):
         model = ReferralCode
@@ -16,6 +40,8 @@ class ReferralCodeSerializer(serializers.ModelSerializer):
             'user',
             'code',
             'note',
+            'invite_count',
+            'last_invite_at',
         )
 
 
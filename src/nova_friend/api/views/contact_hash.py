@@ -0,0 +1,76 @@
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
+from rules.contrib.rest_framework import AutoPermissionViewSetMixin
+
+from nova_friend.api.serializers import ContactHashLookupSerializer
+from nova_friend.models import ContactHash
+from nova_friend.services.contact_index import registered_contact_hashes
+from nova_friend.services.throttling import ContactHashLookupThrottle
+
+
+class ContactHashViewSet(AutoPermissionViewSetMixin, GenericViewSet):
+    """Поиск пользователей по хэшам контактов адресной книги.
+
+    Дополнительные методы:
+
+    1) POST api/friends/contact-hash/lookup - какие из хэшей контактов
+    принадлежат зарегистрированным пользователям.
+    Доступно: всем авторизованным.
+    """
+
+    queryset = ContactHash.objects.none()
+    serializer_class = ContactHashLookupSerializer
+    permission_type_map = {
+        **AutoPermissionViewSetMixin.permission_type_map,
+        'lookup': 'list',
+        'metadata': None,
+    }
+
+    @action(
+        methods=['POST'],
+        url_path='lookup',
+        detail=False,
+        throttle_classes=(ContactHashLookupThrottle,),
+    )  # type: ignore
+    def lookup(self, request: Request) -> Response:
+        """Зарегистрированные хэши контактов.
+
+        Формирование url: автоматическое формирование.
+
+        Данные на вход: hashes - список HMAC-SHA256 (hex) нормализованных
+        контактов: email в нижнем регистре, телефон в E.164. Ключ HMAC -
+        NOVA_FRIEND_CONTACT_HASH_KEY.
+
+        Успех:
+        Тело - results: список hash найденных контактов. Хэш, который не
+        принадлежит ни одному пользователю, в ответ не входит. Id
+        пользователей не возвращаются: запрос в друзья отправляется по
+        контакту.
+        Статус - HTTP_200_OK
+
+        Ошибки: стандартные ошибки валидации.
+        Превышен лимит хэшей пользователя (contact_hash_lookup_user) -
+        HTTP_429_TOO_MANY_REQUESTS.
+
+        Общее описание: клиент проверяет адресную книгу, не передавая сами
+        контакты. Все хэши ищутся одним запросом по индексу. Лимит
+        считается в хэшах, что ограничивает перебор номеров.
+
+        Доступно: всем авторизованным.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            data={
+                'results': [
+                    {'hash': digest}
+                    for digest in registered_contact_hashes(
+                        serializer.validated_data['hashes'],
+                    )
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -1,80 +1,104 @@
 import uuid
 
 import django_filters
-from django.db import models
 from django.utils.translation import gettext_lazy as _
-from rest_framework import status
+from rest_framework import serializers, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.request import Request
 from rest_framework.response import Response
 
 from nova_friend.api.serializers import (
+    BulkCreateFriendRequestSerializer,
+    BulkFriendRequestActionSerializer,
     CreateFriendRequestSerializer,
+    FriendRequestMutualFriendsSerializer,
     FriendRequestSerializer,
 )
 from nova_friend.models import FriendRequest
+from nova_friend.permissions.friend_request import view_friend_request_filter
 from nova_friend.services.action_friend_request import (
-    confirm_friend_request,
+    bulk_friend_request_action,
+    delete_friend_request,
     friend_request_action,
 )
+from nova_friend.services.bulk_create_friend_request import (
+    bulk_create_friend_requests,
+)
 from nova_friend.services.create_friend_request import create_friend_request
-from nova_friend.services.enums import FriendRequestAction, FriendRequestStatus
+from nova_friend.services.enums import FriendRequestStatus
+from nova_friend.services.filters import MultipleValueFilter
+from nova_friend.services.friend_counters import friend_counters
+from nova_friend.services.friend_request_mode import with_request_mode
+from nova_friend.services.friendship import mutual_friends_counts
+from nova_friend.services.pagination import OptionalKeysetPagination
+from nova_friend.services.throttling import (
+    FriendRequestBulkThrottle,
+    FriendRequestContactThrottle,
+    FriendRequestNotFoundThrottle,
+    FriendRequestUserThrottle,
+)
+from nova_friend.services.views import ExportMixin
 from nova_friend.services.viewsets import BaseRetrieveListCreateDestroyViewSet
 
 
+# Параметр списка, включающий mutual_friends_count.
+MUTUAL_FRIENDS_PARAM = 'mutual_friends'
+
+
 class FriendRequestFilter(django_filters.FilterSet):
     """Фильтр для FriendRequest."""
 
-    sending_user_email = django_filters.AllValuesMultipleFilter(
+    sending_user_email = MultipleValueFilter(
         field_name='sending_user__email',
         label=_(
             'Множественный поиск по email пользователя, ' +
             'запрашивающий добавление в друзья.',
         ),
     )
-    sending_user_username = django_filters.AllValuesMultipleFilter(
+    sending_user_username = MultipleValueFilter(
         field_name='sending_user__username',
         label=_(
             'Множественный поиск по никнейму пользователя, ' +
             'запрашивающий добавление в друзья.',
         ),
     )
-    sending_user_first_name = django_filters.AllValuesMultipleFilter(
-        field_name='sending_user__first_name ',
+    sending_user_first_name = MultipleValueFilter(
+        field_name='sending_user__first_name',
         label=_(
             'Множественный поиск по имени пользователя, ' +
             'запрашивающий добавление в друзья.',
         ),
     )
-    sending_user_last_name = django_filters.AllValuesMultipleFilter(
+    sending_user_last_name = MultipleValueFilter(
         field_name='sending_user__last_name',
         label=_(
             'Множественный поиск по фамилии пользователя, ' +
             'запрашивающий добавление в друзья.',
         ),
     )
-    receiving_user_email = django_filters.AllValuesMultipleFilter(
+    receiving_user_email = MultipleValueFilter(
         field_name='receiving_user__email',
         label=_(
             'Множественный поиск по email пользователя, ' +
             'которого добавляют в друзья.',
         ),
     )
-    receiving_user_username = django_filters.AllValuesMultipleFilter(
+    receiving_user_username = MultipleValueFilter(
         field_name='receiving_user__username',
         label=_(
             'Множественный поиск по никнейму пользователя, ' +
             'которого добавляют в друзья.',
         ),
     )
-    receiving_user_first_name = django_filters.AllValuesMultipleFilter(
-        field_name='receiving_user__first_name ',
+    receiving_user_first_name = MultipleValueFilter(
+        field_name='receiving_user__first_name',
         label=_(
             'Множественный поиск по имени пользователя, ' +
             'которого добавляют в друзья.',
         ),
     )
-    receiving_user_last_name = django_filters.AllValuesMultipleFilter(
+    receiving_user_last_name = MultipleValueFilter(
         field_name='receiving_user__last_name',
         label=_(
             'Множественный поиск по фамилии пользователя, ' +
@@ -104,12 +128,17 @@ class FriendRequestFilter(django_filters.FilterSet):
         )
 
 
-class FriendRequestViewSet(BaseRetrieveListCreateDestroyViewSet):
+class FriendRequestViewSet(ExportMixin, BaseRetrieveListCreateDestroyViewSet):
     """Запросы в друзья. Просмотр/создание.
 
     Стандартные методы:
 
     1) GET api/friends/friend-request - получение списка запросов в друзья.
+    Пагинация limit/offset с count. С параметром ?pagination=keyset -
+    keyset: ссылки next/previous содержат курсор, count не возвращается.
+    С параметром ?mutual_friends=true у каждого запроса есть
+    mutual_friends_count - количество общих друзей со вторым участником,
+    считается одним запросом на страницу.
     Доступно: всем авторизованным.
 
     2) GET api/friends/friend-request/<token> - получение конкретного запроса
@@ -117,6 +146,9 @@ class FriendRequestViewSet(BaseRetrieveListCreateDestroyViewSet):
     Доступно: суперпользователю, отправителю и получателю запроса.
 
     3) POST api/friends/friend-request - создание запроса в друзья.
+    Частота ограничена по пользователю, по контакту и отдельно по
+    ненайденным контактам (приглашениям), см. NOVA_FRIEND_THROTTLE_RATES.
+    При превышении - HTTP_429_TOO_MANY_REQUESTS с заголовком Retry-After.
     Доступно: всем авторизованным.
 
     4) DELETE api/friends/friend-request/<token> - удаление запроса в друзья.
@@ -129,12 +161,19 @@ class FriendRequestViewSet(BaseRetrieveListCreateDestroyViewSet):
     друзья (доступно суперпользователю и тому, кому отправлен запрос).
     - DELETE api/accounts/friend-request/<token>/cancel - удаление запроса в
     друзья (доступно суперпользователю и тому, кто отправлен запрос).
+    - POST api/accounts/friend-request/bulk-create - создание запросов в
+    друзья по списку контактов (адресной книге).
+    - POST api/accounts/friend-request/bulk-confirm, bulk-reject, bulk-cancel -
+    массовые действия с запросами в друзья по списку token.
+    - GET api/accounts/friend-request/counters - счетчики ожидающих
+    запросов и друзей текущего пользователя.
+    - GET api/accounts/friend-request/export-csv, export-xlsx - выгрузка
+    запросов в друзья с учетом фильтров в CSV или XLSX (потоковый ответ).
     """
 
-    queryset = FriendRequest.objects.select_related(
-        'sending__user',
-        'receiving_user',
-    )
+    # Столбцы FriendRequest нужны проверке прав, данные пользователей
+    # добавляются аннотациями with_request_mode в get_queryset.
+    queryset = FriendRequest.objects.defer('message')
     serializer_class = FriendRequestSerializer
     create_serializer_class = CreateFriendRequestSerializer
     ordering_fields = '__all__'
@@ -149,13 +188,44 @@ class FriendRequestViewSet(BaseRetrieveListCreateDestroyViewSet):
         'receiving_user__last_name',
     )
     filterset_class = FriendRequestFilter
+    pagination_class = OptionalKeysetPagination
     permission_type_map = {
         **BaseRetrieveListCreateDestroyViewSet.permission_type_map,
-        'confirm': 'confirm',
-        'reject': 'reject',
-        'cancel': 'cancel',
+        # Права проверяются условием в SQL, см. _transition.
+        'confirm': None,
+        'reject': None,
+        'cancel': None,
+        'bulk_create': 'add',
+        # Права на каждый запрос проверяются условием в SQL.
+        'bulk_confirm': 'list',
+        'bulk_reject': 'list',
+        'bulk_cancel': 'list',
+        'export_csv': 'list',
+        'export_xlsx': 'list',
+        'counters': 'list',
     }
+    export_fields = (
+        'id',
+        'token',
+        'status',
+        'contact',
+        'created_at',
+        'updated_at',
+        'sending_user',
+        'sending_user__email',
+        'receiving_user',
+        'receiving_user__email',
+    )
+    export_filename = 'friend_requests'
     lookup_field = 'token'
+    throttle_classes_by_action = {
+        'create': (
+            FriendRequestUserThrottle,
+            FriendRequestContactThrottle,
+            FriendRequestNotFoundThrottle,
+        ),
+        'bulk_create': (FriendRequestBulkThrottle,),
+    }
 
     def get_queryset(self):  # noqa: WPS615
         """Фильтруем выдачу запросов в друзья.
@@ -164,28 +234,112 @@ class FriendRequestViewSet(BaseRetrieveListCreateDestroyViewSet):
         Пользователь видит те запросы в друзья, где он отправитель или
         получатель.
         Остальные ничего не видят.
+        Условие - фильтр права view_friendrequest, проверяется в SQL.
+        Тип запроса и данные второго участника вычисляются в SQL.
         """
-        queryset = super().get_queryset()
-        user = self.request.user
-
         if getattr(self, "swagger_fake_view", False):
             return FriendRequest.objects.none()
 
-        if user.is_superuser:
-            return queryset
-
-        return queryset.filter(
-            models.Q(sending_user=user) |
-            models.Q(receiving_user=user)
+        user = self.request.user
+        return with_request_mode(
+            super().get_queryset().filter(view_friend_request_filter(user)),
+            user,
         )
 
+    def _with_mutual_friends(self) -> bool:
+        """Нужно ли количество общих друзей (?mutual_friends=true)."""
+        return self.action == 'list' and self.request.query_params.get(
+            MUTUAL_FRIENDS_PARAM,
+        ) in serializers.BooleanField.TRUE_VALUES
+
+    def get_serializer_class(self):
+        """Сериализатор списка с количеством общих друзей."""
+        if self._with_mutual_friends():
+            return FriendRequestMutualFriendsSerializer
+        return super().get_serializer_class()
+
+    def get_page_lookups(self):
+        """Id второго участника для подсчета общих друзей."""
+        if self._with_mutual_friends():
+            return ('counterpart_id',)
+        return ()
+
+    def extend_page(self, rows) -> None:
+        """Количество общих друзей одним запросом на страницу."""
+        if not self._with_mutual_friends():
+            return
+        counterpart_ids = {
+            row['counterpart_id']
+            for row in rows
+            if row['counterpart_id'] is not None
+        }
+        counts = mutual_friends_counts(
+            self.request.user.id,
+            counterpart_ids,
+        ) if counterpart_ids else {}
+        for row in rows:
+            counterpart_id = row['counterpart_id']
+            row['mutual_friends_count'] = None if counterpart_id is None else (
+                counts.get(counterpart_id, 0)
+            )
+
+    def get_throttles(self):
+        """Общие ограничения частоты (throttle_classes) и ограничения action."""
+        return [
+            *super().get_throttles(),
+            *(
+                throttle()
+                for throttle in self.throttle_classes_by_action.get(
+                    self.action,
+                    (),
+                )
+            ),
+        ]
+
     def perform_create(self, serializer):
-        """Создание запроса в друзья."""
-        serializer.instance = create_friend_request(
-            validated_data=serializer.validated_data,
-            sending_user=self.request.user,
-            locale=self.request.LANGUAGE_CODE,
-        )
+        """Создание запроса в друзья.
+
+        Ненайденный контакт (отправлено приглашение) учитывается в лимите
+        FriendRequestNotFoundThrottle.
+        """
+        try:
+            serializer.instance = create_friend_request(
+                validated_data=serializer.validated_data,
+                sending_user=self.request.user,
+                locale=self.request.LANGUAGE_CODE,
+            )
+        except NotFound:
+            FriendRequestNotFoundThrottle().record(self.request, self)
+            raise
+
+    def perform_destroy(self, instance: FriendRequest) -> None:
+        """Удаление запроса в друзья."""
+        delete_friend_request(instance)
+
+    def _transition(
+        self,
+        token: uuid.UUID,
+        friend_request_status: str,
+        perm_type: str,
+    ) -> None:
+        """Смена статуса запроса одним запросом к БД с проверкой прав.
+
+        Запрос в друзья загружается только при неудаче, чтобы ответить
+        так же, как проверка прав AutoPermissionViewSetMixin: 404 для
+        недоступного запроса, 403, если действие с ним запрещено.
+        """
+        try:
+            friend_request_action(
+                status=friend_request_status,
+                token=token,
+                user=self.request.user,
+            )
+        except NotFound:
+            friend_request = self.get_object()
+            perm = FriendRequest.get_perm(perm_type)
+            if not self.request.user.has_perm(perm, friend_request):
+                self.permission_denied(self.request)
+            raise
 
     @action(
         methods=['POST'],
@@ -218,10 +372,7 @@ class FriendRequestViewSet(BaseRetrieveListCreateDestroyViewSet):
         Доступно: суперпользователю и пользователю, которому был отправлен
         запрос в друзья (получателю).
         """
-        friend_request_action(
-            status=FriendRequestStatus.CONFIRMED,
-            token=token,
-        )
+        self._transition(token, FriendRequestStatus.CONFIRMED, 'confirm')
         return Response(status=status.HTTP_200_OK)
 
     @action(
@@ -255,10 +406,7 @@ class FriendRequestViewSet(BaseRetrieveListCreateDestroyViewSet):
         Доступно: суперпользователю и пользователю, которому отправили запрос
         (получателю). Запрос должен иметь статус (FriendRequestStatus.PENDING).
         """
-        friend_request_action(
-            status=FriendRequestStatus.REJECTED,
-            token=token,
-        )
+        self._transition(token, FriendRequestStatus.REJECTED, 'reject')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -292,8 +440,175 @@ class FriendRequestViewSet(BaseRetrieveListCreateDestroyViewSet):
         Доступно: суперпользователю и пользователю, который создал запрос
         (отправитель). Запрос должен иметь статус (FriendRequestStatus.PENDING).
         """
-        friend_request_action(
-            status=FriendRequestStatus.CANCELED,
-            token=token,
-        )
+        self._transition(token, FriendRequestStatus.CANCELED, 'cancel')
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(
+        methods=['POST'],
+        url_path='bulk-create',
+        detail=False,
+        serializer_class=BulkCreateFriendRequestSerializer,
+    )  # type: ignore
+    def bulk_create(self, request: Request) -> Response:
+        """Создание запросов в друзья по адресной книге.
+
+        Формирование url: автоматическое формирование.
+
+        Данные на вход: contacts - список email и номеров телефонов
+        (до 2000).
+
+        Успех:
+        Тело - results: список {contact, result, token} в порядке contacts.
+        result: created, already_friends, pending, not_found, invalid, self.
+        token заполнен только для созданных запросов.
+        Статус - HTTP_201_CREATED
+
+        Ошибки: стандартные ошибки валидации.
+
+        Общее описание: контакты нормализуются, пользователи, дружба и
+        существующие запросы ищутся пачкой, новые запросы создаются одной
+        вставкой. Приглашения ненайденным пользователям не отправляются.
+        Частота ограничена по пользователю (friend_request_bulk_user).
+
+        Доступно: всем авторизованным.
+        """
+        serializer = BulkCreateFriendRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_create_friend_requests(
+            contacts=serializer.validated_data['contacts'],
+            sending_user=request.user,
+            locale=request.LANGUAGE_CODE,
+        )
+        return Response(
+            data={'results': results},
+            status=status.HTTP_201_CREATED,
+        )
+
+    def _bulk_action(
+        self,
+        request: Request,
+        friend_request_status: str,
+    ) -> Response:
+        """Массовое действие с запросами в друзья."""
+        serializer = BulkFriendRequestActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_friend_request_action(
+            tokens=serializer.validated_data['tokens'],
+            status=friend_request_status,
+            user=request.user,
+        )
+        return Response(data={'results': results}, status=status.HTTP_200_OK)
+
+    @action(
+        methods=['POST'],
+        url_path='bulk-confirm',
+        detail=False,
+        serializer_class=BulkFriendRequestActionSerializer,
+    )  # type: ignore
+    def bulk_confirm(self, request: Request) -> Response:
+        """Массовое подтверждение запросов в друзья.
+
+        Формирование url: автоматическое формирование.
+
+        Данные на вход: tokens - список token запросов в друзья (до 1000).
+
+        Успех:
+        Тело - results: список {token, success} для каждого переданного
+        token. success=False, если запрос не найден, уже обработан или
+        пользователь не является его получателем.
+        Статус - HTTP_200_OK
+
+        Ошибки: стандартные ошибки валидации.
+
+        Общее описание: все подходящие запросы подтверждаются одним запросом
+        к БД. Отправляется один сигнал friend_request_bulk_action.
+
+        Доступно: суперпользователю и получателю запросов.
+        """
+        return self._bulk_action(request, FriendRequestStatus.CONFIRMED)
+
+    @action(
+        methods=['POST'],
+        url_path='bulk-reject',
+        detail=False,
+        serializer_class=BulkFriendRequestActionSerializer,
+    )  # type: ignore
+    def bulk_reject(self, request: Request) -> Response:
+        """Массовый отказ от запросов в друзья.
+
+        Формирование url: автоматическое формирование.
+
+        Данные на вход: tokens - список token запросов в друзья (до 1000).
+
+        Успех:
+        Тело - results: список {token, success} для каждого переданного
+        token. success=False, если запрос не найден, уже обработан или
+        пользователь не является его получателем.
+        Статус - HTTP_200_OK
+
+        Ошибки: стандартные ошибки валидации.
+
+        Общее описание: все подходящие запросы удаляются одним запросом
+        к БД. Отправляется один сигнал friend_request_bulk_action.
+
+        Доступно: суперпользователю и получателю запросов.
+        """
+        return self._bulk_action(request, FriendRequestStatus.REJECTED)
+
+    @action(
+        methods=['POST'],
+        url_path='bulk-cancel',
+        detail=False,
+        serializer_class=BulkFriendRequestActionSerializer,
+    )  # type: ignore
+    def bulk_cancel(self, request: Request) -> Response:
+        """Массовая отмена своих запросов в друзья.
+
+        Формирование url: автоматическое формирование.
+
+        Данные на вход: tokens - список token запросов в друзья (до 1000).
+
+        Успех:
+        Тело - results: список {token, success} для каждого переданного
+        token. success=False, если запрос не найден, уже обработан или
+        пользователь не является его отправителем.
+        Статус - HTTP_200_OK
+
+        Ошибки: стандартные ошибки валидации.
+
+        Общее описание: все подходящие запросы удаляются одним запросом
+        к БД. Отправляется один сигнал friend_request_bulk_action.
+
+        Доступно: суперпользователю и отправителю запросов.
+        """
+        return self._bulk_action(request, FriendRequestStatus.CANCELED)
+
+    @action(
+        methods=['GET'],
+        url_path='counters',
+        detail=False,
+    )  # type: ignore
+    def counters(self, request: Request) -> Response:
+        """Счетчики запросов в друзья и друзей текущего пользователя.
+
+        Формирование url: автоматическое формирование.
+
+        Данные на вход: отсутствуют.
+
+        Успех:
+        Тело - pending_incoming (ожидающие входящие запросы),
+        pending_outgoing (ожидающие исходящие запросы), friends (друзья).
+        Статус - HTTP_200_OK
+
+        Ошибки: специфические ошибки отсутствуют.
+
+        Общее описание: используется для бейджа в клиентах. Счетчики
+        хранятся в одной записи пользователя и берутся из кэша, при промахе
+        выполняется одно чтение по первичному ключу.
+
+        Доступно: всем авторизованным.
+        """
+        return Response(
+            data=friend_counters(request.user.id),
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,44 @@
+from nova_friend.api.serializers import FriendSuggestionSerializer
+from nova_friend.models import FriendSuggestion
+from nova_friend.services.friend_suggestions import suggestions_for
+from nova_friend.services.pagination import KeysetPagination
+from nova_friend.services.serializer_queryset import queryset_for_serializer
+from nova_friend.services.viewsets import BaseReadOnlyViewSet
+
+
+class FriendSuggestionViewSet(BaseReadOnlyViewSet):
+    """Возможные друзья. Просмотр.
+
+    Стандартные методы:
+
+    1) GET api/friends/friend-suggestion - получение списка возможных
+    друзей в порядке убывания числа общих друзей.
+    Пагинация keyset: ссылки next/previous содержат курсор, count не
+    возвращается.
+    Доступно: всем авторизованным, каждый видит своих возможных друзей.
+
+    2) GET api/friends/friend-suggestion/id - получение конкретного
+    возможного друга.
+    Доступно: суперпользователю и пользователю, которому он предложен.
+
+    Кандидаты пересчитываются задачей nova_friend.refresh_friend_suggestions,
+    кандидаты, с которыми уже есть дружба или ожидающий запрос в друзья,
+    не выводятся.
+    """
+
+    serializer_class = FriendSuggestionSerializer
+    # Кандидаты пользователя записываются пересчетом в порядке убывания
+    # числа общих друзей, поэтому порядок id - порядок рейтинга.
+    ordering = ('id',)
+    ordering_fields = ('id',)
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):  # noqa: WPS615
+        """Возможные друзья текущего пользователя."""
+        if getattr(self, 'swagger_fake_view', False):
+            return FriendSuggestion.objects.none()
+
+        return queryset_for_serializer(
+            suggestions_for(self.request.user),
+            self.get_serializer_class(),
+        )
@@ -1,5 +1,11 @@
 import django_filters
 from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import AllowAny
+from rest_framework.request import Request
+from rest_framework.response import Response
 
 from nova_friend.api.serializers import (
     ReferralCodeSerializer,
@@ -11,34 +17,41 @@ from nova_friend.api.serializers.referral_code import (
 )
 from nova_friend.models import ReferralCode
 from nova_friend.services.create_referral_code import create_referral_code
+from nova_friend.services.filters import MultipleValueFilter
+from nova_friend.services.resolve_referral_code import (
+    normalize_referral_code,
+    resolve_referral_code,
+)
+from nova_friend.services.serializer_queryset import queryset_for_serializer
+from nova_friend.services.throttling import ReferralCodeResolveThrottle
 from nova_friend.services.viewsets import BaseRetrieveListCreateUpdateViewSet
 
 
 class ReferralCodeFilter(django_filters.FilterSet):
     """Фильтр для ReferralCode."""
 
-    user_email = django_filters.AllValuesMultipleFilter(
+    user_email = MultipleValueFilter(
         field_name='user__email',
         label=_(
             'Множественный поиск по email пользователя, ' +
             'который владеет реферальным кодом.',
         ),
     )
-    user_username = django_filters.AllValuesMultipleFilter(
+    user_username = MultipleValueFilter(
         field_name='user__username',
         label=_(
             'Множественный поиск по никнейму пользователя, ' +
             'который владеет реферальным кодом.',
         ),
     )
-    user_first_name = django_filters.AllValuesMultipleFilter(
-        field_name='user__first_name ',
+    user_first_name = MultipleValueFilter(
+        field_name='user__first_name',
         label=_(
             'Множественный поиск по имени пользователя, ' +
             'который владеет реферальным кодом.',
         ),
     )
-    user_last_name = django_filters.AllValuesMultipleFilter(
+    user_last_name = MultipleValueFilter(
         field_name='user__last_name',
         label=_(
             'Множественный поиск по фамилии пользователя, ' +
@@ -76,9 +89,18 @@ class ReferralCodeViewSet(BaseRetrieveListCreateUpdateViewSet):
     4) DELETE api/friends/referral-code/<id> - не доступен.
 
     5) PATCH, PUT api/friends/referral-code/<id> - изменение реферального кода.
+
+    Дополнительные методы:
+
+    1) GET api/friends/referral-code/resolve?code=<code> - владелец
+    реферального кода.
+    Доступно: всем.
     """
 
-    queryset = ReferralCode.objects.select_related('user')
+    queryset = queryset_for_serializer(
+        ReferralCode.objects.all(),
+        ReferralCodeSerializer,
+    )
     serializer_class = ReferralCodeSerializer
     create_serializer_class = CreateReferralCodeSerializer
     update_serializer_class = UpdateReferralCodeSerializer
@@ -92,6 +114,10 @@ class ReferralCodeViewSet(BaseRetrieveListCreateUpdateViewSet):
         'note',
     )
     filterset_class = ReferralCodeFilter
+    permission_type_map = {
+        **BaseRetrieveListCreateUpdateViewSet.permission_type_map,
+        'resolve': None,
+    }
 
     def get_queryset(self):  # noqa: WPS615
         """Фильтруем выдачу запросов в друзья.
@@ -117,3 +143,37 @@ class ReferralCodeViewSet(BaseRetrieveListCreateUpdateViewSet):
         serializer.instance = create_referral_code(
             validated_data=serializer.validated_data
         )
+
+    @action(
+        methods=['GET'],
+        url_path='resolve',
+        detail=False,
+        permission_classes=(AllowAny,),
+        throttle_classes=(ReferralCodeResolveThrottle,),
+    )  # type: ignore
+    def resolve(self, request: Request) -> Response:
+        """Проверить реферальный код.
+
+        Формирование url: автоматическое формирование
+
+        Данные на вход: query-параметр code.
+
+        Успех:
+        Тело - code, нормализованный код.
+        Статус - HTTP_200_OK
+
+        Ошибки:
+        Код не найден - HTTP_404_NOT_FOUND.
+        Превышен лимит запросов с IP-адреса - HTTP_429_TOO_MANY_REQUESTS.
+
+        Общее описание: используется на странице перехода по реферальному
+        коду и при регистрации. Результат берется из кэша, запросы к БД
+        выполняются только при промахе кэша. Владелец кода в ответ не
+        попадает.
+
+        Доступно: всем.
+        """
+        code = normalize_referral_code(request.query_params.get('code', ''))
+        if code is None or resolve_referral_code(code) is None:
+            raise NotFound(_('Реферальный код не найден.'))
+        return Response(data={'code': code}, status=status.HTTP_200_OK)
@@ -7,69 +7,73 @@ from rest_framework.response import Response
 
 from nova_friend.api.serializers import ReferralInviteSerializer
 from nova_friend.models import ReferralInvite
+from nova_friend.services.filters import MultipleValueFilter
+from nova_friend.services.pagination import OptionalKeysetPagination
+from nova_friend.services.serializer_queryset import queryset_for_serializer
+from nova_friend.services.views import ExportMixin
 from nova_friend.services.viewsets import BaseReadOnlyViewSet
 
 
 class ReferralInviteFilter(django_filters.FilterSet):
     """Фильтр для ReferralInvite."""
 
-    referral_user_email = django_filters.AllValuesMultipleFilter(
+    referral_user_email = MultipleValueFilter(
         field_name='referral_user__email',
         label=_(
             'Множественный поиск по email пользователя, ' +
             'который пригласил.',
         ),
     )
-    referral_user_username = django_filters.AllValuesMultipleFilter(
+    referral_user_username = MultipleValueFilter(
         field_name='referral_user__username',
         label=_(
             'Множественный поиск по никнейму пользователя, ' +
             'который пригласил.',
         ),
     )
-    referral_user_first_name = django_filters.AllValuesMultipleFilter(
-        field_name='referral_user__first_name ',
+    referral_user_first_name = MultipleValueFilter(
+        field_name='referral_user__first_name',
         label=_(
             'Множественный поиск по имени пользователя, ' +
             'который пригласил.',
         ),
     )
-    referral_user_last_name = django_filters.AllValuesMultipleFilter(
+    referral_user_last_name = MultipleValueFilter(
         field_name='referral_user__last_name',
         label=_(
             'Множественный поиск по фамилии пользователя, ' +
             'который пригласил.',
         ),
     )
-    invited_user_email = django_filters.AllValuesMultipleFilter(
+    invited_user_email = MultipleValueFilter(
         field_name='invited_user__email',
         label=_(
             'Множественный поиск по email пользователя, ' +
             'который был приглашен.',
         ),
     )
-    invited_user_username = django_filters.AllValuesMultipleFilter(
+    invited_user_username = MultipleValueFilter(
         field_name='invited_user__username',
         label=_(
             'Множественный поиск по никнейму пользователя, ' +
             'который был приглашен.',
         ),
     )
-    invited_user_first_name = django_filters.AllValuesMultipleFilter(
-        field_name='invited_user__first_name ',
+    invited_user_first_name = MultipleValueFilter(
+        field_name='invited_user__first_name',
         label=_(
             'Множественный поиск по имени пользователя, ' +
             'который был приглашен.',
         ),
     )
-    invited_user_last_name = django_filters.AllValuesMultipleFilter(
+    invited_user_last_name = MultipleValueFilter(
         field_name='invited_user__last_name',
         label=_(
             'Множественный поиск по фамилии пользователя, ' +
             'который был приглашен.',
         ),
     )
-    referral_code_code = django_filters.AllValuesMultipleFilter(
+    referral_code_code = MultipleValueFilter(
         field_name='referral_code__code',
         label=_('Множественный поиск по реферальному коду.'),
     )
@@ -93,24 +97,31 @@ class ReferralInviteFilter(django_filters.FilterSet):
         )
 
 
-class ReferralInviteViewSet(BaseReadOnlyViewSet):
+class ReferralInviteViewSet(ExportMixin, BaseReadOnlyViewSet):
     """Приглашенные по реферальной системе. Просмотр.
 
     Стандартные методы:
 
     1) GET api/friends/referral-invite - получение списка людей, которые были
     вами приглашены.
+    Пагинация limit/offset с count. С параметром ?pagination=keyset -
+    keyset: ссылки next/previous содержат курсор, count не возвращается.
     Доступно: всем авторизованным.
 
     2) GET api/friends/referral-invite/id - получение конкретного
     приглашенного человека по его id.
     Доступно: суперпользователю, отправителю и получателю запроса.
+
+    Дополнительные методы:
+
+    1) GET api/friends/referral-invite/export-csv, export-xlsx - выгрузка
+    всех приглашенных с учетом фильтров в CSV или XLSX (потоковый ответ).
+    Доступно: всем авторизованным, каждый выгружает то, что видит в списке.
     """
 
-    queryset = ReferralInvite.objects.select_related(
-        'referral_user',
-        'invited_user',
-        'referral_code',
+    queryset = queryset_for_serializer(
+        ReferralInvite.objects.all(),
+        ReferralInviteSerializer,
     )
     serializer_class = ReferralInviteSerializer
     ordering_fields = '__all__'
@@ -126,6 +137,22 @@ class ReferralInviteViewSet(BaseReadOnlyViewSet):
         'referral_code__code',
     )
     filterset_class = ReferralInviteFilter
+    pagination_class = OptionalKeysetPagination
+    permission_type_map = {
+        **BaseReadOnlyViewSet.permission_type_map,
+        'export_csv': 'list',
+        'export_xlsx': 'list',
+    }
+    export_fields = (
+        'id',
+        'created_at',
+        'referral_user',
+        'referral_user__email',
+        'invited_user',
+        'invited_user__email',
+        'referral_code__code',
+    )
+    export_filename = 'referral_invites'
 
     def get_queryset(self):  # noqa: WPS615
         """Фильтруем выдачу людей, приглашенных по реферальной системе.
@@ -9,7 +9,9 @@ class NovaFriendConfig(AppConfig):
     verbose_name = _('Друзья.')
 
     def ready(self) -> None:
-        """Подключение прав происходит при подключении app."""
+        """Подключение прав и обработчиков сигналов при подключении app."""
         super().ready()
         import nova_friend.api.routers
+        import nova_friend.checks
         import nova_friend.permissions
+        import nova_friend.receivers
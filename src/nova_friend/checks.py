@@ -0,0 +1,94 @@
+from typing import List, Set
+
+from django.apps import apps
+from django.conf import settings
+from django.core import checks
+from django.db import connections
+
+from nova_friend.apps import NovaFriendConfig
+
+INVALID_INDEXES_SQL = """
+    SELECT index_class.relname
+    FROM pg_index
+    JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid
+    WHERE pg_index.indrelid = %s::regclass AND NOT pg_index.indisvalid
+"""
+
+
+def _invalid_indexes(connection, cursor, table: str) -> Set[str]:
+    """Индексы, построение которых через CONCURRENTLY не завершилось."""
+    if connection.vendor != 'postgresql':
+        return set()
+    cursor.execute(INVALID_INDEXES_SQL, [table])
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _check_model(connection, cursor, model) -> List[checks.CheckMessage]:
+    """Индексы и ограничения одной модели."""
+    table = model._meta.db_table  # noqa: WPS437
+    existing = connection.introspection.get_constraints(cursor, table)
+    invalid = _invalid_indexes(connection, cursor, table)
+    messages = []
+    for index in (
+        *model._meta.indexes,  # noqa: WPS437
+        *model._meta.constraints,  # noqa: WPS437
+    ):
+        if index.name not in existing:
+            messages.append(
+                checks.Warning(
+                    f'Индекс {index.name} отсутствует в таблице {table} ' +
+                    f'({connection.alias}).',
+                    hint='Примените миграции nova_friend.',
+                    obj=model,
+                    id='nova_friend.W001',
+                ),
+            )
+        elif index.name in invalid:
+            messages.append(
+                checks.Warning(
+                    f'Индекс {index.name} в таблице {table} ' +
+                    f'({connection.alias}) невалиден.',
+                    hint=(
+                        'Удалите индекс и повторно примените миграцию, ' +
+                        'которая его создает.'
+                    ),
+                    obj=model,
+                    id='nova_friend.W002',
+                ),
+            )
+    return messages
+
+
+@checks.register(checks.Tags.database)
+def check_indexes(app_configs, databases=None, **kwargs):
+    """Проверка того, что индексы и ограничения моделей есть в БД.
+
+    Запуск: python manage.py check --database default
+    """
+    messages: List[checks.CheckMessage] = []
+    models = apps.get_app_config(NovaFriendConfig.name).get_models()
+    for alias in databases or ():
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            tables = set(connection.introspection.table_names(cursor))
+            for model in models:
+                if model._meta.db_table in tables:  # noqa: WPS437
+                    messages.extend(_check_model(connection, cursor, model))
+    return messages
+
+
+@checks.register()
+def check_contact_hash_key(app_configs, **kwargs):
+    """Проверка того, что задан ключ хэшей контактов."""
+    if getattr(settings, 'NOVA_FRIEND_CONTACT_HASH_KEY', ''):
+        return []
+    return [
+        checks.Error(
+            'Не задан ключ хэшей контактов NOVA_FRIEND_CONTACT_HASH_KEY.',
+            hint=(
+                'Задайте отдельный от SECRET_KEY ключ: он передается ' +
+                'клиентам, которые считают хэши контактов.'
+            ),
+            id='nova_friend.E001',
+        ),
+    ]
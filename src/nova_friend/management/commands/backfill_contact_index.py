@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from nova_friend.services.contact_index import backfill_contact_index
+from nova_friend.services.contacts import phone_cache_info
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """Построение индекса хэшей контактов пользователей."""
+
+    help = (  # noqa: A003, WPS125
+        'Построение индекса контактов (ContactHash) пачками ' +
+        'пользователей. Нужен после установки, после смены ' +
+        'NOVA_FRIEND_CONTACT_HASH_KEY и после изменения пользователей в ' +
+        'обход post_save (bulk_create, update). Повторный запуск ' +
+        'исправляет только расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество пользователей в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        """Построение индекса."""
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше 0.')
+        cache_info = phone_cache_info()
+        total = backfill_contact_index(chunk_size=options['chunk_size'])
+        self.stdout.write(f'Изменено записей: {total}.')
+        self.stdout.write(
+            f'Кэш номеров: {phone_cache_info().since(cache_info)}.',
+        )
@@ -0,0 +1,80 @@
+import csv
+import sys
+from itertools import islice
+from typing import Iterator, List
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nova_friend.services.record_referral_invite import (
+    ReferralAttribution,
+    record_referral_invites,
+)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _attributions(rows: Iterator[dict]) -> Iterator[ReferralAttribution]:
+    """Приглашения из строк CSV."""
+    for row in rows:
+        yield ReferralAttribution(
+            invited_user_id=int(row['invited_user_id']),
+            referral_code=row.get('referral_code') or None,
+            referral_user_email=row.get('referral_user_email') or None,
+        )
+
+
+def _batches(
+    attributions: Iterator[ReferralAttribution],
+    batch_size: int,
+) -> Iterator[List[ReferralAttribution]]:
+    """Пачки по batch_size приглашений."""
+    while True:
+        batch = list(islice(attributions, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    """Импорт приглашений по реферальной системе из CSV."""
+
+    help = (  # noqa: A003, WPS125
+        'Импорт приглашений из CSV с колонками invited_user_id, ' +
+        'referral_code, referral_user_email. Один запрос на пачку, ' +
+        'уже записанные приглашения пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            'path',
+            help='Путь к CSV-файлу или - для чтения из stdin.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество приглашений в одном запросе.',
+        )
+
+    def handle(self, *args, **options):
+        """Запись приглашений пачками."""
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше 0.')
+        if options['path'] == '-':
+            self._import(sys.stdin, options['batch_size'])
+            return
+        with open(options['path'], newline='') as csv_file:
+            self._import(csv_file, options['batch_size'])
+
+    def _import(self, csv_file, batch_size: int) -> None:
+        """Импорт из открытого файла."""
+        total = 0
+        created = 0
+        attributions = _attributions(csv.DictReader(csv_file))
+        for batch in _batches(attributions, batch_size):
+            total += len(batch)
+            created += len(record_referral_invites(batch))
+        self.stdout.write(
+            f'Обработано: {total}, создано приглашений: {created}.',
+        )
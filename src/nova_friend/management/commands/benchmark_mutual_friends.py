@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+MEGABYTE = 1024 * 1024
+
+
+class Command(BaseCommand):
+    """Оценка времени и памяти пересчета общих друзей на случайном графе."""
+
+    help = (  # noqa: A003, WPS125
+        'Пересчет возможных друзей произведениями матриц на случайном ' +
+        'графе без записи в БД. Выводит время и пиковую память, по ним ' +
+        'подбираются worker и NOVA_FRIEND_MUTUAL_FRIENDS_MEMORY_BUDGET. ' +
+        'Нужны numpy и scipy.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument('--users', type=int, default=1000000)
+        parser.add_argument('--edges', type=int, default=50000000)
+        parser.add_argument('--limit', type=int, default=50)
+        parser.add_argument(
+            '--memory-budget',
+            type=int,
+            default=None,
+            help='Память на блок произведений матриц (МБ).',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        """Построение графа и пересчет кандидатов."""
+        # numpy и scipy - необязательные зависимости (extra graph).
+        from nova_friend.services.mutual_friends import (  # noqa: WPS433
+            benchmark_friend_graph,
+            synthetic_friend_graph,
+        )
+        if options['users'] < 2 or options['edges'] < 1:
+            raise CommandError('Нужно хотя бы 2 пользователя и 1 ребро.')
+        graph = synthetic_friend_graph(
+            options['users'],
+            options['edges'],
+            seed=options['seed'],
+        )
+        memory_budget = options['memory_budget']
+        stats = benchmark_friend_graph(
+            graph,
+            limit=options['limit'],
+            memory_budget=memory_budget and memory_budget * MEGABYTE,
+        )
+        for name, value in stats.items():  # noqa: WPS110
+            self.stdout.write(f'{name}: {value}')
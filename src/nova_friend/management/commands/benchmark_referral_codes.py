@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from nova_friend.services.referral_code_generator import (
+    MAX_SEQUENCE_VALUE,
+    benchmark_referral_codes,
+    random_codes_collision_rate,
+    referral_code_key,
+)
+
+
+class Command(BaseCommand):
+    """Скорость генерации реферальных кодов и частота коллизий."""
+
+    help = (  # noqa: A003, WPS125
+        'Генерация кодов подряд без записи в БД: время и число совпадений. ' +
+        'Для сравнения выводит вероятность коллизии прежнего генератора ' +
+        'get_random_string при заданном количестве кодов в БД.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument('--codes', type=int, default=200000)
+        parser.add_argument(
+            '--existing',
+            type=int,
+            nargs='+',
+            default=[10 ** 4, 10 ** 6, 10 ** 8],
+            help='Количество кодов в БД для прежнего генератора.',
+        )
+        parser.add_argument('--key', default='benchmark')
+
+    def handle(self, *args, **options):
+        """Генерация кодов и расчет коллизий."""
+        if not 0 < options['codes'] <= MAX_SEQUENCE_VALUE + 1:
+            raise CommandError(
+                f'Количество кодов - от 1 до {MAX_SEQUENCE_VALUE + 1}.',
+            )
+        stats = benchmark_referral_codes(
+            options['codes'],
+            referral_code_key(options['key']),
+        )
+        for name, value in stats.items():  # noqa: WPS110
+            self.stdout.write(f'{name}: {value}')
+        for existing_codes in options['existing']:
+            rate = random_codes_collision_rate(existing_codes)
+            attempts = 1 / (1 - min(rate, 1 - 1e-9))
+            self.stdout.write(
+                f'get_random_string, {existing_codes} кодов в БД: ' +
+                f'коллизия {rate:.2e} на попытку, ' +
+                f'{attempts:.4f} попыток на код',
+            )
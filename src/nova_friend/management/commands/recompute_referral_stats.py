@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from nova_friend.services.referral_stats import recompute_referral_stats
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """Пересчет статистики приглашений по ReferralInvite."""
+
+    help = (  # noqa: A003, WPS125
+        'Пересчет статистики приглашений по реферальным кодам пачками ' +
+        'пользователей. Нужен после удаления приглашений и ручных ' +
+        'изменений ReferralInvite.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество пользователей в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        """Пересчет статистики."""
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше 0.')
+        total = recompute_referral_stats(chunk_size=options['chunk_size'])
+        self.stdout.write(f'Записей статистики: {total}.')
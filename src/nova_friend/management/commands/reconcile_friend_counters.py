@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from nova_friend.services.friend_counters import reconcile_friend_counters
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """Сверка счетчиков друзей с запросами в друзья и дружбой."""
+
+    help = (  # noqa: A003, WPS125
+        'Сверка счетчиков друзей (FriendCounters) пачками пользователей. ' +
+        'Создает недостающие записи после установки и исправляет ' +
+        'расхождения. Периодически выполняется задачей Celery ' +
+        'nova_friend.reconcile_friend_counters.'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество пользователей в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        """Сверка счетчиков."""
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше 0.')
+        total = reconcile_friend_counters(chunk_size=options['chunk_size'])
+        self.stdout.write(f'Исправлено записей: {total}.')
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from nova_friend.services.friend_suggestions import refresh_friend_suggestions
+
+DEFAULT_CHUNK_SIZE = 1000
+MEGABYTE = 1024 * 1024
+
+
+class Command(BaseCommand):
+    """Пересчет возможных друзей пользователей."""
+
+    help = (  # noqa: A003, WPS125
+        'Пересчет возможных друзей (FriendSuggestion) пачками ' +
+        'пользователей. По умолчанию пересчитываются пользователи, у ' +
+        'которых менялась дружба после предыдущего запуска. Периодически ' +
+        'выполняется задачей Celery nova_friend.refresh_friend_suggestions. ' +
+        'С --csr выполняется полный пересчет произведениями разреженных ' +
+        'матриц (нужны numpy и scipy).'
+    )
+
+    def add_arguments(self, parser):
+        """Аргументы команды."""
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать всех пользователей.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество пользователей в одной транзакции.',
+        )
+        parser.add_argument(
+            '--csr',
+            action='store_true',
+            help='Полный пересчет через матрицу смежности CSR.',
+        )
+        parser.add_argument(
+            '--memory-budget',
+            type=int,
+            default=None,
+            help=(
+                'Память на блок произведений матриц (МБ), по умолчанию ' +
+                'NOVA_FRIEND_MUTUAL_FRIENDS_MEMORY_BUDGET.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        """Пересчет возможных друзей."""
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше 0.')
+        if options['csr']:
+            # numpy и scipy - необязательные зависимости (extra graph).
+            from nova_friend.services.mutual_friends import (  # noqa: WPS433
+                refresh_friend_suggestions_csr,
+            )
+            memory_budget = options['memory_budget']
+            run = refresh_friend_suggestions_csr(
+                chunk_size=options['chunk_size'],
+                memory_budget=memory_budget and memory_budget * MEGABYTE,
+            )
+        else:
+            run = refresh_friend_suggestions(
+                chunk_size=options['chunk_size'],
+                full=options['full'],
+            )
+        self.stdout.write(f'Пересчитано пользователей: {run.users_count}.')
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import rules.contrib.models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferralCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменен')),
+                ('code', models.CharField(max_length=8, unique=True, verbose_name='Реферальный код.')),
+                ('note', models.CharField(max_length=255, verbose_name='Примечание')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referral_codes', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь, владелец реферального кода.')),
+            ],
+            options={
+                'verbose_name': 'Реферальный код.',
+                'verbose_name_plural': 'Реферальные коды.',
+                'ordering': ['-id'],
+                'abstract': False,
+            },
+            bases=(rules.contrib.models.RulesModelMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='ReferralInvite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменен')),
+                ('invited_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invited_users', to=settings.AUTH_USER_MODEL, unique=True, verbose_name='Пользователь, которого пригласили.')),
+                ('referral_code', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='referral_invites', to='nova_friend.referralcode', verbose_name='Код, по которому был приглашен пользователь')),
+                ('referral_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referral_users', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь, который пригласил.')),
+            ],
+            options={
+                'verbose_name': 'Приглашенный по реферальной системе.',
+                'verbose_name_plural': 'Приглашенные по реферальной системе.',
+                'ordering': ['-id'],
+                'abstract': False,
+            },
+            bases=(rules.contrib.models.RulesModelMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='FriendRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменен')),
+                ('message', models.TextField(blank=True, verbose_name='Сообщение запроса')),
+                ('contact', models.CharField(max_length=100, verbose_name='Номер телефона, email или реферальная ссылка.')),
+                ('token', models.UUIDField(default=uuid.uuid4, verbose_name='Token запроса в друзья.')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает'), ('rejected', 'Отклонён'), ('confirmed', 'Подтвержден'), ('canceled', 'Отменен')], default='pending', max_length=10, verbose_name='Статус запроса.')),
+                ('receiving_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='friend_receiving_requests', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь, которого добавляют в друзья.')),
+                ('sending_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='friend_sending_requests', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь, запрашивающий добавление в друзья.')),
+            ],
+            options={
+                'verbose_name': 'Запрос в друзья.',
+                'verbose_name_plural': 'Запросы в друзья.',
+                'ordering': ['-id'],
+                'abstract': False,
+            },
+            bases=(rules.contrib.models.RulesModelMixin, models.Model),
+        ),
+        migrations.AddConstraint(
+            model_name='friendrequest',
+            constraint=models.CheckConstraint(check=models.Q(('status__in', ['pending', 'rejected', 'confirmed', 'canceled'])), name='friend_request_status_valid'),
+        ),
+    ]
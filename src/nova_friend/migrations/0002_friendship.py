@@ -0,0 +1,106 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:27
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import migrations, models
+import django.db.models.deletion
+import rules.contrib.models
+
+# Размер пачки при заполнении Friendship.
+BACKFILL_BATCH_SIZE = 10000
+
+
+def _add_friendships(Friendship, pairs):
+    """Дружба в обе стороны для пар (user_id, friend_id) одной вставкой."""
+    friendships = []
+    for user_id, friend_id in pairs:
+        if user_id == friend_id:
+            continue
+        friendships.append(Friendship(user_id=user_id, friend_id=friend_id))
+        friendships.append(Friendship(user_id=friend_id, friend_id=user_id))
+    Friendship.objects.bulk_create(friendships, ignore_conflicts=True)
+
+
+def _batches(queryset, fields):
+    """Значения fields строк queryset пачками по первичному ключу."""
+    last_pk = None
+    while True:
+        batch_queryset = queryset.order_by('pk')
+        if last_pk is not None:
+            batch_queryset = batch_queryset.filter(pk__gt=last_pk)
+        rows = list(
+            batch_queryset.values_list('pk', *fields)[:BACKFILL_BATCH_SIZE],
+        )
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        yield [row[1:] for row in rows]
+
+
+def backfill_friendships(apps, schema_editor):
+    """Заполнение Friendship существующей дружбой.
+
+    Источники - подтвержденные запросы в друзья и поле friends модели
+    пользователя (ManyToMany), если оно есть.
+    """
+    Friendship = apps.get_model('nova_friend', 'Friendship')
+    FriendRequest = apps.get_model('nova_friend', 'FriendRequest')
+    for pairs in _batches(
+        FriendRequest.objects.filter(status='confirmed'),
+        ('sending_user_id', 'receiving_user_id'),
+    ):
+        _add_friendships(Friendship, pairs)
+
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    try:
+        friends = User._meta.get_field('friends')
+    except FieldDoesNotExist:
+        return
+    if not friends.many_to_many:
+        return
+    through = friends.remote_field.through
+    for pairs in _batches(
+        through.objects.all(),
+        (
+            f'{friends.m2m_field_name()}_id',
+            f'{friends.m2m_reverse_field_name()}_id',
+        ),
+    ):
+        _add_friendships(Friendship, pairs)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('nova_friend', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Friendship',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменен')),
+                ('friend', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='friend_of_friendships', to=settings.AUTH_USER_MODEL, verbose_name='Друг пользователя.')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='friendships', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь.')),
+            ],
+            options={
+                'verbose_name': 'Дружба.',
+                'verbose_name_plural': 'Дружба.',
+                'ordering': ['-id'],
+                'abstract': False,
+            },
+            bases=(rules.contrib.models.RulesModelMixin, models.Model),
+        ),
+        migrations.AddConstraint(
+            model_name='friendship',
+            constraint=models.UniqueConstraint(fields=('user', 'friend'), name='friendship_user_friend_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='friendship',
+            constraint=models.CheckConstraint(check=models.Q(('user', models.F('friend')), _negated=True), name='friendship_not_self'),
+        ),
+        migrations.RunPython(backfill_friendships, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:28
+
+from django.db import migrations, models
+from django.db.models.functions import Greatest, Least
+import django.db.models.functions.comparison
+
+
+def delete_duplicate_pairs(apps, schema_editor):
+    """Удаление повторных запросов в друзья между одной парой.
+
+    Для пары остается подтвержденный запрос, а если его нет - самый
+    ранний. Дружба подтвержденных запросов уже перенесена в Friendship.
+    """
+    FriendRequest = apps.get_model('nova_friend', 'FriendRequest')
+    pair_requests = FriendRequest.objects.annotate(
+        low_user_id=Least('sending_user', 'receiving_user'),
+        high_user_id=Greatest('sending_user', 'receiving_user'),
+    )
+    duplicate_pairs = pair_requests.order_by().values(
+        'low_user_id',
+        'high_user_id',
+    ).annotate(
+        requests_count=models.Count('id'),
+    ).filter(requests_count__gt=1).values_list('low_user_id', 'high_user_id')
+    for low_user_id, high_user_id in duplicate_pairs.iterator():
+        request_ids = list(
+            pair_requests.filter(
+                low_user_id=low_user_id,
+                high_user_id=high_user_id,
+            ).order_by(
+                models.Case(
+                    models.When(status='confirmed', then=0),
+                    default=1,
+                ),
+                'id',
+            ).values_list('id', flat=True),
+        )
+        FriendRequest.objects.filter(id__in=request_ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY не может выполняться внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ('nova_friend', '0002_friendship'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_duplicate_pairs,
+            migrations.RunPython.noop,
+            atomic=True,
+        ),
+        # Индекс строится без блокировки записи. Недостроенный индекс
+        # прошлой неудачной попытки удаляется.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql='DROP INDEX CONCURRENTLY IF EXISTS friend_request_user_pair_unique;',
+                    reverse_sql=migrations.RunSQL.noop,
+                ),
+                migrations.RunSQL(
+                    sql='CREATE UNIQUE INDEX CONCURRENTLY friend_request_user_pair_unique ON nova_friend_friendrequest (LEAST(sending_user_id, receiving_user_id), GREATEST(sending_user_id, receiving_user_id));',
+                    reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS friend_request_user_pair_unique;',
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='friendrequest',
+                    constraint=models.UniqueConstraint(django.db.models.functions.comparison.Least('sending_user', 'receiving_user'), django.db.models.functions.comparison.Greatest('sending_user', 'receiving_user'), name='friend_request_user_pair_unique'),
+                ),
+            ],
+        ),
+    ]
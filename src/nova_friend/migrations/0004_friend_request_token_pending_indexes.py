@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:29
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY не может выполняться внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ('nova_friend', '0003_friend_request_user_pair_unique'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='friendrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['receiving_user', '-id'], name='friend_request_receiving_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='friendrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['sending_user', '-id'], name='friend_request_sending_idx'),
+        ),
+        # Уникальный индекс строится без блокировки записи, после чего
+        # превращается в ограничение без повторного построения.
+        # Недостроенный (INVALID) индекс прошлой неудачной попытки
+        # удаляется: IF NOT EXISTS оставил бы его и ограничение не создалось.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql='DROP INDEX CONCURRENTLY IF EXISTS friend_request_token_unique;',
+                    reverse_sql=migrations.RunSQL.noop,
+                ),
+                migrations.RunSQL(
+                    sql='CREATE UNIQUE INDEX CONCURRENTLY friend_request_token_unique ON nova_friend_friendrequest (token);',
+                    reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS friend_request_token_unique;',
+                ),
+                migrations.RunSQL(
+                    sql='ALTER TABLE nova_friend_friendrequest ADD CONSTRAINT friend_request_token_unique UNIQUE USING INDEX friend_request_token_unique;',
+                    reverse_sql='ALTER TABLE nova_friend_friendrequest DROP CONSTRAINT IF EXISTS friend_request_token_unique;',
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='friendrequest',
+                    constraint=models.UniqueConstraint(fields=('token',), name='friend_request_token_unique'),
+                ),
+            ],
+        ),
+    ]
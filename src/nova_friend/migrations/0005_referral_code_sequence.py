@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nova_friend', '0004_friend_request_token_pending_indexes'),
+    ]
+
+    operations = [
+        # Значения последовательности переставляются в реферальные коды
+        # (services.referral_code_generator), MAXVALUE - 2^40 - 1.
+        migrations.RunSQL(
+            sql='CREATE SEQUENCE IF NOT EXISTS nova_friend_referral_code_seq AS bigint MINVALUE 0 MAXVALUE 1099511627775 START 1 NO CYCLE;',
+            reverse_sql='DROP SEQUENCE IF EXISTS nova_friend_referral_code_seq;',
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import rules.contrib.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('nova_friend', '0005_referral_code_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferralStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменен')),
+                ('invite_count', models.PositiveIntegerField(default=0, verbose_name='Количество приглашенных.')),
+                ('last_invite_at', models.DateTimeField(blank=True, null=True, verbose_name='Время последнего приглашения.')),
+                ('referral_code', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='referral_stats', to='nova_friend.referralcode', verbose_name='Реферальный код.')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referral_stats', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь, который пригласил.')),
+            ],
+            options={
+                'verbose_name': 'Статистика приглашений.',
+                'verbose_name_plural': 'Статистика приглашений.',
+                'ordering': ['-id'],
+                'abstract': False,
+            },
+            bases=(rules.contrib.models.RulesModelMixin, models.Model),
+        ),
+        migrations.AddConstraint(
+            model_name='referralstats',
+            constraint=models.UniqueConstraint(condition=models.Q(('referral_code__isnull', True)), fields=('user',), name='referral_stats_user_without_code_unique'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import rules.contrib.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('nova_friend', '0006_referral_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FriendCounters',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменен')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='friend_counters', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь.')),
+                ('pending_incoming', models.IntegerField(default=0, verbose_name='Ожидающих входящих запросов.')),
+                ('pending_outgoing', models.IntegerField(default=0, verbose_name='Ожидающих исходящих запросов.')),
+                ('friends', models.IntegerField(default=0, verbose_name='Друзей.')),
+            ],
+            options={
+                'verbose_name': 'Счетчики друзей.',
+                'verbose_name_plural': 'Счетчики друзей.',
+                'ordering': ['user'],
+                'abstract': False,
+            },
+            bases=(rules.contrib.models.RulesModelMixin, models.Model),
+        ),
+    ]
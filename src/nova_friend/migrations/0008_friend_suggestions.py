@@ -0,0 +1,69 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import rules.contrib.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('nova_friend', '0007_friend_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FriendSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменен')),
+                ('mutual_friends_count', models.PositiveIntegerField(verbose_name='Количество общих друзей.')),
+            ],
+            options={
+                'verbose_name': 'Возможный друг.',
+                'verbose_name_plural': 'Возможные друзья.',
+                'ordering': ['-id'],
+                'abstract': False,
+            },
+            bases=(rules.contrib.models.RulesModelMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='FriendSuggestionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменен')),
+                ('full', models.BooleanField(default=False, verbose_name='Полный пересчет.')),
+                ('users_count', models.PositiveIntegerField(default=0, verbose_name='Количество пересчитанных пользователей.')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Время завершения.')),
+            ],
+            options={
+                'verbose_name': 'Пересчет возможных друзей.',
+                'verbose_name_plural': 'Пересчеты возможных друзей.',
+                'ordering': ['-id'],
+                'abstract': False,
+            },
+            bases=(rules.contrib.models.RulesModelMixin, models.Model),
+        ),
+        migrations.AddIndex(
+            model_name='friendcounters',
+            index=models.Index(fields=['updated_at'], name='friend_counters_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='friendsuggestion',
+            name='suggested_user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggested_to', to=settings.AUTH_USER_MODEL, verbose_name='Предлагаемый друг.'),
+        ),
+        migrations.AddField(
+            model_name='friendsuggestion',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='friend_suggestions', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь.'),
+        ),
+        migrations.AddConstraint(
+            model_name='friendsuggestion',
+            constraint=models.UniqueConstraint(fields=('user', 'suggested_user'), name='friend_suggestion_user_suggested_unique'),
+        ),
+    ]
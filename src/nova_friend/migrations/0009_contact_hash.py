@@ -0,0 +1,76 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import rules.contrib.models
+
+from nova_friend.services.contact_index import contact_hash, user_contacts
+
+# Размер пачки пользователей при заполнении индекса.
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_contact_hashes(apps, schema_editor):
+    """Заполнение индекса контактами существующих пользователей.
+
+    Без него поиск получателя запроса в друзья не находит пользователей,
+    зарегистрированных до миграции, и отправляет им приглашения.
+    """
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    ContactHash = apps.get_model('nova_friend', 'ContactHash')
+    last_pk = None
+    while True:
+        queryset = User.objects.order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        users = list(queryset[:BACKFILL_BATCH_SIZE])
+        if not users:
+            return
+        last_pk = users[-1].pk
+        ContactHash.objects.bulk_create(
+            [
+                ContactHash(
+                    user_id=user.pk,
+                    kind=kind,
+                    digest=contact_hash(value),
+                )
+                for user in users
+                for kind, value in user_contacts(user).items()
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('nova_friend', '0008_friend_suggestions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactHash',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменен')),
+                ('kind', models.CharField(choices=[('email', 'Электронная почта'), ('phone', 'Телефон')], max_length=5, verbose_name='Вид контакта.')),
+                ('digest', models.CharField(db_index=True, max_length=64, verbose_name='Хэш контакта.')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='contact_hashes', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь.')),
+            ],
+            options={
+                'verbose_name': 'Хэш контакта.',
+                'verbose_name_plural': 'Хэши контактов.',
+                'ordering': ['-id'],
+                'abstract': False,
+            },
+            bases=(rules.contrib.models.RulesModelMixin, models.Model),
+        ),
+        migrations.AddConstraint(
+            model_name='contacthash',
+            constraint=models.UniqueConstraint(fields=('user', 'kind'), name='contact_hash_user_kind_unique'),
+        ),
+        migrations.RunPython(backfill_contact_hashes, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,21 @@
+from nova_friend.models.contact_hash import ContactHash
+from nova_friend.models.friend_counters import FriendCounters
 from nova_friend.models.friend_request import FriendRequest
+from nova_friend.models.friend_suggestion import FriendSuggestion
+from nova_friend.models.friend_suggestion_run import FriendSuggestionRun
+from nova_friend.models.friendship import Friendship
 from nova_friend.models.referral_code import ReferralCode
 from nova_friend.models.referral_invite import ReferralInvite
+from nova_friend.models.referral_stats import ReferralStats
 
 __all__ = [
+    'ContactHash',
+    'FriendCounters',
     'FriendRequest',
+    'FriendSuggestion',
+    'FriendSuggestionRun',
+    'Friendship',
     'ReferralCode',
     'ReferralInvite',
+    'ReferralStats',
 ]
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from nova_friend.services.base_model import AbstractModel
+from nova_friend.services.enums import ContactKind
+
+User = get_user_model()
+
+
+class ContactHash(AbstractModel):
+    """Ключевой хэш контакта пользователя (индекс контактов).
+
+    digest - HMAC-SHA256 нормализованного контакта (email в нижнем
+    регистре, телефон в E.164) с ключом NOVA_FRIEND_CONTACT_HASH_KEY.
+    По хэшам пользователь ищется одним индексированным запросом, а
+    клиент может проверить адресную книгу, не передавая сами контакты.
+    """
+
+    user = models.ForeignKey(
+        to=User,
+        related_name='contact_hashes',
+        verbose_name=_('Пользователь.'),
+        on_delete=models.CASCADE,
+        # Покрывается уникальным индексом (user, kind).
+        db_index=False,
+    )
+    kind = models.CharField(
+        verbose_name=_('Вид контакта.'),
+        max_length=5,
+        choices=ContactKind.choices,
+    )
+    digest = models.CharField(
+        verbose_name=_('Хэш контакта.'),
+        max_length=64,
+        db_index=True,
+    )
+
+    class Meta(AbstractModel.Meta):
+        verbose_name = _('Хэш контакта.')
+        verbose_name_plural = _('Хэши контактов.')
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'kind'),
+                name='contact_hash_user_kind_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user}: {self.kind}'
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from nova_friend.services.base_model import AbstractModel
+
+User = get_user_model()
+
+
+class FriendCounters(AbstractModel):
+    """Счетчики запросов в друзья и друзей пользователя.
+
+    Первичный ключ - id пользователя, поэтому чтение счетчиков - одно
+    чтение по первичному ключу. Счетчики изменяются в той же транзакции,
+    что и запросы в друзья, и сверяются задачей
+    reconcile_friend_counters. Счетчики не ограничены снизу: расхождение
+    не должно мешать действиям пользователя, его исправляет сверка.
+    """
+
+    user = models.OneToOneField(
+        to=User,
+        primary_key=True,
+        related_name='friend_counters',
+        verbose_name=_('Пользователь.'),
+        on_delete=models.CASCADE,
+    )
+    pending_incoming = models.IntegerField(
+        verbose_name=_('Ожидающих входящих запросов.'),
+        default=0,
+    )
+    pending_outgoing = models.IntegerField(
+        verbose_name=_('Ожидающих исходящих запросов.'),
+        default=0,
+    )
+    friends = models.IntegerField(
+        verbose_name=_('Друзей.'),
+        default=0,
+    )
+
+    class Meta(AbstractModel.Meta):
+        verbose_name = _('Счетчики друзей.')
+        verbose_name_plural = _('Счетчики друзей.')
+        # Поля id нет, первичный ключ - user.
+        ordering = ['user']
+        indexes = [
+            # Пользователи, у которых менялась дружба (friend_suggestions).
+            models.Index(
+                fields=('updated_at',),
+                name='friend_counters_updated_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f'{self.user}: {self.pending_incoming}/' +
+            f'{self.pending_outgoing}/{self.friends}'
+        )
@@ -2,6 +2,7 @@ import uuid
 
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.functions import Greatest, Least
 from django.utils.translation import gettext_lazy as _
 
 from nova_friend.services.base_model import AbstractModel
@@ -55,6 +56,31 @@ class FriendRequest(AbstractModel):
                 check=models.Q(status__in=FriendRequestStatus.values),
                 name='friend_request_status_valid',
             ),
+            # Один запрос на пару пользователей независимо от направления.
+            # Индекс также используется для поиска запроса по паре.
+            models.UniqueConstraint(
+                Least('sending_user', 'receiving_user'),
+                Greatest('sending_user', 'receiving_user'),
+                name='friend_request_user_pair_unique',
+            ),
+            # Строится через CREATE UNIQUE INDEX CONCURRENTLY, см. миграцию.
+            models.UniqueConstraint(
+                fields=('token',),
+                name='friend_request_token_unique',
+            ),
+        ]
+        indexes = [
+            # Входящие и исходящие ожидающие запросы пользователя.
+            models.Index(
+                fields=('receiving_user', '-id'),
+                condition=models.Q(status=FriendRequestStatus.PENDING),
+                name='friend_request_receiving_idx',
+            ),
+            models.Index(
+                fields=('sending_user', '-id'),
+                condition=models.Q(status=FriendRequestStatus.PENDING),
+                name='friend_request_sending_idx',
+            ),
         ]
 
     def __str__(self):
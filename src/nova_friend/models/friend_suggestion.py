@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from nova_friend.services.base_model import AbstractModel
+
+User = get_user_model()
+
+
+class FriendSuggestion(AbstractModel):
+    """Возможный друг пользователя (друг друзей).
+
+    Для каждого пользователя хранится не больше
+    NOVA_FRIEND_SUGGESTIONS_LIMIT кандидатов с наибольшим числом общих
+    друзей. Записи пересчитываются задачей refresh_friend_suggestions.
+    """
+
+    user = models.ForeignKey(
+        to=User,
+        related_name='friend_suggestions',
+        verbose_name=_('Пользователь.'),
+        on_delete=models.CASCADE,
+        # Покрывается уникальным индексом (user, suggested_user).
+        db_index=False,
+    )
+    suggested_user = models.ForeignKey(
+        to=User,
+        related_name='suggested_to',
+        verbose_name=_('Предлагаемый друг.'),
+        on_delete=models.CASCADE,
+        db_index=True,
+    )
+    mutual_friends_count = models.PositiveIntegerField(
+        verbose_name=_('Количество общих друзей.'),
+    )
+
+    class Meta(AbstractModel.Meta):
+        verbose_name = _('Возможный друг.')
+        verbose_name_plural = _('Возможные друзья.')
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'suggested_user'),
+                name='friend_suggestion_user_suggested_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f'{self.user} -> {self.suggested_user}: ' +
+            f'{self.mutual_friends_count}'
+        )
@@ -0,0 +1,33 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from nova_friend.services.base_model import AbstractModel
+
+
+class FriendSuggestionRun(AbstractModel):
+    """Запуск пересчета возможных друзей.
+
+    Время начала (created_at) последнего завершенного запуска - граница
+    для следующего инкрементального пересчета.
+    """
+
+    full = models.BooleanField(
+        verbose_name=_('Полный пересчет.'),
+        default=False,
+    )
+    users_count = models.PositiveIntegerField(
+        verbose_name=_('Количество пересчитанных пользователей.'),
+        default=0,
+    )
+    finished_at = models.DateTimeField(
+        verbose_name=_('Время завершения.'),
+        blank=True,
+        null=True,
+    )
+
+    class Meta(AbstractModel.Meta):
+        verbose_name = _('Пересчет возможных друзей.')
+        verbose_name_plural = _('Пересчеты возможных друзей.')
+
+    def __str__(self):
+        return f'{self.created_at}: {self.users_count}'
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from nova_friend.services.base_model import AbstractModel
+
+User = get_user_model()
+
+
+class Friendship(AbstractModel):
+    """Дружба между пользователями.
+
+    Ребро графа друзей. Хранится в обе стороны: для пары друзей A и B
+    существуют записи (A, B) и (B, A).
+    """
+
+    user = models.ForeignKey(
+        to=User,
+        related_name='friendships',
+        verbose_name=_('Пользователь.'),
+        on_delete=models.CASCADE,
+        # Покрывается уникальным индексом (user, friend).
+        db_index=False,
+    )
+    friend = models.ForeignKey(
+        to=User,
+        related_name='friend_of_friendships',
+        verbose_name=_('Друг пользователя.'),
+        on_delete=models.CASCADE,
+        db_index=True,
+    )
+
+    class Meta(AbstractModel.Meta):
+        verbose_name = _('Дружба.')
+        verbose_name_plural = _('Дружба.')
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'friend'),
+                name='friendship_user_friend_unique',
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('friend')),
+                name='friendship_not_self',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} <-> {self.friend}'
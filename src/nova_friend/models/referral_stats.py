@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from nova_friend.services.base_model import AbstractModel
+
+User = get_user_model()
+
+
+class ReferralStats(AbstractModel):
+    """Статистика приглашений пользователя по реферальному коду.
+
+    Одна запись на реферальный код и одна запись (referral_code = NULL) на
+    приглашения пользователя по ссылке без кода. Счетчики обновляются
+    при записи приглашений, пересчитываются командой
+    recompute_referral_stats.
+    """
+
+    user = models.ForeignKey(
+        to=User,
+        related_name='referral_stats',
+        verbose_name=_('Пользователь, который пригласил.'),
+        on_delete=models.CASCADE,
+        db_index=True,
+    )
+    referral_code = models.OneToOneField(
+        to='nova_friend.ReferralCode',
+        related_name='referral_stats',
+        verbose_name=_('Реферальный код.'),
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+    )
+    invite_count = models.PositiveIntegerField(
+        verbose_name=_('Количество приглашенных.'),
+        default=0,
+    )
+    last_invite_at = models.DateTimeField(
+        verbose_name=_('Время последнего приглашения.'),
+        blank=True,
+        null=True,
+    )
+
+    class Meta(AbstractModel.Meta):
+        verbose_name = _('Статистика приглашений.')
+        verbose_name_plural = _('Статистика приглашений.')
+
+        constraints = [
+            # Уникальность кода обеспечивает OneToOneField.
+            models.UniqueConstraint(
+                fields=('user',),
+                condition=models.Q(referral_code__isnull=True),
+                name='referral_stats_user_without_code_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} -> {self.referral_code}: {self.invite_count}'
@@ -0,0 +1,24 @@
+import rules
+from django.apps import apps
+
+from nova_friend.apps import NovaFriendConfig
+from nova_friend.permissions import (  # noqa: F401
+    contact_hash,
+    friend_request,
+    friend_suggestion,
+)
+
+actions = ['view', 'add', 'change', 'delete', 'list']
+name_models = apps.all_models[NovaFriendConfig.name]
+
+nova_friend_permission = {
+    '{0}.{1}_{2}'.format(NovaFriendConfig.name, action, name_model)
+    for action in actions
+    for name_model in name_models
+}
+
+# Устанавливаем доступ для всех к моделям, права на которые не заданы
+# (ни в nova_friend.permissions, ни в проекте).
+for keys in nova_friend_permission:
+    if not rules.perm_exists(keys):
+        rules.set_perm(keys, rules.always_allow)
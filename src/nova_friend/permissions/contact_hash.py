@@ -0,0 +1,4 @@
+import rules
+from rules.predicates import is_authenticated
+
+rules.set_perm('nova_friend.list_contacthash', is_authenticated)
@@ -1,19 +1,34 @@
 import rules
+from django.db.models import Q
 from rules.predicates import is_authenticated, is_superuser
 
 from nova_friend.services.enums import FriendRequestStatus
 
+# Каждому предикату соответствует фильтр queryset (функция user -> Q),
+# который отбирает те же запросы в друзья условием в SQL. Предикаты
+# сравнивают *_user_id, поэтому не загружают пользователей.
+
 
 @rules.predicate
 def is_receiving_user(user, friend_request):
     """Пользователь, которого добавляют в друзья."""
-    return user == friend_request.receiving_user
+    return user.id == friend_request.receiving_user_id
 
 
 @rules.predicate
 def is_sending_user(user, friend_request):
     """Пользователь, запрашивающий добавление в друзья."""
-    return user == friend_request.sending_user
+    return user.id == friend_request.sending_user_id
+
+
+def receiving_user_filter(user) -> Q:
+    """Фильтр для is_receiving_user."""
+    return Q(receiving_user_id=user.id)
+
+
+def sending_user_filter(user) -> Q:
+    """Фильтр для is_sending_user."""
+    return Q(sending_user_id=user.id)
 
 
 view_friend_request = is_superuser | is_receiving_user | is_sending_user
@@ -28,6 +43,13 @@ def has_view_friend_request(user, friend_request):
     return view_friend_request(user, friend_request)
 
 
+def view_friend_request_filter(user) -> Q:
+    """Фильтр для has_view_friend_request."""
+    if user.is_superuser:
+        return Q()
+    return receiving_user_filter(user) | sending_user_filter(user)
+
+
 @rules.predicate
 def has_confirm_friend_request(user, friend_request):
     """Права на согласие принятие дружбы."""
@@ -36,6 +58,14 @@ def has_confirm_friend_request(user, friend_request):
     return False
 
 
+def confirm_friend_request_filter(user) -> Q:
+    """Фильтр для has_confirm_friend_request."""
+    status_filter = Q(status=FriendRequestStatus.PENDING)
+    if user.is_superuser:
+        return status_filter
+    return status_filter & receiving_user_filter(user)
+
+
 @rules.predicate
 def has_reject_friend_request(user, friend_request):
     """Права на отказ от дружбы со стороны получателя."""
@@ -44,6 +74,14 @@ def has_reject_friend_request(user, friend_request):
     return False
 
 
+def reject_friend_request_filter(user) -> Q:
+    """Фильтр для has_reject_friend_request."""
+    status_filter = ~Q(status=FriendRequestStatus.CONFIRMED)
+    if user.is_superuser:
+        return status_filter
+    return status_filter & receiving_user_filter(user)
+
+
 @rules.predicate
 def has_cancel_friend_request(user, friend_request):
     """Права на отказ от дружбы со стороны отправителя."""
@@ -52,6 +90,14 @@ def has_cancel_friend_request(user, friend_request):
     return False
 
 
+def cancel_friend_request_filter(user) -> Q:
+    """Фильтр для has_cancel_friend_request."""
+    status_filter = ~Q(status=FriendRequestStatus.CONFIRMED)
+    if user.is_superuser:
+        return status_filter
+    return status_filter & sending_user_filter(user)
+
+
 @rules.predicate
 def has_delete_friend_request(user, friend_request):
     """Права на удаление запроса."""
@@ -60,10 +106,35 @@ def has_delete_friend_request(user, friend_request):
     return False
 
 
-rules.set_perm('nova_account.view_friendrequest', has_view_friend_request)
-rules.set_perm('nova_account.add_friendrequest', is_authenticated)
-rules.set_perm('nova_account.confirm_friendrequest', has_confirm_friend_request)
-rules.set_perm('nova_account.reject_friendrequest', has_reject_friend_request)
-rules.set_perm('nova_account.cancel_friendrequest', has_cancel_friend_request)
-rules.set_perm('nova_account.delete_friendrequest', has_delete_friend_request)
-rules.set_perm('nova_account.list_friendrequest', is_authenticated)
+def delete_friend_request_filter(user) -> Q:
+    """Фильтр для has_delete_friend_request."""
+    status_filter = Q(status=FriendRequestStatus.CONFIRMED)
+    if user.is_superuser:
+        return status_filter
+    return status_filter & sending_user_filter(user)
+
+
+# Фильтры по типу права (как в permission_type_map).
+friend_request_filters = {
+    'view': view_friend_request_filter,
+    'list': view_friend_request_filter,
+    'confirm': confirm_friend_request_filter,
+    'reject': reject_friend_request_filter,
+    'cancel': cancel_friend_request_filter,
+    'delete': delete_friend_request_filter,
+}
+
+# Фильтры для массовых действий по новому статусу запроса.
+friend_request_action_filters = {
+    FriendRequestStatus.CONFIRMED: confirm_friend_request_filter,
+    FriendRequestStatus.REJECTED: reject_friend_request_filter,
+    FriendRequestStatus.CANCELED: cancel_friend_request_filter,
+}
+
+rules.set_perm('nova_friend.view_friendrequest', has_view_friend_request)
+rules.set_perm('nova_friend.add_friendrequest', is_authenticated)
+rules.set_perm('nova_friend.confirm_friendrequest', has_confirm_friend_request)
+rules.set_perm('nova_friend.reject_friendrequest', has_reject_friend_request)
+rules.set_perm('nova_friend.cancel_friendrequest', has_cancel_friend_request)
+rules.set_perm('nova_friend.delete_friendrequest', has_delete_friend_request)
+rules.set_perm('nova_friend.list_friendrequest', is_authenticated)
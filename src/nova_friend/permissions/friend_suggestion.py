@@ -0,0 +1,15 @@
+import rules
+from rules.predicates import is_authenticated, is_superuser
+
+
+@rules.predicate
+def is_suggestion_user(user, friend_suggestion):
+    """Пользователь, которому предложен возможный друг."""
+    return user.id == friend_suggestion.user_id
+
+
+rules.set_perm(
+    'nova_friend.view_friendsuggestion',
+    is_superuser | is_suggestion_user,
+)
+rules.set_perm('nova_friend.list_friendsuggestion', is_authenticated)
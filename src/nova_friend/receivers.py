@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from nova_friend.models import ReferralCode
+from nova_friend.services.contact_index import CONTACT_FIELDS, index_users
+from nova_friend.services.resolve_referral_code import (
+    invalidate_referral_codes,
+)
+
+User = get_user_model()
+
+
+@receiver(post_init, sender=ReferralCode)
+def remember_referral_code(sender, instance, **kwargs):
+    """Запоминаем загруженный код, чтобы сбросить его кэш после изменения.
+
+    Отложенное поле code не читается, чтобы не делать запрос к БД.
+    """
+    loaded_code = instance.__dict__.get('code')  # noqa: WPS609
+    instance._loaded_code = loaded_code  # noqa: WPS437
+
+
+@receiver(post_save, sender=ReferralCode)
+def invalidate_saved_referral_code(sender, instance, **kwargs):
+    """Сброс кэша кода, в том числе кэша отсутствия нового кода."""
+    loaded_code = getattr(instance, '_loaded_code', None)
+    invalidate_referral_codes({instance.code, loaded_code} - {None})
+    instance._loaded_code = instance.code  # noqa: WPS437
+
+
+@receiver(post_delete, sender=ReferralCode)
+def invalidate_deleted_referral_code(sender, instance, **kwargs):
+    """Сброс кэша удаленного кода."""
+    invalidate_referral_codes([instance.code])
+
+
+@receiver(post_save, sender=User)
+def index_saved_user_contacts(
+    sender,
+    instance,
+    raw=False,
+    update_fields=None,
+    **kwargs,
+):
+    """Обновление индекса контактов после изменения email или телефона.
+
+    Сохранение без контактов в update_fields (например, last_login) не
+    обращается к индексу. Без изменений - одно чтение записей индекса.
+    """
+    if raw:
+        return
+    if update_fields is not None and not CONTACT_FIELDS & set(update_fields):
+        return
+    index_users([instance])
@@ -1,10 +1,21 @@
 from typing import Optional
 
 from django.conf import settings
+from django.contrib.auth import get_user_model
 
 
 def get_absolute_url_before_avatar(avatar) -> Optional[str]:
-    """Абсолютный путь до фотографии пользователя."""
-    if avatar:
-        return f'https://{settings.DOMAIN_NAME}{avatar.url}'  # type: ignore
-    return None
+    """Абсолютный путь до фотографии пользователя.
+
+    avatar - файл поля avatar или путь к файлу (значение столбца).
+    """
+    if not avatar:
+        return None
+    if isinstance(avatar, str):
+        storage = get_user_model()._meta.get_field(  # noqa: WPS437
+            'avatar',
+        ).storage
+        avatar_url = storage.url(avatar)
+    else:
+        avatar_url = avatar.url
+    return f'https://{settings.DOMAIN_NAME}{avatar_url}'  # type: ignore
@@ -1,11 +1,32 @@
 import uuid
+from typing import Dict, Iterable, List, Optional, Union
 
+from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from rest_framework.exceptions import NotFound
 
-from nova_friend import signals
 from nova_friend.models import FriendRequest
+from nova_friend.permissions.friend_request import (
+    friend_request_action_filters,
+)
 from nova_friend.services.enums import FriendRequestStatus
+from nova_friend.services.friend_counters import (
+    count_removed_friendships,
+    count_resolved_requests,
+)
+from nova_friend.services.friend_request_transition import (
+    transition_friend_request,
+    transition_friend_requests,
+)
+from nova_friend.services.friendship import (
+    add_friendship,
+    add_friendships,
+    remove_friendship,
+)
+from nova_friend.services.signal_dispatch import dispatch_signal
+
+User = get_user_model()
 
 
 def friend_request_by_token(token: uuid.UUID) -> FriendRequest:
@@ -19,26 +40,122 @@ def friend_request_by_token(token: uuid.UUID) -> FriendRequest:
         raise NotFound(_('Запрос на добавление в друзья не найден.'))
 
 
+@transaction.atomic
 def friend_request_action(
     token: uuid.UUID,
     status: str,
+    user: Optional[User] = None,
 ) -> None:
-    """Логика подтверждения запроса в друзья."""
-    # Получаем FriendRequest по токену, если он существует.
-    friend_request = friend_request_by_token(token)
+    """Логика подтверждения запроса в друзья.
+
+    Смена статуса (или удаление при отказе и отмене) выполняется одним
+    запросом только для ожидающего FriendRequest. Если указан user, права
+    проверяются в том же запросе, как в bulk_friend_request_action.
+    """
+    permission_filter = None
+    if user is not None:
+        permission_filter = friend_request_action_filters[status](user)
+    friend_request = transition_friend_request(
+        token=token,
+        status=status,
+        permission_filter=permission_filter,
+    )
+    if friend_request is None:
+        raise NotFound(_('Запрос на добавление в друзья не найден.'))
 
-    # Меняем статус приглашения в друзья.
-    friend_request.status = status
-    friend_request.save(update_fields=['status'])
+    if status == FriendRequestStatus.CONFIRMED:
+        # Добавляем ребро в граф друзей в той же транзакции.
+        add_friendship(
+            user_id=friend_request.sending_user_id,
+            friend_id=friend_request.receiving_user_id,
+        )
+    count_resolved_requests(
+        [(friend_request.sending_user_id, friend_request.receiving_user_id)],
+        confirmed=status == FriendRequestStatus.CONFIRMED,
+    )
 
-    signals.friend_request_action.send(
+    dispatch_signal(
+        'friend_request_action',
         sender='friend_request_action',
         status=status,
         friend_request_id=friend_request.id,
-        sending_user_id=friend_request.sending_user.id,
-        receiving_user_id=friend_request.receiving_user.id,
+        sending_user_id=friend_request.sending_user_id,
+        receiving_user_id=friend_request.receiving_user_id,
     )
 
-    if status in {FriendRequestStatus.CANCELED, FriendRequestStatus.REJECTED}:
-        # Удаляем запрос в друзья.
-        friend_request.delete()
+
+@transaction.atomic
+def bulk_friend_request_action(
+    tokens: Iterable[uuid.UUID],
+    status: str,
+    user: User,
+) -> List[Dict[str, Union[uuid.UUID, bool]]]:
+    """Массовое подтверждение, отказ или отмена запросов в друзья.
+
+    Права проверяются в том же запросе, который меняет строки: обычный
+    пользователь затрагивает только запросы, где он получатель
+    (подтверждение, отказ) или отправитель (отмена). Отправляется один
+    сигнал friend_request_bulk_action на все измененные запросы.
+
+    Возвращает результат для каждого token: success=False, если запрос не
+    найден, уже обработан или недоступен пользователю.
+    """
+    tokens = list(dict.fromkeys(tokens))
+    friend_requests = transition_friend_requests(
+        tokens=tokens,
+        status=status,
+        permission_filter=friend_request_action_filters[status](user),
+    )
+
+    pairs = [
+        (friend_request.sending_user_id, friend_request.receiving_user_id)
+        for friend_request in friend_requests
+    ]
+    if pairs and status == FriendRequestStatus.CONFIRMED:
+        add_friendships(pairs)
+    count_resolved_requests(
+        pairs,
+        confirmed=status == FriendRequestStatus.CONFIRMED,
+    )
+
+    if friend_requests:
+        dispatch_signal(
+            'friend_request_bulk_action',
+            sender='friend_request_bulk_action',
+            status=status,
+            friend_requests=[
+                {
+                    'friend_request_id': friend_request.id,
+                    'sending_user_id': friend_request.sending_user_id,
+                    'receiving_user_id': friend_request.receiving_user_id,
+                }
+                for friend_request in friend_requests
+            ],
+        )
+
+    processed = {friend_request.token for friend_request in friend_requests}
+    return [
+        {'token': token, 'success': token in processed}
+        for token in tokens
+    ]
+
+
+@transaction.atomic
+def delete_friend_request(friend_request: FriendRequest) -> None:
+    """Удаление запроса в друзья.
+
+    Удаление подтвержденного запроса прекращает дружбу.
+    """
+    confirmed = friend_request.status == FriendRequestStatus.CONFIRMED
+    if confirmed:
+        remove_friendship(
+            user_id=friend_request.sending_user_id,
+            friend_id=friend_request.receiving_user_id,
+        )
+    friend_request.delete()
+
+    pairs = [(friend_request.sending_user_id, friend_request.receiving_user_id)]
+    if confirmed:
+        count_removed_friendships(pairs)
+    elif friend_request.status == FriendRequestStatus.PENDING:
+        count_resolved_requests(pairs, confirmed=False)
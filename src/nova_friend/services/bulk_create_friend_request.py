@@ -0,0 +1,182 @@
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+
+from nova_friend.models import FriendRequest, Friendship
+from nova_friend.services.contact_index import user_ids_by_contacts
+from nova_friend.services.contacts import (
+    is_email_contact,
+    normalize_email,
+    normalize_phone,
+    phone_cache_info,
+)
+from nova_friend.services.enums import (
+    FriendRequestContactResult,
+    FriendRequestStatus,
+)
+from nova_friend.services.friend_counters import count_created_requests
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+# Нормализованный контакт: ('email' | 'phone', значение).
+NormalizedContact = Tuple[str, str]
+
+
+def _normalize_contact(
+    contact: str,
+    locale: str,
+) -> Optional[NormalizedContact]:
+    """Нормализованный контакт или None, если контакт некорректен."""
+    if is_email_contact(contact):
+        email = normalize_email(contact)
+        return ('email', email) if email else None
+    phone = normalize_phone(contact, locale)
+    return ('phone', phone) if phone else None
+
+
+def _user_ids_by_contact(
+    normalized: List[Optional[NormalizedContact]],
+) -> Dict[NormalizedContact, int]:
+    """Id пользователей по нормализованным контактам одним запросом.
+
+    Поиск по индексу хэшей контактов (ContactHash).
+    """
+    return user_ids_by_contacts(
+        {contact for contact in normalized if contact},
+    )
+
+
+def _related_user_ids(
+    sending_user: User,
+    user_ids: Set[int],
+) -> Tuple[Set[int], Set[int]]:
+    """Id друзей и id пользователей с запросом в друзья среди user_ids.
+
+    Запрос в любом направлении. Подтвержденный запрос означает дружбу.
+    """
+    friend_ids = set(
+        Friendship.objects.filter(
+            user_id=sending_user.id,
+            friend_id__in=user_ids,
+        ).values_list('friend_id', flat=True),
+    )
+    requests = FriendRequest.objects.filter(
+        models.Q(
+            sending_user_id=sending_user.id,
+            receiving_user_id__in=user_ids,
+        ) | models.Q(
+            receiving_user_id=sending_user.id,
+            sending_user_id__in=user_ids,
+        ),
+    ).values_list('sending_user_id', 'receiving_user_id', 'status')
+
+    pending_ids = set()
+    for sending_user_id, receiving_user_id, status in requests:
+        other_id = (
+            receiving_user_id
+            if sending_user_id == sending_user.id
+            else sending_user_id
+        )
+        if status == FriendRequestStatus.CONFIRMED:
+            friend_ids.add(other_id)
+        else:
+            pending_ids.add(other_id)
+    return friend_ids, pending_ids
+
+
+def _insert_requests(new_requests: List[FriendRequest]) -> Set[str]:
+    """Вставка запросов в друзья одним запросом, token вставленных строк.
+
+    Запрос, созданный параллельно, не даст создать уникальный индекс по
+    паре пользователей - такие строки пропускаются. Вставленные строки
+    выбираются по token (уникальный индекс), счетчики меняются только
+    для них.
+    """
+    if not new_requests:
+        return set()
+    FriendRequest.objects.bulk_create(new_requests, ignore_conflicts=True)
+    tokens = {request.token: request for request in new_requests}
+    created = [
+        tokens[token]
+        for token in FriendRequest.objects.filter(
+            token__in=tokens,
+        ).values_list('token', flat=True)
+    ]
+    count_created_requests([
+        (request.sending_user_id, request.receiving_user_id)
+        for request in created
+    ])
+    return {str(request.token) for request in created}
+
+
+@transaction.atomic
+def bulk_create_friend_requests(  # noqa: WPS210
+    contacts: List[str],
+    sending_user: User,
+    locale: str,
+) -> List[Dict[str, Optional[str]]]:
+    """Создание запросов в друзья по списку контактов (адресной книге).
+
+    Все контакты нормализуются заранее (email в нижнем регистре, телефон в
+    E.164), пользователи, дружба и существующие запросы ищутся одним
+    запросом на каждую сущность, новые запросы создаются через bulk_create.
+
+    Сигналы приглашения для ненайденных контактов не отправляются:
+    клиент получает результат not_found и сам решает, кого пригласить.
+
+    Возвращает результат для каждого контакта в исходном порядке:
+    contact, result (FriendRequestContactResult) и token созданного запроса.
+    Если запрос пары создан параллельно, результат - pending без token.
+    """
+    cache_info = phone_cache_info()
+    normalized = [_normalize_contact(contact, locale) for contact in contacts]
+    logger.info(
+        'Нормализовано контактов: %s, кэш номеров: %s.',
+        len(contacts),
+        phone_cache_info().since(cache_info),
+    )
+    user_ids = _user_ids_by_contact(normalized)
+    friend_ids, pending_ids = _related_user_ids(
+        sending_user,
+        set(user_ids.values()),
+    )
+
+    results = []
+    new_requests = []
+    for contact, normalized_contact in zip(contacts, normalized):
+        receiving_user_id = user_ids.get(normalized_contact)
+        token = None
+        if normalized_contact is None:
+            result = FriendRequestContactResult.INVALID
+        elif receiving_user_id is None:
+            result = FriendRequestContactResult.NOT_FOUND
+        elif receiving_user_id == sending_user.id:
+            result = FriendRequestContactResult.SELF
+        elif receiving_user_id in friend_ids:
+            result = FriendRequestContactResult.ALREADY_FRIENDS
+        elif receiving_user_id in pending_ids:
+            result = FriendRequestContactResult.PENDING
+        else:
+            friend_request = FriendRequest(
+                sending_user_id=sending_user.id,
+                receiving_user_id=receiving_user_id,
+                contact=contact,
+            )
+            new_requests.append(friend_request)
+            # Повторный контакт того же пользователя в этом же списке.
+            pending_ids.add(receiving_user_id)
+            result = FriendRequestContactResult.CREATED
+            token = str(friend_request.token)
+        results.append({'contact': contact, 'result': result, 'token': token})
+
+    created = _insert_requests(new_requests)
+    for contact_result in results:
+        token = contact_result['token']
+        if token is not None and token not in created:
+            contact_result['result'] = FriendRequestContactResult.PENDING
+            contact_result['token'] = None
+    return results
@@ -1,33 +1,82 @@
+from typing import Optional, Tuple
+
 from django.contrib.auth import get_user_model
+from django.db.models.functions import Greatest, Least
 from django.utils.translation import gettext_lazy as _
 from rest_framework.exceptions import ValidationError
 
 from nova_friend.models import FriendRequest
+from nova_friend.services.enums import FriendRequestMode, FriendRequestStatus
 
 User = get_user_model()
 
+ALREADY_FRIENDS = _('Пользователь уже добавлен в Ближний круг.')
+ALREADY_SENT = _('Вы уже отправили запрос пользователю. Дождитесь ответа.')
+ALREADY_RECEIVED = _(
+    'Вам отправлен запрос в друзья от пользователю. Примите решение.',
+)
 
-def check_if_exists_friend_request(
+
+def friend_request_by_pair(
+    sending_user: User,
+    receiving_user: User,
+) -> Tuple[Optional[FriendRequest], Optional[FriendRequestMode]]:
+    """Запрос в друзья между двумя пользователями в любом направлении.
+
+    Один запрос к БД по индексу (LEAST(...), GREATEST(...)). Возвращает
+    запрос и его тип относительно sending_user: OUTCOMING - прямой запрос,
+    INCOMING - обратный. Если запроса нет - (None, None).
+    """
+    user_ids = (sending_user.id, receiving_user.id)
+    friend_request = FriendRequest.objects.alias(
+        low_user_id=Least('sending_user', 'receiving_user'),
+        high_user_id=Greatest('sending_user', 'receiving_user'),
+    ).filter(
+        low_user_id=min(user_ids),
+        high_user_id=max(user_ids),
+    ).first()
+
+    if friend_request is None:
+        return None, None
+    if friend_request.sending_user_id == sending_user.id:
+        return friend_request, FriendRequestMode.OUTCOMING
+    return friend_request, FriendRequestMode.INCOMING
+
+
+def check_friend_request_pair(
     sending_user: User,
     receiving_user: User,
 ) -> None:
-    """Проверка того, что запрос в друзья уже существует."""
-    try:
-        friend_request = FriendRequest.objects.get(
-            sending_user=sending_user,
-            receiving_user=receiving_user,
-        )
-    except FriendRequest.DoesNotExist:
+    """Проверка того, что между пользователями нет запроса в друзья."""
+    friend_request, request_mode = friend_request_by_pair(
+        sending_user=sending_user,
+        receiving_user=receiving_user,
+    )
+    if friend_request is None:
         return
 
-    if friend_request.is_approved:
-        raise ValidationError(
-            _('Пользователь уже добавлен в Ближний круг.'),
-        )
+    if friend_request.status == FriendRequestStatus.CONFIRMED:
+        raise ValidationError(ALREADY_FRIENDS)
+    if request_mode == FriendRequestMode.OUTCOMING:
+        raise ValidationError(ALREADY_SENT)
+    raise ValidationError(ALREADY_RECEIVED)
 
-    raise ValidationError(
-        _('Вы уже отправили запрос пользователю. Дождитесь ответа.'),
+
+def check_if_exists_friend_request(
+    sending_user: User,
+    receiving_user: User,
+) -> None:
+    """Проверка того, что запрос в друзья уже существует."""
+    friend_request, request_mode = friend_request_by_pair(
+        sending_user=sending_user,
+        receiving_user=receiving_user,
     )
+    if request_mode != FriendRequestMode.OUTCOMING:
+        return
+
+    if friend_request.status == FriendRequestStatus.CONFIRMED:
+        raise ValidationError(ALREADY_FRIENDS)
+    raise ValidationError(ALREADY_SENT)
 
 
 def check_if_reverse_exists_friend_request(
@@ -35,19 +84,13 @@ def check_if_reverse_exists_friend_request(
     receiving_user: User,
 ) -> None:
     """Проверка того, что обратный запрос в друзья уже существует."""
-    try:
-        friend_request = FriendRequest.objects.get(
-            sending_user=receiving_user,
-            receiving_user=sending_user,
-        )
-    except FriendRequest.DoesNotExist:
+    friend_request, request_mode = friend_request_by_pair(
+        sending_user=sending_user,
+        receiving_user=receiving_user,
+    )
+    if request_mode != FriendRequestMode.INCOMING:
         return
 
-    if friend_request.is_approved:
-        raise ValidationError(
-            _('Пользователь уже добавлен в Ближний круг.'),
-        )
-
-    raise ValidationError(
-        _('Вам отправлен запрос в друзья от пользователю. Примите решение.'),
-    )
+    if friend_request.status == FriendRequestStatus.CONFIRMED:
+        raise ValidationError(ALREADY_FRIENDS)
+    raise ValidationError(ALREADY_RECEIVED)
@@ -0,0 +1,232 @@
+import hashlib
+import hmac
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Lower
+
+from nova_friend.models import ContactHash
+from nova_friend.services.contacts import normalize_email, normalize_phone
+from nova_friend.services.enums import ContactKind
+
+User = get_user_model()
+
+LOOKUP_MAX_HASHES = getattr(
+    settings,
+    'NOVA_FRIEND_CONTACT_LOOKUP_MAX_HASHES',
+    5000,
+)
+# Поля пользователя, от которых зависят записи индекса.
+CONTACT_FIELDS = frozenset(('email', 'phone'))
+
+# Запись индекса: (id пользователя, вид контакта, хэш).
+IndexEntry = Tuple[int, str, str]
+
+
+def contact_hash_key() -> bytes:
+    """Ключ HMAC хэшей контактов (NOVA_FRIEND_CONTACT_HASH_KEY).
+
+    Хэш считают и клиенты, поэтому ключ попадает в клиентские сборки и не
+    может совпадать с SECRET_KEY. После смены ключа индекс перестраивается
+    командой backfill_contact_index.
+    """
+    key = getattr(settings, 'NOVA_FRIEND_CONTACT_HASH_KEY', '')
+    if not key:
+        raise ImproperlyConfigured(
+            'Не задан ключ хэшей контактов NOVA_FRIEND_CONTACT_HASH_KEY.',
+        )
+    return key.encode()
+
+
+def contact_hash(contact: str) -> str:
+    """HMAC-SHA256 нормализованного контакта в hex."""
+    return hmac.new(
+        contact_hash_key(),
+        contact.encode(),
+        hashlib.sha256,
+    ).hexdigest()
+
+
+def user_contacts(user: User) -> Dict[str, str]:
+    """Нормализованные контакты пользователя по виду контакта.
+
+    Телефон хранится в E.164, регион LANGUAGE_CODE нужен только номерам
+    без кода страны.
+    """
+    contacts = {}
+    email = getattr(user, 'email', None)
+    if email:
+        contacts[ContactKind.EMAIL] = normalize_email(email)
+    phone = getattr(user, 'phone', None)
+    if phone:
+        contacts[ContactKind.PHONE] = normalize_phone(
+            str(phone),
+            settings.LANGUAGE_CODE,
+        )
+    return {kind: value for kind, value in contacts.items() if value}
+
+
+@transaction.atomic
+def index_users(users: List[User]) -> int:
+    """Привести записи индекса пользователей users к их контактам.
+
+    Одно чтение записей пользователей; удаляются и создаются только
+    изменившиеся записи. Возвращает количество удаленных и созданных
+    записей.
+    """
+    wanted: Set[IndexEntry] = {
+        (user.id, kind, contact_hash(value))
+        for user in users
+        for kind, value in user_contacts(user).items()
+    }
+    user_ids = {user.id for user in users}
+    existing = {
+        (user_id, kind, digest): pk
+        for pk, user_id, kind, digest in ContactHash.objects.filter(
+            user_id__in=user_ids,
+        ).values_list('pk', 'user_id', 'kind', 'digest')
+    }
+    stale = [pk for entry, pk in existing.items() if entry not in wanted]
+    created = [entry for entry in wanted if entry not in existing]
+    if stale:
+        ContactHash.objects.filter(pk__in=stale).delete()
+    ContactHash.objects.bulk_create([
+        ContactHash(user_id=user_id, kind=kind, digest=digest)
+        for user_id, kind, digest in created
+    ])
+    return len(stale) + len(created)
+
+
+def _chunk_users(after_user_id: int, chunk_size: int) -> List[User]:
+    """Следующие chunk_size пользователей."""
+    return list(
+        User.objects.filter(
+            id__gt=after_user_id,
+        ).order_by('id')[:chunk_size],
+    )
+
+
+def backfill_contact_index(chunk_size: int) -> int:
+    """Построение индекса контактов для всех пользователей.
+
+    Пользователи обрабатываются пачками по chunk_size, каждая пачка - в
+    отдельной транзакции. Повторный запуск исправляет только
+    расхождения. Возвращает количество измененных записей.
+    """
+    total = 0
+    users = _chunk_users(0, chunk_size)
+    while users:
+        total += index_users(users)
+        users = _chunk_users(users[-1].id, chunk_size)
+    return total
+
+
+def _has_user_field(name: str) -> bool:
+    """Есть ли у модели пользователя поле name."""
+    try:
+        User._meta.get_field(name)  # noqa: WPS437
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def _users_by_columns(
+    contacts: Set[Tuple[str, str]],
+) -> Dict[Tuple[str, str], User]:
+    """Запасной поиск по столбцам email и phone модели пользователя.
+
+    Нужен для пользователей, которых нет в индексе: изменены через
+    update() или bulk_create, которые не отправляют post_save. Найденные
+    пользователи добавляются в индекс, повторный поиск идет по нему.
+    """
+    emails = {value for kind, value in contacts if kind == ContactKind.EMAIL}
+    phones = {value for kind, value in contacts if kind == ContactKind.PHONE}
+    condition = models.Q(pk__in=[])
+    if emails:
+        condition |= models.Q(lower_email__in=emails)
+    if phones and _has_user_field('phone'):
+        condition |= models.Q(phone__in=phones)
+    users = list(
+        User.objects.annotate(
+            lower_email=Lower('email'),
+        ).filter(condition).order_by('id'),
+    )
+    if not users:
+        return {}
+
+    try:
+        with transaction.atomic():
+            index_users(users)
+    except IntegrityError:
+        # Запись индекса уже добавлена параллельным поиском.
+        pass  # noqa: WPS420
+    found: Dict[Tuple[str, str], User] = {}
+    for user in users:
+        for contact in user_contacts(user).items():
+            if contact in contacts:
+                found.setdefault(contact, user)
+    return found
+
+
+def user_ids_by_contacts(
+    contacts: Iterable[Tuple[str, str]],
+) -> Dict[Tuple[str, str], int]:
+    """Id пользователей по нормализованным контактам (вид, значение).
+
+    Один запрос по индексу хэшей. Если контакт есть у нескольких
+    пользователей, выбирается пользователь с меньшим id. Контакты без
+    записи в индексе ищутся по столбцам пользователя (_users_by_columns).
+    """
+    by_key = {
+        (kind, contact_hash(value)): (kind, value)
+        for kind, value in contacts
+    }
+    if not by_key:
+        return {}
+    user_ids: Dict[Tuple[str, str], int] = {}
+    rows = ContactHash.objects.filter(
+        digest__in={digest for _, digest in by_key},
+    ).order_by('user_id').values_list('kind', 'digest', 'user_id')
+    for kind, digest, user_id in rows:
+        contact = by_key.get((kind, digest))
+        if contact is not None:
+            user_ids.setdefault(contact, user_id)
+
+    missing = set(by_key.values()) - set(user_ids)
+    if missing:
+        user_ids.update(
+            (contact, user.id)
+            for contact, user in _users_by_columns(missing).items()
+        )
+    return user_ids
+
+
+def user_by_contact(kind: str, contact: str) -> Optional[User]:
+    """Пользователь по нормализованному контакту.
+
+    Один запрос по индексу, при промахе - запасной поиск по столбцам
+    пользователя (_users_by_columns).
+    """
+    user = User.objects.filter(
+        contact_hashes__kind=kind,
+        contact_hashes__digest=contact_hash(contact),
+    ).order_by('id').first()
+    if user is None:
+        user = _users_by_columns({(kind, contact)}).get((kind, contact))
+    return user
+
+
+def registered_contact_hashes(digests: Iterable[str]) -> List[str]:
+    """Зарегистрированные хэши из digests.
+
+    Один запрос digest IN (...) по индексу, сколько бы хэшей ни
+    передал клиент. Id пользователей не возвращаются.
+    """
+    return list(
+        ContactHash.objects.filter(
+            digest__in={digest.lower() for digest in digests},
+        ).order_by('digest').values_list('digest', flat=True).distinct(),
+    )
@@ -0,0 +1,114 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import phonenumbers
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+# Размер LRU-кэша нормализованных номеров телефонов.
+PHONE_CACHE_SIZE = getattr(settings, 'NOVA_FRIEND_PHONE_CACHE_SIZE', 10000)
+
+
+class PhoneError(models.TextChoices):
+    """Ошибка нормализации номера телефона."""
+
+    NOT_A_NUMBER = 'not_a_number', _('Строка не является номером телефона')
+    INVALID_NUMBER = 'invalid_number', _('Номер телефона не существует')
+
+
+class NormalizedPhone(NamedTuple):
+    """Результат нормализации номера: E.164 или ошибка."""
+
+    phone: Optional[str]
+    error: Optional[PhoneError]
+
+
+class PhoneCacheInfo(NamedTuple):
+    """Статистика кэша нормализации номеров."""
+
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+
+    def since(self, before: 'PhoneCacheInfo') -> 'PhoneCacheInfo':
+        """Попадания и промахи после снимка before.
+
+        Кэш общий для процесса, поэтому при параллельной работе в разницу
+        попадают и чужие обращения.
+        """
+        return self._replace(
+            hits=self.hits - before.hits,
+            misses=self.misses - before.misses,
+        )
+
+    def __str__(self):
+        return (
+            f'попаданий {self.hits}, промахов {self.misses}, ' +
+            f'размер {self.size}/{self.max_size}'
+        )
+
+
+def is_email_contact(contact: str) -> bool:
+    """Contact содержит электронную почту."""
+    return '@' in contact
+
+
+def normalize_email(contact: str) -> Optional[str]:
+    """Электронная почта в нижнем регистре или None, если она некорректна."""
+    email = contact.strip().lower()
+    try:
+        validate_email(email)
+    except DjangoValidationError:
+        return None
+    return email
+
+
+def _region(locale: str) -> str:
+    """Регион для разбора номера по locale (ru -> RU, en-us -> US)."""
+    return locale.replace('_', '-').split('-')[-1].upper()
+
+
+@lru_cache(maxsize=PHONE_CACHE_SIZE)
+def normalize_phone_number(contact: str, locale: str) -> NormalizedPhone:
+    """Нормализация номера телефона в E.164.
+
+    Разбор номера через метаданные phonenumbers дорогой, поэтому результат
+    кэшируется по (contact, locale) и используется и для валидации, и для
+    поиска пользователя. Перед разбором удаляем все, кроме цифр и знака +
+    в начале строки.
+    """
+    mb_numbers = ''.join(re.findall(r'^\+|\d', contact.strip()))
+    try:
+        number = phonenumbers.parse(mb_numbers, _region(locale))
+    except phonenumbers.phonenumberutil.NumberParseException:
+        return NormalizedPhone(phone=None, error=PhoneError.NOT_A_NUMBER)
+    if not phonenumbers.is_valid_number(number):
+        return NormalizedPhone(phone=None, error=PhoneError.INVALID_NUMBER)
+    return NormalizedPhone(
+        phone=phonenumbers.format_number(
+            number,
+            phonenumbers.PhoneNumberFormat.E164,
+        ),
+        error=None,
+    )
+
+
+def normalize_phone(contact: str, locale: str) -> Optional[str]:
+    """Номер телефона в формате E.164 или None, если он некорректен."""
+    return normalize_phone_number(contact, locale).phone
+
+
+def phone_cache_info() -> PhoneCacheInfo:
+    """Попадания и промахи кэша нормализации номеров."""
+    cache_info = normalize_phone_number.cache_info()
+    return PhoneCacheInfo(
+        hits=cache_info.hits,
+        misses=cache_info.misses,
+        size=cache_info.currsize,
+        max_size=cache_info.maxsize,
+    )
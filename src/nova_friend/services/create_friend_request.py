@@ -1,14 +1,17 @@
 from typing import Any, Dict
 
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 from django.utils.translation import gettext_lazy as _
 from rest_framework.exceptions import ValidationError
 
 from nova_friend.models import FriendRequest
 from nova_friend.services.check_friend_request import (
-    check_if_exists_friend_request,
-    check_if_reverse_exists_friend_request,
+    ALREADY_SENT,
+    check_friend_request_pair,
 )
+from nova_friend.services.friend_counters import count_created_requests
+from nova_friend.services.friendship import are_friends
 from nova_friend.services.receiver import Receiver
 
 User = get_user_model()
@@ -31,26 +34,36 @@ def create_friend_request(
         raise ValidationError(
             _('Вы пытаетесь отправить запрос самому себе.'),
         )
-    if receiving_user in sending_user.friends.all():
+    if are_friends(sending_user.id, receiving_user.id):
         raise ValidationError(
             _('Пользователь уже добавлен в Ближний круг.'),
         )
 
-    # Проверяем, что FriendRequest с receiving_user и sending_user нет в БД.
-    check_if_exists_friend_request(
-        sending_user=sending_user,
-        receiving_user=receiving_user,
-    )
-    check_if_reverse_exists_friend_request(
+    # Проверяем, что FriendRequest между receiving_user и sending_user
+    # (в любом направлении) нет в БД.
+    check_friend_request_pair(
         sending_user=sending_user,
         receiving_user=receiving_user,
     )
 
-    return FriendRequest.objects.create(
-        sending_user=sending_user,
-        receiving_user=receiving_user,
-        contact=validated_data['contact'],
-        message=validated_data.get('message', ''),
-    )
+    # Параллельный запрос мог успеть создать FriendRequest после проверки.
+    # Дубликат не даст создать уникальный индекс по паре пользователей.
+    try:
+        with transaction.atomic():
+            friend_request = FriendRequest.objects.create(
+                sending_user=sending_user,
+                receiving_user=receiving_user,
+                contact=validated_data['contact'],
+                message=validated_data.get('message', ''),
+            )
+            count_created_requests([(sending_user.id, receiving_user.id)])
+    except IntegrityError:
+        # Сообщаем о запросе, созданном параллельно: прямом или обратном.
+        check_friend_request_pair(
+            sending_user=sending_user,
+            receiving_user=receiving_user,
+        )
+        raise ValidationError(ALREADY_SENT)
+    return friend_request
 
 
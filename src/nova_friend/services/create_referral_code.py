@@ -1,20 +1,80 @@
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from django.contrib.auth import get_user_model
-from django.utils.crypto import get_random_string
+from django.db import connection, transaction
 
 from nova_friend.models import ReferralCode
+from nova_friend.services.referral_code_generator import (
+    REFERRAL_CODE_SEQUENCE,
+    referral_code_for,
+    referral_code_key,
+)
+from nova_friend.services.resolve_referral_code import (
+    invalidate_referral_codes,
+)
 
 User = get_user_model()
 
+SEQUENCE_VALUES_SQL = 'SELECT nextval(%s) FROM generate_series(1, %s)'
+
+
+def _sequence_values(count: int) -> List[int]:
+    """count следующих значений последовательности одним запросом."""
+    with connection.cursor() as cursor:
+        cursor.execute(SEQUENCE_VALUES_SQL, [REFERRAL_CODE_SEQUENCE, count])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def generate_referral_codes(count: int) -> List[str]:
+    """count новых реферальных кодов.
+
+    Коды получаются перестановкой значений последовательности и не
+    совпадают между собой. Один запрос проверяет совпадения с кодами,
+    выданными до перехода на последовательность (или с другим ключом),
+    такие коды заменяются следующими значениями.
+    """
+    key = referral_code_key()
+    codes: List[str] = []
+    while len(codes) < count:
+        candidates = [
+            referral_code_for(sequence_value, key)
+            for sequence_value in _sequence_values(count - len(codes))
+        ]
+        existing = set(
+            ReferralCode.objects.filter(
+                code__in=candidates,
+            ).values_list('code', flat=True),
+        )
+        codes.extend(code for code in candidates if code not in existing)
+    return codes
+
 
 def create_referral_code(validated_data: Dict[str, Any]) -> ReferralCode:
     """Создание реферального кода."""
-    created = False
-    while created is False:
-        code = get_random_string(8).upper()
-        referral_code, created = ReferralCode.objects.get_or_create(
-            code=code,
-            defaults=validated_data,
-        )
-    return referral_code
+    return ReferralCode.objects.create(
+        code=generate_referral_codes(1)[0],
+        **validated_data,
+    )
+
+
+@transaction.atomic
+def bulk_create_referral_codes(
+    user: User,
+    count: int,
+    note: str = '',
+) -> List[ReferralCode]:
+    """Создание count реферальных кодов пользователя одной вставкой.
+
+    Для кампаний, которым нужны тысячи кодов. bulk_create не отправляет
+    post_save, поэтому кэш отсутствия новых кодов сбрасывается здесь.
+    """
+    referral_codes = ReferralCode.objects.bulk_create(
+        [
+            ReferralCode(user=user, code=code, note=note)
+            for code in generate_referral_codes(count)
+        ],
+    )
+    invalidate_referral_codes(
+        referral_code.code for referral_code in referral_codes
+    )
+    return referral_codes
@@ -16,3 +16,28 @@ class FriendRequestMode(models.TextChoices):
 
     INCOMING = 'incoming', _('Входящий')
     OUTCOMING = 'outcoming', _('Исходящий')
+
+
+class FriendRequestContactResult(models.TextChoices):
+    """Результат создания запроса в друзья по контакту."""
+
+    CREATED = 'created', _('Запрос создан')
+    ALREADY_FRIENDS = 'already_friends', _('Уже друзья')
+    PENDING = 'pending', _('Запрос уже существует')
+    NOT_FOUND = 'not_found', _('Пользователь не найден')
+    INVALID = 'invalid', _('Некорректный контакт')
+    SELF = 'self', _('Контакт принадлежит отправителю')
+
+
+class SignalDispatchMode(models.TextChoices):
+    """Способ отправки сигналов nova_friend."""
+
+    SYNC = 'sync', _('Синхронно, в момент вызова')
+    ASYNC = 'async', _('Задачей Celery после фиксации транзакции')
+
+
+class ContactKind(models.TextChoices):
+    """Вид контакта в индексе контактов."""
+
+    EMAIL = 'email', _('Электронная почта')
+    PHONE = 'phone', _('Телефон')
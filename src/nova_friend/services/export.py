@@ -0,0 +1,109 @@
+import csv
+import datetime
+import io
+import tempfile
+import uuid
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import TYPE_STRING
+
+# Размер блока, которым отдается файл выгрузки (байты).
+EXPORT_BLOCK_SIZE = 64 * 1024
+EXPORT_CHUNK_SIZE = getattr(settings, 'NOVA_FRIEND_EXPORT_CHUNK_SIZE', 2000)
+# Начала строк, которые табличные редакторы считают формулой.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_rows(
+    queryset: QuerySet,
+    fields: Sequence[str],
+    chunk_size: Optional[int] = None,
+) -> Iterator[tuple]:
+    """Строки queryset.values_list(*fields) через серверный курсор.
+
+    Объекты модели не создаются, в памяти находится не больше chunk_size
+    строк (NOVA_FRIEND_EXPORT_CHUNK_SIZE по умолчанию).
+    """
+    return queryset.values_list(*fields).iterator(
+        chunk_size=chunk_size or EXPORT_CHUNK_SIZE,
+    )
+
+
+def is_formula(value: Any) -> bool:
+    """Строка, которую табличный редактор выполнит как формулу."""
+    return isinstance(value, str) and value.startswith(FORMULA_PREFIXES)
+
+
+def _csv_value(value: Any) -> Any:
+    """Значение ячейки CSV.
+
+    Строки пользователей (контакты, email) могут начинаться с формулы:
+    к ним добавляется апостроф, и редактор показывает их как текст.
+    """
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if is_formula(value):
+        return f"'{value}"
+    return value
+
+
+def csv_stream(
+    fields: Sequence[str],
+    rows: Iterable[tuple],
+) -> Iterator[str]:
+    """CSV по строкам rows блоками около EXPORT_BLOCK_SIZE."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        if buffer.tell() >= EXPORT_BLOCK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _xlsx_value(sheet, value: Any) -> Any:
+    """Значение ячейки XLSX: Excel не хранит часовой пояс и UUID.
+
+    openpyxl записывает строку, начинающуюся с '=', как формулу, поэтому
+    такие строки записываются ячейкой строкового типа.
+    """
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if is_formula(value):
+        cell = WriteOnlyCell(sheet, value)
+        cell.data_type = TYPE_STRING
+        return cell
+    return value
+
+
+def xlsx_stream(
+    fields: Sequence[str],
+    rows: Iterable[tuple],
+) -> Iterator[bytes]:
+    """XLSX по строкам rows.
+
+    XLSX - zip-архив, оглавление которого записывается в конце, поэтому
+    отдавать его по мере чтения строк нельзя. Книга в режиме write_only
+    пишет строки во временный файл на диске, после сохранения файл
+    отдается блоками - память не зависит от количества строк.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(fields))
+    for row in rows:
+        sheet.append([_xlsx_value(sheet, value) for value in row])
+
+    with tempfile.TemporaryFile() as xlsx_file:
+        workbook.save(xlsx_file)
+        xlsx_file.seek(0)
+        yield from iter(lambda: xlsx_file.read(EXPORT_BLOCK_SIZE), b'')
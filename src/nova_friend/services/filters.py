@@ -0,0 +1,106 @@
+from typing import List, Optional
+
+import django_filters
+from django import forms
+from django.db import models
+from django.db.models.lookups import In
+from django.utils.translation import gettext_lazy as _
+from django_filters.utils import get_model_field
+
+
+class AnyLookup(In):
+    """Условие AnyLookup(F(field), [...]) для filter().
+
+    Для PostgreSQL компилируется в field = ANY(%s) с одним параметром-массивом,
+    для остальных БД ведет себя как обычный __in. Передается в filter()
+    выражением и не регистрируется на полях: register_lookup во время
+    запроса меняет класс поля и сбрасывает кэши lookup всех моделей.
+    """
+
+    lookup_name = 'any'
+
+    def as_postgresql(self, compiler, connection):
+        """Один параметр-массив вместо списка плейсхолдеров."""
+        if not self.rhs_is_direct_value():
+            return super().as_sql(compiler, connection)
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        _, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs_sql} = ANY(%s)', (*lhs_params, list(rhs_params))
+
+
+class MultipleValueField(forms.MultipleChoiceField):
+    """Поле множественного выбора без списка допустимых значений.
+
+    Вместо перечисления всех значений из БД проверяет, что значения не
+    пустые, не длиннее max_length поля модели и их не больше max_values.
+    """
+
+    default_error_messages = {
+        'invalid_choice': _('Недопустимое значение: %(value)s.'),
+        'max_values': _('Не больше %(max_values)s значений.'),
+    }
+    max_values = 100
+
+    def __init__(self, *args, max_length: Optional[int] = None, **kwargs):
+        """max_length - ограничение длины значения, как у поля модели."""
+        super().__init__(*args, **kwargs)
+        self.max_length = max_length
+
+    def valid_value(self, value: str) -> bool:  # noqa: WPS110
+        """Непустая строка не длиннее max_length."""
+        if not value:
+            return False
+        return self.max_length is None or len(value) <= self.max_length
+
+    def validate(self, value: List[str]) -> None:  # noqa: WPS110
+        """Проверка значений и их количества."""
+        super().validate(value)
+        if len(value) > self.max_values:
+            raise forms.ValidationError(
+                self.error_messages['max_values'],
+                code='max_values',
+                params={'max_values': self.max_values},
+            )
+
+
+class MultipleValueFilter(django_filters.MultipleChoiceFilter):
+    """Замена AllValuesMultipleFilter.
+
+    AllValuesMultipleFilter при каждом запросе строит choices через
+    SELECT DISTINCT по всей таблице. Этот фильтр принимает те же параметры
+    (?field=a&field=b), не обращается к БД для валидации и фильтрует одним
+    условием field = ANY(array).
+    """
+
+    field_class = MultipleValueField
+
+    def __init__(self, *args, **kwargs):
+        """Фильтруем по прямым FK, поэтому DISTINCT не нужен."""
+        kwargs.setdefault('distinct', False)
+        super().__init__(*args, **kwargs)
+
+    @property
+    def field(self):
+        """Поле формы с ограничением длины значений поля модели."""
+        self.extra.setdefault(
+            'max_length',
+            getattr(
+                get_model_field(self.model, self.field_name),
+                'max_length',
+                None,
+            ),
+        )
+        return super().field
+
+    def filter(self, qs, value):  # noqa: WPS110, A003
+        """Фильтрация одним условием вместо OR по каждому значению."""
+        if not value:
+            return qs
+        if self.distinct:
+            qs = qs.distinct()
+        # output_field нужен In до разрешения F, для подготовки значений.
+        lhs = models.ExpressionWrapper(
+            models.F(self.field_name),
+            output_field=get_model_field(qs.model, self.field_name),
+        )
+        return self.get_method(qs)(AnyLookup(lhs, list(value)))
@@ -0,0 +1,252 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import models, transaction
+from django.utils import timezone
+
+from nova_friend.models import FriendCounters, FriendRequest, Friendship
+from nova_friend.services.enums import FriendRequestStatus
+
+User = get_user_model()
+
+COUNTER_FIELDS = ('pending_incoming', 'pending_outgoing', 'friends')
+CACHE_KEY_PREFIX = 'nova_friend:friend_counters:'
+CACHE_TIMEOUT = getattr(settings, 'NOVA_FRIEND_COUNTERS_CACHE_TIMEOUT', 300)
+
+# Изменение счетчиков пользователя в порядке COUNTER_FIELDS.
+CounterDelta = Tuple[int, int, int]
+# Пара пользователей запроса в друзья: (отправитель, получатель).
+UserPair = Tuple[int, int]
+
+
+def _cache_key(user_id: int) -> str:
+    """Ключ кэша счетчиков пользователя."""
+    return f'{CACHE_KEY_PREFIX}{user_id}'
+
+
+def _invalidate_on_commit(user_ids: Iterable[int]) -> None:
+    """Удалить счетчики из кэша после фиксации транзакции."""
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _grouped_counts(queryset, user_field: str) -> Dict[int, int]:
+    """Количество строк queryset по пользователю user_field."""
+    return dict(
+        queryset.order_by().values(user_field).annotate(
+            count=models.Count('pk'),
+        ).values_list(user_field, 'count'),
+    )
+
+
+def exact_friend_counters(user_ids: List[int]) -> Dict[int, CounterDelta]:
+    """Счетчики пользователей, посчитанные по запросам в друзья и дружбе.
+
+    Три запроса с GROUP BY на всех пользователей.
+    """
+    pending = FriendRequest.objects.filter(status=FriendRequestStatus.PENDING)
+    incoming = _grouped_counts(
+        pending.filter(receiving_user_id__in=user_ids),
+        'receiving_user_id',
+    )
+    outgoing = _grouped_counts(
+        pending.filter(sending_user_id__in=user_ids),
+        'sending_user_id',
+    )
+    friends = _grouped_counts(
+        Friendship.objects.filter(user_id__in=user_ids),
+        'user_id',
+    )
+    return {
+        user_id: (
+            incoming.get(user_id, 0),
+            outgoing.get(user_id, 0),
+            friends.get(user_id, 0),
+        )
+        for user_id in user_ids
+    }
+
+
+def _lock_counters(user_ids: Iterable[int]) -> Dict[int, FriendCounters]:
+    """Заблокировать записи счетчиков в порядке id пользователя.
+
+    Единый порядок блокировок исключает взаимную блокировку транзакций,
+    которые меняют счетчики одних и тех же пользователей.
+    """
+    return {
+        counters.user_id: counters
+        for counters in FriendCounters.objects.select_for_update().filter(
+            user_id__in=user_ids,
+        ).order_by('user_id')
+    }
+
+
+def _values(counters: FriendCounters) -> CounterDelta:
+    """Значения счетчиков записи в порядке COUNTER_FIELDS."""
+    return tuple(getattr(counters, name) for name in COUNTER_FIELDS)
+
+
+@transaction.atomic(savepoint=False)
+def refresh_friend_counters(user_ids: Iterable[int]) -> int:
+    """Записать точные значения счетчиков пользователей.
+
+    Записи блокируются до подсчета, поэтому изменение счетчиков
+    параллельной транзакцией не теряется. Нулевые счетчики
+    пользователей без записи не создаются.
+    Возвращает количество измененных и созданных записей.
+    """
+    user_ids = sorted(set(user_ids))
+    locked = _lock_counters(user_ids)
+    now = timezone.now()
+    changed, created = [], []
+    for user_id, values in exact_friend_counters(user_ids).items():
+        counters = locked.get(user_id)
+        if counters is None:
+            if not any(values):
+                continue
+            counters = FriendCounters(user_id=user_id)
+            created.append(counters)
+        elif _values(counters) == values:
+            continue
+        else:
+            changed.append(counters)
+        for name, value in zip(COUNTER_FIELDS, values):  # noqa: WPS110
+            setattr(counters, name, value)
+        counters.updated_at = now
+
+    FriendCounters.objects.bulk_update(
+        changed,
+        [*COUNTER_FIELDS, 'updated_at'],
+    )
+    FriendCounters.objects.bulk_create(created, ignore_conflicts=True)
+    _invalidate_on_commit(
+        [counters.user_id for counters in (*changed, *created)],
+    )
+    return len(changed) + len(created)
+
+
+def change_friend_counters(deltas: Dict[int, CounterDelta]) -> None:
+    """Изменить счетчики пользователей на deltas в текущей транзакции.
+
+    Существующие записи изменяются выражением F() одним UPDATE на каждое
+    различное изменение. Записи, которых еще нет, создаются с точными
+    значениями (изменения текущей транзакции в них уже учтены).
+    """
+    deltas = {
+        user_id: delta
+        for user_id, delta in deltas.items()
+        if any(delta)
+    }
+    if not deltas:
+        return
+
+    with transaction.atomic(savepoint=False):
+        locked = _lock_counters(list(deltas))
+        missing = [user_id for user_id in deltas if user_id not in locked]
+        if missing:
+            refresh_friend_counters(missing)
+
+        user_ids_by_delta = defaultdict(list)
+        for user_id in locked:
+            user_ids_by_delta[deltas[user_id]].append(user_id)
+        now = timezone.now()
+        for delta, user_ids in user_ids_by_delta.items():
+            FriendCounters.objects.filter(user_id__in=user_ids).update(
+                updated_at=now,
+                **{
+                    name: models.F(name) + change
+                    for name, change in zip(COUNTER_FIELDS, delta)
+                    if change
+                },
+            )
+        _invalidate_on_commit(locked)
+
+
+def _pair_deltas(
+    pairs: Iterable[UserPair],
+    sending_delta: CounterDelta,
+    receiving_delta: CounterDelta,
+) -> Dict[int, CounterDelta]:
+    """Сумма изменений счетчиков участников пар."""
+    totals: Dict[int, List[int]] = defaultdict(lambda: [0, 0, 0])
+    for sending_user_id, receiving_user_id in pairs:
+        for user_id, delta in (
+            (sending_user_id, sending_delta),
+            (receiving_user_id, receiving_delta),
+        ):
+            for index, change in enumerate(delta):
+                totals[user_id][index] += change
+    return {user_id: tuple(delta) for user_id, delta in totals.items()}
+
+
+def count_created_requests(pairs: Iterable[UserPair]) -> None:
+    """Учесть новые ожидающие запросы в друзья."""
+    change_friend_counters(_pair_deltas(pairs, (0, 1, 0), (1, 0, 0)))
+
+
+def count_resolved_requests(
+    pairs: Iterable[UserPair],
+    confirmed: bool,
+) -> None:
+    """Учесть запросы, которые перестали ожидать ответа.
+
+    confirmed - запросы подтверждены и участники стали друзьями.
+    """
+    friends = 1 if confirmed else 0
+    change_friend_counters(
+        _pair_deltas(pairs, (0, -1, friends), (-1, 0, friends)),
+    )
+
+
+def count_removed_friendships(pairs: Iterable[UserPair]) -> None:
+    """Учесть прекращенную дружбу."""
+    change_friend_counters(_pair_deltas(pairs, (0, 0, -1), (0, 0, -1)))
+
+
+def friend_counters(user_id: int) -> Dict[str, int]:
+    """Счетчики пользователя.
+
+    Значение берется из кэша, при промахе - одно чтение по первичному
+    ключу. Для пользователя без записи счетчики считаются по запросам
+    в друзья.
+    """
+    key = _cache_key(user_id)
+    counters = cache.get(key)
+    if counters is None:
+        counters = FriendCounters.objects.filter(
+            pk=user_id,
+        ).values(*COUNTER_FIELDS).first()
+        if counters is None:
+            counters = dict(zip(
+                COUNTER_FIELDS,
+                exact_friend_counters([user_id])[user_id],
+            ))
+        cache.set(key, counters, CACHE_TIMEOUT)
+    return counters
+
+
+def _chunk_user_ids(after_user_id: int, chunk_size: int) -> List[int]:
+    """Следующие chunk_size id пользователей."""
+    return list(
+        User.objects.filter(
+            id__gt=after_user_id,
+        ).order_by('id').values_list('id', flat=True)[:chunk_size],
+    )
+
+
+def reconcile_friend_counters(chunk_size: int) -> int:
+    """Сверка счетчиков всех пользователей с запросами в друзья и дружбой.
+
+    Пользователи обрабатываются пачками по chunk_size, каждая пачка - в
+    отдельной транзакции. Возвращает количество исправленных записей.
+    """
+    total = 0
+    user_ids = _chunk_user_ids(0, chunk_size)
+    while user_ids:
+        total += refresh_friend_counters(user_ids)
+        user_ids = _chunk_user_ids(user_ids[-1], chunk_size)
+    return total
@@ -0,0 +1,116 @@
+from typing import Optional
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models.functions import Concat, Trim
+
+from nova_friend.models import FriendRequest
+from nova_friend.services.enums import FriendRequestMode
+
+User = get_user_model()
+
+# Столбец модели пользователя с полным именем, если он есть.
+FULL_NAME_FIELD = 'full_name'
+
+
+def _has_full_name_column() -> bool:
+    """Есть ли у модели пользователя столбец FULL_NAME_FIELD."""
+    try:
+        User._meta.get_field(FULL_NAME_FIELD)  # noqa: WPS437
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def _full_name(user_field: str) -> models.Expression:
+    """Полное имя пользователя: поле full_name или имя и фамилия."""
+    if _has_full_name_column():
+        return models.F(f'{user_field}__{FULL_NAME_FIELD}')
+    return Trim(
+        Concat(
+            models.F(f'{user_field}__first_name'),
+            models.Value(' '),
+            models.F(f'{user_field}__last_name'),
+            output_field=models.CharField(),
+        ),
+    )
+
+
+def user_full_name(user: Optional[User]) -> Optional[str]:
+    """То же значение, что и _full_name, для загруженного пользователя.
+
+    TRIM в SQL удаляет только пробелы, поэтому strip(' ').
+    """
+    if user is None:
+        return None
+    if _has_full_name_column():
+        return getattr(user, FULL_NAME_FIELD)
+    return f'{user.first_name} {user.last_name}'.strip(' ')
+
+
+def _counterpart(user, column) -> models.Case:
+    """Значение column второго участника запроса.
+
+    column - функция, которая по имени поля пользователя в FriendRequest
+    возвращает выражение.
+    """
+    return models.Case(
+        models.When(sending_user_id=user.id, then=column('receiving_user')),
+        models.When(receiving_user_id=user.id, then=column('sending_user')),
+        default=models.Value(None),
+    )
+
+
+def with_request_mode(
+    queryset: models.QuerySet,
+    user: User,
+) -> models.QuerySet:
+    """Аннотация запросов в друзья для просмотра пользователем user.
+
+    request_mode - тип запроса для user (CASE WHEN sending_user_id = ...),
+    counterpart_id, counterpart_full_name и counterpart_avatar - id, имя и
+    аватар второго участника. Из таблицы пользователей читаются только
+    эти столбцы.
+    """
+    return queryset.annotate(
+        request_mode=models.Case(
+            models.When(
+                sending_user_id=user.id,
+                then=models.Value(FriendRequestMode.OUTCOMING.value),
+            ),
+            models.When(
+                receiving_user_id=user.id,
+                then=models.Value(FriendRequestMode.INCOMING.value),
+            ),
+            default=models.Value(None),
+            output_field=models.CharField(),
+        ),
+        counterpart_id=_counterpart(
+            user,
+            lambda user_field: models.F(f'{user_field}_id'),
+        ),
+        counterpart_full_name=_counterpart(user, _full_name),
+        counterpart_avatar=_counterpart(
+            user,
+            lambda user_field: models.F(f'{user_field}__avatar'),
+        ),
+    )
+
+
+def set_request_mode(friend_request: FriendRequest, user: User) -> None:
+    """Те же значения, что и with_request_mode, для загруженного объекта.
+
+    Используется, если объект получен не через with_request_mode.
+    """
+    counterpart = None
+    friend_request.request_mode = None
+    if friend_request.sending_user_id == user.id:
+        friend_request.request_mode = FriendRequestMode.OUTCOMING.value
+        counterpart = friend_request.receiving_user
+    elif friend_request.receiving_user_id == user.id:
+        friend_request.request_mode = FriendRequestMode.INCOMING.value
+        counterpart = friend_request.sending_user
+    friend_request.counterpart_id = getattr(counterpart, 'id', None)
+    friend_request.counterpart_full_name = user_full_name(counterpart)
+    friend_request.counterpart_avatar = getattr(counterpart, 'avatar', None)
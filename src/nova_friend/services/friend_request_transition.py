@@ -0,0 +1,188 @@
+import uuid
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Q, signals
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from nova_friend.models import FriendRequest
+from nova_friend.services.enums import FriendRequestStatus
+
+# Статусы, при переходе в которые запрос в друзья удаляется.
+TERMINAL_STATUSES = frozenset((
+    FriendRequestStatus.CANCELED,
+    FriendRequestStatus.REJECTED,
+))
+
+
+class TransitionedFriendRequest(NamedTuple):
+    """Запрос в друзья, статус которого был изменен."""
+
+    id: int  # noqa: A003, WPS125
+    token: uuid.UUID
+    sending_user_id: int
+    receiving_user_id: int
+
+
+def _db_value(field_name: str, value):  # noqa: WPS110
+    """Значение поля FriendRequest в формате БД."""
+    field = FriendRequest._meta.get_field(field_name)  # noqa: WPS437
+    return field.get_db_prep_value(value, connection)
+
+
+def _from_db_token(token) -> uuid.UUID:
+    """Token из строки результата (SQLite возвращает hex-строку)."""
+    if isinstance(token, uuid.UUID):
+        return token
+    return uuid.UUID(token)
+
+
+def _filter_sql(permission_filter: Q) -> Tuple[str, List]:
+    """Условие WHERE для фильтра прав на FriendRequest.
+
+    Фильтр должен использовать только столбцы FriendRequest.
+    """
+    query = FriendRequest.objects.filter(permission_filter).query
+    compiler = query.get_compiler(connection=connection)
+    return compiler.compile(query.where)
+
+
+def _transition_sql(
+    status: str,
+    tokens_count: int,
+    filter_sql: Optional[str],
+) -> str:
+    """UPDATE или DELETE ожидающих запросов с возвратом их данных."""
+    qn = connection.ops.quote_name
+    table = qn(FriendRequest._meta.db_table)  # noqa: WPS437
+    returning = 'RETURNING {0}, {1}, {2}, {3}'.format(
+        qn('id'),
+        qn('token'),
+        qn('sending_user_id'),
+        qn('receiving_user_id'),
+    )
+    placeholders = ', '.join(['%s'] * tokens_count)
+    where = 'WHERE {0} IN ({1}) AND {2} = %s'.format(
+        qn('token'),
+        placeholders,
+        qn('status'),
+    )
+    if filter_sql:
+        where = f'{where} AND ({filter_sql})'
+    if status in TERMINAL_STATUSES:
+        return f'DELETE FROM {table} {where} {returning}'
+    assignments = '{0} = %s, {1} = %s'.format(qn('status'), qn('updated_at'))
+    return f'UPDATE {table} SET {assignments} {where} {returning}'
+
+
+def _has_delete_receivers() -> bool:
+    """Есть ли получатели pre_delete/post_delete для FriendRequest."""
+    return (
+        signals.pre_delete.has_listeners(FriendRequest) or
+        signals.post_delete.has_listeners(FriendRequest)
+    )
+
+
+def _delete_with_signals(
+    tokens: List[uuid.UUID],
+    permission_filter: Optional[Q],
+) -> List[TransitionedFriendRequest]:
+    """Удаление через Collector с отправкой pre_delete и post_delete.
+
+    Строки блокируются SELECT ... FOR UPDATE с тем же условием, что и у
+    DELETE ... RETURNING, поэтому гонка с параллельными действиями
+    по-прежнему исключена.
+    """
+    queryset = FriendRequest.objects.select_for_update().filter(
+        token__in=tokens,
+        status=FriendRequestStatus.PENDING,
+    )
+    if permission_filter:
+        queryset = queryset.filter(permission_filter)
+    with transaction.atomic():
+        friend_requests = list(queryset)
+        # Collector обнуляет pk удаленных объектов.
+        transitioned = [
+            TransitionedFriendRequest(
+                id=friend_request.id,
+                token=friend_request.token,
+                sending_user_id=friend_request.sending_user_id,
+                receiving_user_id=friend_request.receiving_user_id,
+            )
+            for friend_request in friend_requests
+        ]
+        if friend_requests:
+            collector = Collector(using=queryset.db)
+            collector.collect(friend_requests)
+            collector.delete()
+    return transitioned
+
+
+def transition_friend_requests(
+    tokens: Iterable[uuid.UUID],
+    status: str,
+    permission_filter: Optional[Q] = None,
+) -> List[TransitionedFriendRequest]:
+    """Перевести ожидающие запросы в друзья в новый статус одним запросом.
+
+    Для отклонения и отмены запросы удаляются (DELETE ... RETURNING),
+    для остальных статусов меняется статус (UPDATE ... RETURNING).
+    Условие status = 'pending' в том же запросе исключает гонку
+    между параллельными действиями. Если указан permission_filter
+    (фильтр прав из permissions.friend_request), затрагиваются только
+    запросы, подходящие под него.
+    Если для FriendRequest подключены получатели pre_delete/post_delete,
+    удаление выполняется через ORM, чтобы они были вызваны.
+    Возвращаются только измененные запросы.
+    """
+    tokens = list(tokens)
+    if not tokens:
+        return []
+    if status in TERMINAL_STATUSES and _has_delete_receivers():
+        return _delete_with_signals(tokens, permission_filter)
+
+    filter_sql, filter_params = None, []
+    if permission_filter:
+        filter_sql, filter_params = _filter_sql(permission_filter)
+    params = [
+        *[_db_value('token', token) for token in tokens],
+        FriendRequestStatus.PENDING.value,
+        *filter_params,
+    ]
+    if status not in TERMINAL_STATUSES:
+        params = [status, _db_value('updated_at', timezone.now()), *params]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _transition_sql(status, len(tokens), filter_sql),
+            params,
+        )
+        rows = cursor.fetchall()
+    return [
+        TransitionedFriendRequest(
+            id=row_id,
+            token=_from_db_token(token),
+            sending_user_id=sending_user_id,
+            receiving_user_id=receiving_user_id,
+        )
+        for row_id, token, sending_user_id, receiving_user_id in rows
+    ]
+
+
+def transition_friend_request(
+    token: uuid.UUID,
+    status: str,
+    permission_filter: Optional[Q] = None,
+) -> Optional[TransitionedFriendRequest]:
+    """Перевести один ожидающий запрос в друзья в новый статус.
+
+    Если запрос не найден, уже обработан или не подходит под
+    permission_filter - возвращается None.
+    """
+    transitioned = transition_friend_requests(
+        tokens=[token],
+        status=status,
+        permission_filter=permission_filter,
+    )
+    return transitioned[0] if transitioned else None
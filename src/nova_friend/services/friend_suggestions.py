@@ -0,0 +1,234 @@
+from typing import List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from nova_friend.models import (
+    FriendCounters,
+    FriendRequest,
+    FriendSuggestion,
+    FriendSuggestionRun,
+    Friendship,
+)
+from nova_friend.services.enums import FriendRequestStatus
+
+User = get_user_model()
+
+SUGGESTIONS_LIMIT = getattr(settings, 'NOVA_FRIEND_SUGGESTIONS_LIMIT', 50)
+
+
+def _suggestions_sql(users_count: int) -> str:
+    """Лучшие кандидаты по числу общих друзей для users_count пользователей.
+
+    Кандидат - друг друга (f1 - дружба пользователя, f2 - дружба его
+    друга). Исключаются сам пользователь, его друзья и пользователи с
+    ожидающим запросом в друзья в любом направлении. ROW_NUMBER()
+    оставляет не больше limit кандидатов на пользователя.
+    """
+    qn = connection.ops.quote_name
+    friendship = qn(Friendship._meta.db_table)  # noqa: WPS437
+    friend_request = qn(FriendRequest._meta.db_table)  # noqa: WPS437
+    placeholders = ', '.join(['%s'] * users_count)
+    return f"""
+        WITH candidates AS (
+            SELECT
+                f1.user_id AS user_id,
+                f2.friend_id AS suggested_user_id,
+                COUNT(*) AS mutual_friends_count
+            FROM {friendship} f1
+            JOIN {friendship} f2 ON f2.user_id = f1.friend_id
+            WHERE f1.user_id IN ({placeholders})
+                AND f2.friend_id <> f1.user_id
+                AND NOT EXISTS (
+                    SELECT 1 FROM {friendship} f3
+                    WHERE f3.user_id = f1.user_id
+                        AND f3.friend_id = f2.friend_id
+                )
+                AND NOT EXISTS (
+                    SELECT 1 FROM {friend_request} r
+                    WHERE r.sending_user_id = f1.user_id
+                        AND r.receiving_user_id = f2.friend_id
+                        AND r.status = %s
+                )
+                AND NOT EXISTS (
+                    SELECT 1 FROM {friend_request} r
+                    WHERE r.sending_user_id = f2.friend_id
+                        AND r.receiving_user_id = f1.user_id
+                        AND r.status = %s
+                )
+            GROUP BY f1.user_id, f2.friend_id
+        ),
+        ranked AS (
+            SELECT
+                user_id,
+                suggested_user_id,
+                mutual_friends_count,
+                ROW_NUMBER() OVER (
+                    PARTITION BY user_id
+                    ORDER BY mutual_friends_count DESC, suggested_user_id
+                ) AS position
+            FROM candidates
+        )
+        SELECT user_id, suggested_user_id, mutual_friends_count
+        FROM ranked
+        WHERE position <= %s
+        ORDER BY user_id, position
+    """  # noqa: S608
+
+
+def compute_friend_suggestions(
+    user_ids: List[int],
+    limit: Optional[int] = None,
+) -> List[FriendSuggestion]:
+    """Возможные друзья пользователей user_ids одним запросом.
+
+    Для каждого пользователя - кандидаты в порядке убывания числа общих
+    друзей.
+    """
+    if not user_ids:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _suggestions_sql(len(user_ids)),
+            [
+                *user_ids,
+                FriendRequestStatus.PENDING,
+                FriendRequestStatus.PENDING,
+                limit or SUGGESTIONS_LIMIT,
+            ],
+        )
+        rows = cursor.fetchall()
+    return [
+        FriendSuggestion(
+            user_id=user_id,
+            suggested_user_id=suggested_user_id,
+            mutual_friends_count=mutual_friends_count,
+        )
+        for user_id, suggested_user_id, mutual_friends_count in rows
+    ]
+
+
+@transaction.atomic
+def replace_suggestions(
+    user_ids: List[int],
+    suggestions: List[FriendSuggestion],
+) -> None:
+    """Заменить возможных друзей пользователей user_ids на suggestions.
+
+    Кандидаты каждого пользователя в suggestions должны идти в порядке
+    рейтинга: порядок id - порядок выдачи.
+    """
+    FriendSuggestion.objects.filter(user_id__in=user_ids).delete()
+    FriendSuggestion.objects.bulk_create(suggestions)
+
+
+def refresh_suggestions_chunk(
+    user_ids: List[int],
+    limit: Optional[int] = None,
+) -> int:
+    """Пересчитать возможных друзей пользователей user_ids.
+
+    Возвращает количество записанных кандидатов.
+    """
+    suggestions = compute_friend_suggestions(user_ids, limit)
+    replace_suggestions(user_ids, suggestions)
+    return len(suggestions)
+
+
+def changed_user_ids(since) -> List[int]:
+    """Пользователи, кандидаты которых могли измениться после since.
+
+    Запросы в друзья и дружба меняются в одной транзакции со счетчиками
+    FriendCounters, поэтому измененные ребра графа - у пользователей,
+    счетчики которых обновлялись после since. Новый или удаленный друг
+    меняет друзей друзей и у друзей такого пользователя, они тоже
+    пересчитываются.
+    """
+    changed = FriendCounters.objects.filter(
+        updated_at__gte=since,
+    ).values('user_id')
+    user_ids = set(changed.values_list('user_id', flat=True))
+    user_ids.update(
+        Friendship.objects.filter(
+            user_id__in=changed,
+        ).values_list('friend_id', flat=True),
+    )
+    return sorted(user_ids)
+
+
+def _all_user_ids(after_user_id: int, chunk_size: int) -> List[int]:
+    """Следующие chunk_size id пользователей."""
+    return list(
+        User.objects.filter(
+            id__gt=after_user_id,
+        ).order_by('id').values_list('id', flat=True)[:chunk_size],
+    )
+
+
+def refresh_friend_suggestions(
+    chunk_size: int,
+    full: bool = False,
+    limit: Optional[int] = None,
+) -> FriendSuggestionRun:
+    """Пересчет возможных друзей пачками пользователей.
+
+    Полный пересчет (full или первый запуск) обходит всех пользователей,
+    инкрементальный - только тех, у кого менялась дружба после начала
+    последнего завершенного запуска. Каждая пачка - отдельная транзакция.
+    """
+    last_run = FriendSuggestionRun.objects.filter(
+        finished_at__isnull=False,
+    ).order_by('-created_at').first()
+    full = full or last_run is None
+    run = FriendSuggestionRun.objects.create(full=full)
+
+    if full:
+        user_ids = _all_user_ids(0, chunk_size)
+        while user_ids:
+            refresh_suggestions_chunk(user_ids, limit)
+            run.users_count += len(user_ids)
+            user_ids = _all_user_ids(user_ids[-1], chunk_size)
+    else:
+        user_ids = changed_user_ids(last_run.created_at)
+        for start in range(0, len(user_ids), chunk_size):
+            refresh_suggestions_chunk(
+                user_ids[start:start + chunk_size],
+                limit,
+            )
+        run.users_count = len(user_ids)
+
+    run.finished_at = timezone.now()
+    run.save(update_fields=['users_count', 'finished_at', 'updated_at'])
+    return run
+
+
+def suggestions_for(user) -> models.QuerySet:
+    """Возможные друзья пользователя в порядке числа общих друзей.
+
+    Кандидаты, с которыми после пересчета появилась дружба или ожидающий
+    запрос в друзья, не выводятся.
+    """
+    suggested_user = models.OuterRef('suggested_user_id')
+    friendship = Friendship.objects.filter(
+        user_id=user.id,
+        friend_id=suggested_user,
+    )
+    friend_request = FriendRequest.objects.filter(
+        models.Q(status=FriendRequestStatus.PENDING),
+        models.Q(
+            sending_user_id=user.id,
+            receiving_user_id=suggested_user,
+        ) | models.Q(
+            sending_user_id=suggested_user,
+            receiving_user_id=user.id,
+        ),
+    )
+    return FriendSuggestion.objects.filter(
+        user_id=user.id,
+    ).exclude(
+        models.Exists(friendship),
+    ).exclude(
+        models.Exists(friend_request),
+    ).order_by('-mutual_friends_count', 'suggested_user_id')
@@ -0,0 +1,76 @@
+from typing import Dict, Iterable, Tuple
+
+from django.db.models import Count, QuerySet
+
+from nova_friend.models import Friendship
+
+
+def are_friends(user_id: int, friend_id: int) -> bool:
+    """Являются ли пользователи друзьями.
+
+    Один EXISTS по уникальному индексу (user, friend).
+    """
+    return Friendship.objects.filter(
+        user_id=user_id,
+        friend_id=friend_id,
+    ).exists()
+
+
+def friend_ids(user_id: int) -> QuerySet:
+    """Id друзей пользователя."""
+    return Friendship.objects.filter(
+        user_id=user_id,
+    ).order_by().values_list('friend_id', flat=True)
+
+
+def mutual_friend_ids(user_id: int, other_user_id: int) -> QuerySet:
+    """Id общих друзей двух пользователей."""
+    return friend_ids(user_id).filter(
+        friend_id__in=friend_ids(other_user_id),
+    )
+
+
+def mutual_friends_counts(
+    user_id: int,
+    other_user_ids: Iterable[int],
+) -> Dict[int, int]:
+    """Количество общих друзей пользователя с каждым из other_user_ids.
+
+    Один запрос с GROUP BY на всех пользователей: дружба other_user_ids с
+    друзьями user_id. Пользователи без общих друзей в результат не входят.
+    """
+    return dict(
+        Friendship.objects.filter(
+            user_id__in=other_user_ids,
+            friend_id__in=friend_ids(user_id),
+        ).order_by().values('user_id').annotate(
+            count=Count('pk'),
+        ).values_list('user_id', 'count'),
+    )
+
+
+def add_friendships(pairs: Iterable[Tuple[int, int]]) -> None:
+    """Добавить дружбу в обе стороны для пар (user_id, friend_id).
+
+    Одна вставка на все пары. Повторное добавление существующей дружбы
+    ничего не меняет.
+    """
+    friendships = []
+    for user_id, friend_id in pairs:
+        friendships.append(Friendship(user_id=user_id, friend_id=friend_id))
+        friendships.append(Friendship(user_id=friend_id, friend_id=user_id))
+    if friendships:
+        Friendship.objects.bulk_create(friendships, ignore_conflicts=True)
+
+
+def add_friendship(user_id: int, friend_id: int) -> None:
+    """Добавить дружбу в обе стороны."""
+    add_friendships([(user_id, friend_id)])
+
+
+def remove_friendship(user_id: int, friend_id: int) -> None:
+    """Удалить дружбу в обе стороны одним запросом."""
+    Friendship.objects.filter(
+        user_id__in=(user_id, friend_id),
+        friend_id__in=(user_id, friend_id),
+    ).delete()
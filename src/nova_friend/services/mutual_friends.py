@@ -0,0 +1,378 @@
+import time
+import tracemalloc
+from itertools import islice
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from scipy import sparse
+
+from nova_friend.models import (
+    FriendRequest,
+    FriendSuggestion,
+    FriendSuggestionRun,
+    Friendship,
+)
+from nova_friend.services.enums import FriendRequestStatus
+from nova_friend.services.friend_suggestions import (
+    SUGGESTIONS_LIMIT,
+    replace_suggestions,
+)
+
+# Память на блок произведений матриц смежности (байты).
+MEMORY_BUDGET = getattr(
+    settings,
+    'NOVA_FRIEND_MUTUAL_FRIENDS_MEMORY_BUDGET',
+    64 * 1024 * 1024,
+)
+# Количество ребер, которое читается из БД за один раз.
+EDGES_CHUNK_SIZE = 100000
+# Оценка памяти на один элемент произведения: индекс и значение в CSR,
+# ключ сортировки и временные массивы отбора лучших кандидатов.
+PRODUCT_ENTRY_BYTES = 48
+INDEX_DTYPE = np.int32
+
+
+class FriendGraph(NamedTuple):
+    """Граф друзей в виде симметричной матрицы смежности CSR.
+
+    user_ids - отсортированные id пользователей, у которых есть друзья;
+    строка и столбец матрицы - плотный индекс пользователя в user_ids.
+    """
+
+    user_ids: np.ndarray
+    adjacency: sparse.csr_matrix
+
+    @property
+    def degrees(self) -> np.ndarray:
+        """Количество друзей каждого пользователя."""
+        return np.diff(self.adjacency.indptr)
+
+    def indices(self, user_ids: Iterable[int]) -> np.ndarray:
+        """Плотные индексы пользователей, -1 - у пользователя нет друзей."""
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        if not len(self.user_ids):
+            return np.full(len(user_ids), -1, dtype=INDEX_DTYPE)
+        positions = np.minimum(
+            np.searchsorted(self.user_ids, user_ids),
+            len(self.user_ids) - 1,
+        )
+        found = self.user_ids[positions] == user_ids
+        return np.where(found, positions, -1).astype(INDEX_DTYPE)
+
+
+def _chunks(rows: Iterator[tuple], chunk_size: int) -> Iterator[np.ndarray]:
+    """Пары id из rows массивами по chunk_size строк."""
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield np.array(chunk, dtype=np.int64).reshape(-1, 2)
+
+
+def _pairs(queryset, fields: Tuple[str, str], chunk_size: int) -> np.ndarray:
+    """Пары queryset.values_list(*fields) через серверный курсор."""
+    rows = queryset.order_by().values_list(*fields).iterator(
+        chunk_size=chunk_size,
+    )
+    chunks = list(_chunks(rows, chunk_size))
+    if not chunks:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(chunks)
+
+
+def _symmetric(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    size: int,
+) -> sparse.csr_matrix:
+    """Симметричная матрица CSR с единицами в (rows, cols) и (cols, rows)."""
+    matrix = sparse.csr_matrix(
+        (
+            np.ones(len(rows) * 2, dtype=INDEX_DTYPE),
+            (np.concatenate([rows, cols]), np.concatenate([cols, rows])),
+        ),
+        shape=(size, size),
+    )
+    # Повторы пары складываются, значение элемента - всегда 1.
+    matrix.data[:] = 1
+    return matrix
+
+
+def load_friend_graph(chunk_size: Optional[int] = None) -> FriendGraph:
+    """Граф друзей из таблицы Friendship.
+
+    Дружба хранится в обе стороны, поэтому читается только половина
+    ребер (user_id < friend_id), вторая половина достраивается в матрице.
+    Из БД читаются только пары id, без объектов модели.
+    """
+    edges = _pairs(
+        Friendship.objects.filter(user_id__lt=models.F('friend_id')),
+        ('user_id', 'friend_id'),
+        chunk_size or EDGES_CHUNK_SIZE,
+    )
+    return build_friend_graph(edges)
+
+
+def build_friend_graph(edges: np.ndarray) -> FriendGraph:
+    """Граф друзей по массиву ребер (user_id, friend_id) формы (n, 2)."""
+    user_ids = np.unique(edges)
+    # np.unique(return_inverse=True) заметно медленнее поиска по сортированным
+    # id.
+    dense = np.searchsorted(user_ids, edges).astype(INDEX_DTYPE)
+    return FriendGraph(
+        user_ids=user_ids,
+        adjacency=_symmetric(dense[:, 0], dense[:, 1], len(user_ids)),
+    )
+
+
+def load_pending_requests(
+    graph: FriendGraph,
+    chunk_size: Optional[int] = None,
+) -> sparse.csr_matrix:
+    """Симметричная матрица пар пользователей с ожидающим запросом.
+
+    Пользователи без друзей не могут быть кандидатами, запросы с ними
+    не учитываются.
+    """
+    pairs = _pairs(
+        FriendRequest.objects.filter(
+            status=FriendRequestStatus.PENDING,
+            receiving_user_id__isnull=False,
+        ),
+        ('sending_user_id', 'receiving_user_id'),
+        chunk_size or EDGES_CHUNK_SIZE,
+    )
+    sending = graph.indices(pairs[:, 0])
+    receiving = graph.indices(pairs[:, 1])
+    known = (sending >= 0) & (receiving >= 0)
+    return _symmetric(sending[known], receiving[known], len(graph.user_ids))
+
+
+def row_blocks(
+    graph: FriendGraph,
+    memory_budget: Optional[int] = None,
+) -> Iterator[Tuple[int, int]]:
+    """Границы блоков строк, произведение которых укладывается в память.
+
+    Число элементов строки A[i] @ A не больше суммы степеней друзей
+    пользователя i (и количества пользователей), по этой оценке строки
+    набираются в блок, пока он не превысит memory_budget. Блок содержит
+    хотя бы одну строку.
+    """
+    budget = memory_budget or MEMORY_BUDGET
+    size = len(graph.user_ids)
+    estimate = np.minimum(
+        graph.adjacency @ graph.degrees.astype(np.int64),
+        size,
+    ) * PRODUCT_ENTRY_BYTES
+    cumulative = np.cumsum(estimate)
+    start = 0
+    while start < size:
+        base = cumulative[start - 1] if start else 0
+        end = int(np.searchsorted(cumulative, base + budget, side='right'))
+        end = max(end, start + 1)
+        yield start, end
+        start = end
+
+
+def _top_candidates(
+    counts: sparse.csr_matrix,
+    limit: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Не больше limit лучших элементов каждой строки counts.
+
+    Возвращает (строка, столбец, значение) в порядке строк, внутри строки -
+    по убыванию значения, затем по возрастанию столбца (id пользователя),
+    как в SQL-пересчете friend_suggestions. Строка, инвертированное
+    значение и столбец упаковываются в один ключ int64: сортировка ключей
+    заметно быстрее np.lexsort, а элементы восстанавливаются из ключа.
+    """
+    counts = counts.tocoo()
+    rows_count, cols_count = counts.shape
+    max_count = int(counts.data.max(initial=0))
+    if rows_count * (max_count + 1) * cols_count >= np.iinfo(np.int64).max:
+        order = np.lexsort((counts.col, -counts.data, counts.row))
+        rows, cols = counts.row[order], counts.col[order]
+        mutual = counts.data[order]
+    else:
+        keys = counts.row.astype(np.int64)
+        keys *= max_count + 1
+        keys += max_count
+        keys -= counts.data
+        keys *= cols_count
+        keys += counts.col
+        keys.sort()
+        cols = (keys % cols_count).astype(INDEX_DTYPE)
+        keys //= cols_count
+        mutual = (max_count - keys % (max_count + 1)).astype(INDEX_DTYPE)
+        keys //= max_count + 1
+        rows = keys.astype(INDEX_DTYPE)
+    starts = np.searchsorted(rows, np.arange(rows_count))
+    keep = np.arange(len(rows)) - starts[rows] < limit
+    return rows[keep], cols[keep], mutual[keep]
+
+
+def block_candidates(
+    graph: FriendGraph,
+    excluded: sparse.csr_matrix,
+    start: int,
+    end: int,
+    limit: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Лучшие кандидаты пользователей с индексами start..end-1.
+
+    Элемент (i, j) произведения A[start:end] @ A - количество общих
+    друзей. Из произведения удаляются сам пользователь, его друзья и
+    пары из excluded. Индексы строк результата - плотные индексы графа.
+    """
+    block = graph.adjacency[start:end]
+    counts = block @ graph.adjacency
+    own = sparse.csr_matrix(
+        (
+            np.ones(end - start, dtype=INDEX_DTYPE),
+            (np.arange(end - start), np.arange(start, end)),
+        ),
+        shape=counts.shape,
+    )
+    mask = (block + excluded[start:end] + own).astype(bool)
+    counts = counts - counts.multiply(mask)
+    counts.eliminate_zeros()
+    rows, cols, mutual = _top_candidates(counts, limit)
+    return rows + start, cols, mutual
+
+
+def iter_suggestions(  # noqa: WPS210
+    graph: FriendGraph,
+    excluded: sparse.csr_matrix,
+    limit: int,
+    chunk_size: int,
+    memory_budget: Optional[int] = None,
+) -> Iterator[Tuple[List[int], List[FriendSuggestion]]]:
+    """Возможные друзья пачками: (id пользователей пачки, кандидаты).
+
+    Произведения считаются блоками по memory_budget, результат блока
+    отдается пачками не больше chunk_size пользователей.
+    """
+    for start, end in row_blocks(graph, memory_budget):
+        rows, cols, mutual = block_candidates(
+            graph,
+            excluded,
+            start,
+            end,
+            limit,
+        )
+        for chunk_start in range(start, end, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, end)
+            low, high = np.searchsorted(rows, [chunk_start, chunk_end])
+            yield graph.user_ids[chunk_start:chunk_end].tolist(), [
+                FriendSuggestion(
+                    user_id=user_id,
+                    suggested_user_id=suggested_user_id,
+                    mutual_friends_count=count,
+                )
+                for user_id, suggested_user_id, count in zip(
+                    graph.user_ids[rows[low:high]].tolist(),
+                    graph.user_ids[cols[low:high]].tolist(),
+                    mutual[low:high].tolist(),
+                )
+            ]
+
+
+def refresh_friend_suggestions_csr(
+    chunk_size: int,
+    limit: Optional[int] = None,
+    memory_budget: Optional[int] = None,
+) -> FriendSuggestionRun:
+    """Полный пересчет возможных друзей произведениями матриц.
+
+    Результат совпадает с полным SQL-пересчетом refresh_friend_suggestions:
+    граф друзей и ожидающие запросы читаются из БД один раз, общие друзья
+    всех пар считаются блоками A[start:end] @ A. Запись - пачками по
+    chunk_size пользователей, каждая пачка в отдельной транзакции.
+    Кандидаты пользователей, у которых больше нет друзей, удаляются.
+    """
+    run = FriendSuggestionRun.objects.create(full=True)
+    graph = load_friend_graph()
+    excluded = load_pending_requests(graph)
+    for user_ids, suggestions in iter_suggestions(
+        graph,
+        excluded,
+        limit or SUGGESTIONS_LIMIT,
+        chunk_size,
+        memory_budget,
+    ):
+        replace_suggestions(user_ids, suggestions)
+    FriendSuggestion.objects.filter(created_at__lt=run.created_at).delete()
+
+    run.users_count = len(graph.user_ids)
+    run.finished_at = timezone.now()
+    run.save(update_fields=['users_count', 'finished_at', 'updated_at'])
+    return run
+
+
+def synthetic_friend_graph(
+    users_count: int,
+    edges_count: int,
+    seed: int = 0,
+) -> FriendGraph:
+    """Случайный граф друзей для оценки времени и памяти пересчета.
+
+    Ребра выбираются равномерно, петли и повторы отбрасываются, поэтому
+    ребер может получиться немного меньше edges_count.
+    """
+    generator = np.random.default_rng(seed)
+    edges = generator.integers(
+        1,
+        users_count + 1,
+        size=(edges_count, 2),
+        dtype=np.int64,
+    )
+    return build_friend_graph(edges[edges[:, 0] != edges[:, 1]])
+
+
+def benchmark_friend_graph(
+    graph: FriendGraph,
+    limit: int,
+    memory_budget: Optional[int] = None,
+) -> Dict[str, float]:
+    """Время и пиковая память пересчета кандидатов графа без записи в БД.
+
+    blocks_peak - пик выделенной памяти во время произведений сверх
+    самого графа (байты), graph_bytes - размер матрицы смежности.
+    """
+    adjacency = graph.adjacency
+    excluded = sparse.csr_matrix(adjacency.shape, dtype=INDEX_DTYPE)
+    blocks = 0
+    candidates = 0
+    started = time.perf_counter()
+    tracemalloc.start()
+    for start, end in row_blocks(graph, memory_budget):
+        rows, _, _ = block_candidates(graph, excluded, start, end, limit)
+        blocks += 1
+        candidates += len(rows)
+    _, blocks_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'users': len(graph.user_ids),
+        'edges': adjacency.nnz // 2,
+        'blocks': blocks,
+        'candidates': candidates,
+        'seconds': time.perf_counter() - started,
+        'graph_bytes': (
+            adjacency.data.nbytes +
+            adjacency.indices.nbytes +
+            adjacency.indptr.nbytes
+        ),
+        'blocks_peak': blocks_peak,
+    }
@@ -0,0 +1,139 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+class KeysetPagination(CursorPagination):
+    """Keyset (cursor) пагинация.
+
+    В отличие от LimitOffsetPagination не выполняет COUNT(*) и не заставляет
+    БД пропускать offset строк: следующая страница выбирается условием
+    по последнему увиденному id (WHERE id < %s ORDER BY id DESC).
+    Курсоры next/previous непрозрачны для клиента и остаются стабильными
+    при добавлении новых записей.
+
+    Подключается во ViewSet через pagination_class.
+    """
+
+    ordering = '-id'
+    page_size_query_param = 'limit'
+    max_page_size = 1000
+
+    def get_ordering(self, request: Request, queryset, view) -> Tuple[str, ...]:
+        """Сортировка по первому полю ?ordering= с дополнением по pk.
+
+        Курсор хранит значение только первого поля, поэтому это должно
+        быть поле модели без NULL. Неуникальное поле дополняется pk в том
+        же направлении, иначе порядок равных значений на соседних
+        страницах не определен. Для остальных полей (аннотации, связанные
+        модели) - ordering по умолчанию.
+        """
+        name = super().get_ordering(request, queryset, view)[0]
+        field = _keyset_field(queryset.model, name.lstrip('-'))
+        if field is None:
+            return (self.ordering,)
+        if field.primary_key or field.unique:
+            return (name,)
+        direction = '-' if name.startswith('-') else ''
+        return (name, f'{direction}{queryset.model._meta.pk.name}')
+
+
+def _keyset_field(model, name: str) -> Optional[models.Field]:
+    """Поле модели, по которому можно построить курсор, или None."""
+    if name == 'pk':
+        return model._meta.pk
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if not field.concrete or field.null:
+        return None
+    return field
+
+
+class OptionalKeysetPagination(BasePagination):
+    """Пагинация по умолчанию (DEFAULT_PAGINATION_CLASS) или keyset.
+
+    Для списков, которые уже отдавались с count и offset: формат ответа
+    по умолчанию не меняется, keyset включается клиентом параметром
+    ?pagination=keyset. Ссылки next/previous сохраняют параметр, запрос с
+    cursor тоже считается keyset.
+    """
+
+    pagination_query_param = 'pagination'
+    keyset_value = 'keyset'
+
+    def __init__(self):
+        """Обе пагинации, выбор - при разбиении на страницы."""
+        self.default_paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+        self.keyset_paginator = KeysetPagination()
+        self.paginator = self.default_paginator
+
+    def uses_keyset(self, request: Request) -> bool:
+        """Запрошена ли keyset пагинация."""
+        query_params = request.query_params
+        if self.keyset_paginator.cursor_query_param in query_params:
+            return True
+        pagination = query_params.get(self.pagination_query_param)
+        return pagination == self.keyset_value
+
+    def get_ordering(self, request: Request, queryset, view) -> Tuple[str, ...]:
+        """Сортировка keyset пагинации.
+
+        Пагинацию по умолчанию сортирует OrderingFilter, для нее - пустой
+        кортеж.
+        """
+        if self.uses_keyset(request):
+            return self.keyset_paginator.get_ordering(request, queryset, view)
+        return ()
+
+    def paginate_queryset(
+        self,
+        queryset,
+        request: Request,
+        view=None,
+    ) -> Optional[List[Any]]:
+        """Страница выбранной пагинацией."""
+        if self.uses_keyset(request):
+            self.paginator = self.keyset_paginator
+        else:
+            self.paginator = self.default_paginator
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data) -> Response:  # noqa: WPS110
+        """Ответ выбранной пагинации."""
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema) -> Dict[str, Any]:
+        """Схема ответа по умолчанию."""
+        return self.default_paginator.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view) -> List[Dict[str, Any]]:
+        """Параметры обеих пагинаций и переключатель."""
+        parameters = {
+            parameter['name']: parameter
+            for paginator in (self.default_paginator, self.keyset_paginator)
+            for parameter in paginator.get_schema_operation_parameters(view)
+        }
+        parameters[self.pagination_query_param] = {
+            'name': self.pagination_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'keyset - пагинация курсором без count.',
+            'schema': {'type': 'string', 'enum': [self.keyset_value]},
+        }
+        return list(parameters.values())
+
+    def to_html(self) -> str:
+        """Элементы пагинации для browsable API."""
+        return self.paginator.to_html()
+
+    @property
+    def display_page_controls(self) -> bool:
+        """Показывать ли элементы пагинации в browsable API."""
+        return self.paginator.display_page_controls
@@ -1,16 +1,15 @@
-import re
-
-import phonenumbers
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.validators import validate_email
 from django.utils.translation import gettext_lazy as _
-from phonenumber_field.validators import validate_international_phonenumber
 from rest_framework import status
 from rest_framework.exceptions import APIException, NotFound, ValidationError
 
-from nova_friend import signals
+from nova_friend.services.contact_index import user_by_contact
+from nova_friend.services.contacts import normalize_email, normalize_phone
+from nova_friend.services.enums import ContactKind
+from nova_friend.services.signal_dispatch import dispatch_signal
 
 User = get_user_model()
 
@@ -72,16 +71,13 @@ class Receiver(object):
                 )
             return self.user_by_email()
 
-        # Поиск пользователя по телефону. Перед валидацией, удаляем все,
-        # кроме цифр и знака +
-        mb_numbers = ''.join(re.findall(r'^\+|\d', self.contact))
-        try:
-            validate_international_phonenumber(mb_numbers)
-        except DjangoValidationError:
+        # Поиск пользователя по телефону. Номер разбирается один раз:
+        # результат нормализации кэшируется и используется в user_by_phone.
+        if normalize_phone(self.contact, self.locale) is None:
             raise ValidationError(
                 _('Введен некорректный номер телефона.'),
             )
-        return self.user_by_phone(mb_numbers)
+        return self.user_by_phone(self.contact)
 
     def user_by_email(self) -> User:  # type: ignore
         """Account по почте.
@@ -89,39 +85,44 @@ class Receiver(object):
         Contact содержит электронную почту пользователя, которого хотели
         добавить в друзья.
         """
-        # Ищем пользователя в БД. Если не находим отправляем письмо на почту.
-        try:
-            return User.objects.get(email=self.contact)
-        except User.DoesNotExist:
+        # Ищем пользователя по индексу контактов (email без учета
+        # регистра). Если не находим отправляем письмо на почту.
+        user = user_by_contact(
+            ContactKind.EMAIL,
+            normalize_email(self.contact) or self.contact,
+        )
+        if user is None:
             # Отправляем сигнал, который указывает на то, что пользователь
             # пытается добавить другого пользователя не существующего в системе.
-            signals.inviting_new_user_by_email.send(
+            dispatch_signal(
+                'inviting_new_user_by_email',
                 sender=self.__class__,
+                # Запрос завершится NotFound, транзакция запроса может
+                # откатиться - приглашение не должно зависеть от нее.
+                on_commit=False,
                 sending_user_id=self.sending_user.id,
                 new_user_email=self.contact,
                 locale=self.locale,
             )
             raise NotFound(_('Пользователь не найден в системе.'))
+        return user
 
     def user_by_phone(self, phone: str) -> User:
         """Аккаунт по номеру телефона."""
-        try:
-            number = phonenumbers.parse(phone, self.locale.upper())
-        except phonenumbers.phonenumberutil.NumberParseException:
+        formatted_number = normalize_phone(phone, self.locale)
+        if formatted_number is None:
             raise ValidationError(_('Введен некорректный номер телефона.'))
 
-        formatted_number = phonenumbers.format_number(
-            number,
-            phonenumbers.PhoneNumberFormat.E164,
-        )
-
-        try:
-            return User.objects.get(phone=formatted_number)
-        except User.DoesNotExist:
+        user = user_by_contact(ContactKind.PHONE, formatted_number)
+        if user is None:
             # Отправляем сигнал, который указывает на то, что пользователь
             # пытается добавить другого пользователя не существующего в системе.
-            signals.inviting_new_user_by_phone.send(
+            dispatch_signal(
+                'inviting_new_user_by_phone',
                 sender=self.__class__,
+                # Запрос завершится NotFound, транзакция запроса может
+                # откатиться - приглашение не должно зависеть от нее.
+                on_commit=False,
                 sending_user_id=self.sending_user.id,
                 new_user_phone=formatted_number,
                 locale=self.locale,
@@ -134,3 +135,4 @@ class Receiver(object):
                     'добавления друзей.',
                 ),
             )
+        return user
@@ -0,0 +1,140 @@
+from typing import Iterable, List, NamedTuple, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+
+from nova_friend.models import ReferralCode, ReferralInvite
+from nova_friend.services.referral_stats import increment_referral_stats
+from nova_friend.services.resolve_referral_code import (
+    normalize_referral_code,
+)
+
+User = get_user_model()
+
+
+class ReferralAttribution(NamedTuple):
+    """Регистрация пользователя по реферальному коду или ссылке.
+
+    referral_code - код, по которому зарегистрировался пользователь.
+    referral_user_email - email пригласившего из ссылки get_referral_link.
+    Если указаны оба, используется код.
+    """
+
+    invited_user_id: int
+    referral_code: Optional[str] = None
+    referral_user_email: Optional[str] = None
+
+
+class RecordedReferralInvite(NamedTuple):
+    """Созданный ReferralInvite."""
+
+    id: int  # noqa: A003, WPS125
+    referral_user_id: int
+    invited_user_id: int
+    referral_code_id: Optional[int]
+
+
+def _insert_sql(rows_count: int) -> str:
+    """INSERT ... SELECT с поиском кодов и пригласивших по email.
+
+    Приглашение без найденного пригласившего и приглашение самого себя
+    не записываются, уже приглашенный пользователь пропускается
+    (ON CONFLICT по уникальному invited_user).
+    """
+    qn = connection.ops.quote_name
+    invite_table = qn(ReferralInvite._meta.db_table)  # noqa: WPS437
+    code_table = qn(ReferralCode._meta.db_table)  # noqa: WPS437
+    user_table = qn(User._meta.db_table)  # noqa: WPS437
+    user_pk = qn(User._meta.pk.column)  # noqa: WPS437
+    user_email = qn(User._meta.get_field('email').column)  # noqa: WPS437
+    referral_user_id = f'COALESCE(code.{qn("user_id")}, referrer.{user_pk})'
+    values = ', '.join(['(%s, %s, %s)'] * rows_count)
+    return f"""
+        WITH data (invited_user_id, code, email) AS (VALUES {values})
+        INSERT INTO {invite_table} (
+            {qn('created_at')},
+            {qn('updated_at')},
+            {qn('referral_user_id')},
+            {qn('invited_user_id')},
+            {qn('referral_code_id')}
+        )
+        SELECT %s, %s, {referral_user_id}, data.invited_user_id, code.id
+        FROM data
+        LEFT JOIN {code_table} AS code ON code.{qn('code')} = data.code
+        LEFT JOIN {user_table} AS referrer
+            ON referrer.{user_email} = data.email
+        WHERE {referral_user_id} IS NOT NULL
+            AND {referral_user_id} <> data.invited_user_id
+        ON CONFLICT ({qn('invited_user_id')}) DO NOTHING
+        RETURNING
+            {qn('id')},
+            {qn('referral_user_id')},
+            {qn('invited_user_id')},
+            {qn('referral_code_id')}
+    """
+
+
+@transaction.atomic
+def record_referral_invites(
+    attributions: Iterable[ReferralAttribution],
+) -> List[RecordedReferralInvite]:
+    """Запись пачки приглашений по реферальной системе одним INSERT.
+
+    Коды и пригласившие по email ищутся в том же INSERT ... SELECT,
+    повторная запись приглашения пользователя ничего не меняет
+    (ON CONFLICT DO NOTHING), поэтому параллельные регистрации и повторный
+    запуск импорта безопасны. В той же транзакции обновляется статистика
+    приглашений. Возвращаются только созданные приглашения.
+    """
+    rows = {}
+    for attribution in attributions:
+        code = normalize_referral_code(attribution.referral_code or '')
+        email = None if code else attribution.referral_user_email
+        if code or email:
+            # Первое приглашение пользователя в пачке.
+            rows.setdefault(attribution.invited_user_id, (code, email))
+    if not rows:
+        return []
+
+    invited_at = timezone.now()
+    now = ReferralInvite._meta.get_field(  # noqa: WPS437
+        'created_at',
+    ).get_db_prep_value(invited_at, connection)
+    params = []
+    for invited_user_id, (code, email) in rows.items():
+        params.extend((invited_user_id, code, email))
+    params.extend((now, now))
+
+    with connection.cursor() as cursor:
+        cursor.execute(_insert_sql(len(rows)), params)
+        recorded = [RecordedReferralInvite(*row) for row in cursor.fetchall()]
+
+    increment_referral_stats(
+        (
+            (invite.referral_user_id, invite.referral_code_id)
+            for invite in recorded
+        ),
+        invited_at=invited_at,
+    )
+    return recorded
+
+
+def record_referral_invite(
+    invited_user: User,
+    referral_code: Optional[str] = None,
+    referral_user_email: Optional[str] = None,
+) -> Optional[RecordedReferralInvite]:
+    """Запись приглашения пользователя при регистрации.
+
+    Возвращает None, если пригласивший не найден или пользователь уже
+    был приглашен.
+    """
+    recorded = record_referral_invites([
+        ReferralAttribution(
+            invited_user_id=invited_user.id,
+            referral_code=referral_code,
+            referral_user_email=referral_user_email,
+        ),
+    ])
+    return recorded[0] if recorded else None
@@ -0,0 +1,164 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from nova_friend.models import ReferralInvite, ReferralStats
+
+# Ключ статистики: (id пригласившего, id реферального кода или None).
+StatsKey = Tuple[int, Optional[int]]
+
+
+def _stats_filter(keys: Iterable[StatsKey]) -> models.Q:
+    """Условие на записи статистики по ключам."""
+    return reduce(
+        or_,
+        (
+            models.Q(user_id=user_id, referral_code_id=referral_code_id)
+            for user_id, referral_code_id in keys
+        ),
+    )
+
+
+def increment_referral_stats(
+    keys: Iterable[StatsKey],
+    invited_at: Optional[datetime] = None,
+) -> None:
+    """Учесть новые приглашения в статистике.
+
+    keys - ключ каждого нового приглашения. Недостающие записи создаются
+    одной вставкой, счетчики увеличиваются выражением F() одним UPDATE на
+    каждое различное приращение, поэтому параллельные приглашения не
+    теряются.
+    """
+    counts = Counter(keys)
+    if not counts:
+        return
+    invited_at = invited_at or timezone.now()
+
+    ReferralStats.objects.bulk_create(
+        [
+            ReferralStats(user_id=user_id, referral_code_id=referral_code_id)
+            for user_id, referral_code_id in counts
+        ],
+        ignore_conflicts=True,
+    )
+
+    keys_by_increment = defaultdict(list)
+    for key, increment in counts.items():
+        keys_by_increment[increment].append(key)
+    for increment, increment_keys in keys_by_increment.items():
+        ReferralStats.objects.filter(_stats_filter(increment_keys)).update(
+            invite_count=models.F('invite_count') + increment,
+            last_invite_at=invited_at,
+            updated_at=invited_at,
+        )
+
+
+def _chunk_user_ids(after_user_id: int, chunk_size: int) -> List[int]:
+    """Следующие chunk_size id пригласивших пользователей."""
+    return list(
+        ReferralInvite.objects.filter(
+            referral_user_id__gt=after_user_id,
+        ).order_by(
+            'referral_user_id',
+        ).values_list(
+            'referral_user_id',
+            flat=True,
+        ).distinct()[:chunk_size],
+    )
+
+
+def _exact_stats(user_ids: List[int]) -> Dict[StatsKey, Tuple[int, datetime]]:
+    """Количество и время последнего приглашения по ReferralInvite."""
+    rows = ReferralInvite.objects.filter(
+        referral_user_id__in=user_ids,
+    ).order_by().values(
+        'referral_user_id',
+        'referral_code_id',
+    ).annotate(
+        invite_count=models.Count('id'),
+        last_invite_at=models.Max('created_at'),
+    )
+    return {
+        (row['referral_user_id'], row['referral_code_id']): (
+            row['invite_count'],
+            row['last_invite_at'],
+        )
+        for row in rows
+    }
+
+
+@transaction.atomic
+def _recompute_chunk(user_ids: List[int]) -> int:
+    """Пересчет статистики пользователей user_ids по ReferralInvite.
+
+    Записи изменяются на месте, а не удаляются и создаются заново, поэтому
+    читающие статистику не видят ее пропавшей. Записи блокируются до
+    подсчета, поэтому приглашения параллельных транзакций
+    (increment_referral_stats) не теряются.
+    """
+    locked = {
+        (stats.user_id, stats.referral_code_id): stats
+        for stats in ReferralStats.objects.select_for_update().filter(
+            user_id__in=user_ids,
+        ).order_by('id')
+    }
+    exact = _exact_stats(user_ids)
+    now = timezone.now()
+    changed, created = [], []
+    for key, (invite_count, last_invite_at) in exact.items():
+        stats = locked.get(key)
+        if stats is None:
+            stats = ReferralStats(user_id=key[0], referral_code_id=key[1])
+            created.append(stats)
+        elif (stats.invite_count, stats.last_invite_at) == (
+            invite_count,
+            last_invite_at,
+        ):
+            continue
+        else:
+            changed.append(stats)
+        stats.invite_count = invite_count
+        stats.last_invite_at = last_invite_at
+        stats.updated_at = now
+
+    ReferralStats.objects.bulk_update(
+        changed,
+        ['invite_count', 'last_invite_at', 'updated_at'],
+    )
+    ReferralStats.objects.bulk_create(created, ignore_conflicts=True)
+    ReferralStats.objects.filter(
+        id__in=[
+            stats.id
+            for key, stats in locked.items()
+            if key not in exact
+        ],
+    ).delete()
+    return len(exact)
+
+
+def recompute_referral_stats(chunk_size: int) -> int:
+    """Полный пересчет статистики приглашений.
+
+    Пользователи обрабатываются пачками по chunk_size, каждая пачка - в
+    отдельной транзакции, записи изменяются на месте. Записи без
+    приглашений удаляются.
+    Возвращает количество записей статистики.
+    """
+    total = 0
+    last_user_id = 0
+    user_ids = _chunk_user_ids(last_user_id, chunk_size)
+    while user_ids:
+        total += _recompute_chunk(user_ids)
+        last_user_id = user_ids[-1]
+        user_ids = _chunk_user_ids(last_user_id, chunk_size)
+
+    ReferralStats.objects.exclude(
+        user_id__in=ReferralInvite.objects.values('referral_user_id'),
+    ).delete()
+    return total
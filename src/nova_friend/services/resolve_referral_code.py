@@ -0,0 +1,76 @@
+import re
+from typing import Iterable, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from nova_friend.models import ReferralCode
+
+REFERRAL_CODE_CACHE_TIMEOUT = getattr(
+    settings,
+    'NOVA_FRIEND_REFERRAL_CODE_CACHE_TIMEOUT',
+    60 * 60,
+)
+REFERRAL_CODE_NEGATIVE_CACHE_TIMEOUT = getattr(
+    settings,
+    'NOVA_FRIEND_REFERRAL_CODE_NEGATIVE_CACHE_TIMEOUT',
+    60,
+)
+REFERRAL_CODE_CACHE_PREFIX = 'nova_friend:referral_code:'
+
+# Значение в кэше для несуществующего кода.
+NOT_FOUND = 0
+
+REFERRAL_CODE_RE = re.compile('[0-9A-Z]{1,8}')
+
+
+class ResolvedReferralCode(NamedTuple):
+    """Реферальный код и его владелец."""
+
+    referral_code_id: int
+    user_id: int
+
+
+def normalize_referral_code(code: str) -> Optional[str]:
+    """Код в верхнем регистре или None, если такого кода быть не может."""
+    code = code.strip().upper()
+    return code if REFERRAL_CODE_RE.fullmatch(code) else None
+
+
+def _cache_key(code: str) -> str:
+    """Ключ кэша для кода."""
+    return f'{REFERRAL_CODE_CACHE_PREFIX}{code}'
+
+
+def resolve_referral_code(code: str) -> Optional[ResolvedReferralCode]:
+    """Id реферального кода и его владельца по коду.
+
+    Результат кэшируется, в том числе отсутствие кода (на меньшее время),
+    поэтому перебор кодов не доходит до БД. Кэш сбрасывается при
+    сохранении и удалении ReferralCode.
+    """
+    code = normalize_referral_code(code)
+    if code is None:
+        return None
+
+    cached = cache.get(_cache_key(code))
+    if cached is None:
+        referral_code = ReferralCode.objects.filter(
+            code=code,
+        ).values_list('id', 'user_id').first()
+        if referral_code is None:
+            cached = NOT_FOUND
+            timeout = REFERRAL_CODE_NEGATIVE_CACHE_TIMEOUT
+        else:
+            cached = list(referral_code)
+            timeout = REFERRAL_CODE_CACHE_TIMEOUT
+        cache.set(_cache_key(code), cached, timeout)
+
+    if cached == NOT_FOUND:
+        return None
+    return ResolvedReferralCode(*cached)
+
+
+def invalidate_referral_codes(codes: Iterable[str]) -> None:
+    """Сбросить кэш для кодов."""
+    cache.delete_many([_cache_key(code) for code in codes])
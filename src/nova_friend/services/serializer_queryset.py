@@ -0,0 +1,145 @@
+from typing import Iterable, List, Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+
+
+class _QuerysetPlan(object):
+    """select_related и only() для queryset сериализатора."""
+
+    def __init__(self):
+        """Установка переменных."""
+        self.related: List[str] = []
+        self.only: List[str] = []
+
+    def add_related(self, path: str) -> None:
+        """Добавить связь в select_related."""
+        if path not in self.related:
+            self.related.append(path)
+
+    def add_columns(self, prefix: str, columns: Iterable[str]) -> None:
+        """Добавить поля модели в only()."""
+        for column in columns:
+            if f'{prefix}{column}' not in self.only:
+                self.only.append(f'{prefix}{column}')
+
+
+def model_field_or_none(model, name: str) -> Optional[models.Field]:
+    """Поле модели или None, если это не поле (свойство, метод)."""
+    try:
+        return model._meta.get_field(name)  # noqa: WPS437
+    except FieldDoesNotExist:
+        return None
+
+
+def is_single_relation(field) -> bool:
+    """Связь с одним объектом: ForeignKey или OneToOne в любую сторону."""
+    return field.is_relation and (field.many_to_one or field.one_to_one)
+
+
+def _all_columns(model) -> List[str]:
+    """Все поля модели, хранящиеся в ее таблице."""
+    return [
+        field.name
+        for field in model._meta.concrete_fields  # noqa: WPS437
+    ]
+
+
+def _collect_source(  # noqa: WPS231
+    source_attrs: List[str],
+    model,
+    prefix: str,
+    plan: _QuerysetPlan,
+) -> bool:
+    """Связи и поля для source вида 'relation.field'.
+
+    Возвращает False, если source нельзя разобрать в поля модели.
+    """
+    name, *rest = source_attrs
+    field = model_field_or_none(model, name)
+    if field is None:
+        return False
+    if not rest:
+        if field.concrete:
+            plan.add_columns(prefix, [name])
+            return True
+        return False
+    if not is_single_relation(field):
+        return False
+    path = f'{prefix}{name}'
+    plan.add_related(path)
+    plan.add_columns(f'{path}__', [field.related_model._meta.pk.name])
+    if field.concrete:
+        plan.add_columns(prefix, [name])
+    return _collect_source(rest, field.related_model, f'{path}__', plan)
+
+
+def _collect(  # noqa: C901, WPS231
+    serializer: serializers.Serializer,
+    model,
+    prefix: str,
+    plan: _QuerysetPlan,
+    annotations: Iterable[str] = (),
+) -> None:
+    """Связи и поля, которые читает сериализатор модели model."""
+    columns = {model._meta.pk.name}  # noqa: WPS437
+    if not prefix:
+        # save() объекта с отложенными полями сохраняет только загруженные
+        # поля, поэтому поля auto_now загружаются всегда.
+        columns.update(
+            field.name
+            for field in model._meta.concrete_fields  # noqa: WPS437
+            if getattr(field, 'auto_now', False)
+        )
+    restricted = True
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            # SerializerMethodField и т.п.: неизвестно, какие поля нужны.
+            restricted = False
+            continue
+
+        name = field.source_attrs[0]
+        model_field = model_field_or_none(model, name)
+        nested = isinstance(field, serializers.Serializer)
+        if nested and len(field.source_attrs) == 1:
+            if model_field is None or not is_single_relation(model_field):
+                restricted = False
+                continue
+            path = f'{prefix}{name}'
+            plan.add_related(path)
+            if model_field.concrete:
+                columns.add(name)
+            _collect(field, model_field.related_model, f'{path}__', plan)
+        elif name in annotations and len(field.source_attrs) == 1:
+            continue
+        elif not _collect_source(field.source_attrs, model, prefix, plan):
+            restricted = False
+    plan.add_columns(prefix, columns if restricted else _all_columns(model))
+
+
+def queryset_for_serializer(
+    queryset: models.QuerySet,
+    serializer_class,
+) -> models.QuerySet:
+    """Queryset с select_related и only() по объявлению сериализатора.
+
+    Вложенные ModelSerializer на ForeignKey/OneToOne и source вида
+    'relation.field' превращаются в select_related, поля модели - в only().
+    Если сериализатор читает то, что нельзя вывести из объявления
+    (SerializerMethodField, свойства), модель загружается целиком, а нужные
+    методам связи указываются в select_related исходного queryset.
+    """
+    plan = _QuerysetPlan()
+    _collect(
+        serializer_class(),
+        queryset.model,
+        '',
+        plan,
+        annotations=queryset.query.annotations,
+    )
+    if plan.related:
+        queryset = queryset.select_related(*plan.related)
+    return queryset.only(*plan.only)
@@ -0,0 +1,134 @@
+import time
+from functools import partial
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from nova_friend import signals, tasks
+from nova_friend.services.enums import SignalDispatchMode
+
+# Ключи окон объединения сигналов в кэше.
+COALESCE_CACHE_PREFIX = 'nova_friend:signals:'
+# Время жизни сигналов окна в кэше (секунды): задача отправки могла
+# задержаться в очереди Celery.
+COALESCE_CACHE_TIMEOUT = 60 * 60
+
+
+def _dispatch_mode() -> str:
+    """Способ отправки сигналов из настроек."""
+    return getattr(
+        settings,
+        'NOVA_FRIEND_SIGNAL_DISPATCH',
+        SignalDispatchMode.SYNC,
+    )
+
+
+def _coalesce() -> bool:
+    """Объединять ли сигналы окна в одну задачу."""
+    return getattr(settings, 'NOVA_FRIEND_SIGNAL_COALESCE', False)
+
+
+def _coalesce_window() -> int:
+    """Длительность окна объединения сигналов (секунды)."""
+    return getattr(settings, 'NOVA_FRIEND_SIGNAL_COALESCE_WINDOW', 2)
+
+
+def _window_key(signal_name: str, window: int, suffix) -> str:
+    """Ключ кэша окна: счетчик (count) или сигнал по номеру."""
+    return f'{COALESCE_CACHE_PREFIX}{signal_name}:{window}:{suffix}'
+
+
+def _send(signal_name: str, payload: Dict[str, Any]) -> None:
+    """Задача Celery на один сигнал."""
+    tasks.send_signals.delay(signal_name, [payload])
+
+
+def _send_coalesced(signal_name: str, payload: Dict[str, Any]) -> None:
+    """Сигнал в текущее окно объединения.
+
+    Сигналы окна хранятся в кэше под номерами 1..count, первый сигнал
+    ставит задачу flush_signals с отсрочкой до конца следующего окна:
+    к этому времени запись в окно завершена во всех процессах. Кэш должен
+    быть общим для приложения и worker (например, Redis).
+    """
+    duration = _coalesce_window()
+    now = time.time()
+    window = int(now // duration)
+    count_key = _window_key(signal_name, window, 'count')
+    cache.add(count_key, 0, COALESCE_CACHE_TIMEOUT)
+    try:
+        index = cache.incr(count_key)
+    except ValueError:
+        # Счетчик вытеснен из кэша - сигнал отправляется отдельно.
+        _send(signal_name, payload)
+        return
+    cache.set(
+        _window_key(signal_name, window, index),
+        payload,
+        COALESCE_CACHE_TIMEOUT,
+    )
+    if index == 1:
+        tasks.flush_signals.apply_async(
+            (signal_name, window),
+            countdown=(window + 2) * duration - now,
+        )
+
+
+def pop_coalesced(signal_name: str, window: int) -> List[Dict[str, Any]]:
+    """Сигналы окна в порядке поступления, окно удаляется из кэша."""
+    count_key = _window_key(signal_name, window, 'count')
+    keys = [
+        _window_key(signal_name, window, index)
+        for index in range(1, (cache.get(count_key) or 0) + 1)
+    ]
+    payloads = cache.get_many(keys)
+    cache.delete_many([count_key, *keys])
+    return [payloads[key] for key in keys if key in payloads]
+
+
+def _payload(sender, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Данные сигнала для передачи в задачу Celery."""
+    sender_is_class = isinstance(sender, type)
+    if sender_is_class:
+        sender = f'{sender.__module__}.{sender.__qualname__}'
+    return {
+        'sender': sender,
+        'sender_is_class': sender_is_class,
+        'kwargs': kwargs,
+    }
+
+
+def dispatch_signal(
+    signal_name: str,
+    sender,
+    on_commit: bool = True,
+    **kwargs,
+) -> None:
+    """Отправка сигнала nova_friend способом из настроек.
+
+    NOVA_FRIEND_SIGNAL_DISPATCH = 'sync' - сигнал отправляется сразу,
+    как и раньше. 'async' - после фиксации текущей транзакции ставится
+    задача Celery, которая отправляет сигнал в worker. Вне транзакции
+    задача ставится сразу. Аргументы сигнала должны сериализоваться в JSON.
+
+    on_commit=False - задача ставится сразу, независимо от исхода
+    транзакции. Так отправляются приглашения, после которых запрос
+    завершается ошибкой: при ATOMIC_REQUESTS транзакция запроса
+    откатывается вместе с отложенными вызовами.
+
+    При NOVA_FRIEND_SIGNAL_COALESCE = True сигналы одного типа за окно
+    NOVA_FRIEND_SIGNAL_COALESCE_WINDOW секунд, в том числе из разных
+    запросов, передаются в worker одной задачей.
+    """
+    if _dispatch_mode() != SignalDispatchMode.ASYNC:
+        getattr(signals, signal_name).send(sender=sender, **kwargs)
+        return
+
+    send = _send_coalesced if _coalesce() else _send
+    payload = _payload(sender, kwargs)
+    if not on_commit:
+        send(signal_name, payload)
+        return
+    transaction.on_commit(partial(send, signal_name, payload))
@@ -0,0 +1,306 @@
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.throttling import BaseThrottle
+
+from nova_friend.services.contact_index import contact_hash
+from nova_friend.services.contacts import normalize_email, normalize_phone
+
+# Лимиты по scope в формате DRF: 'количество/период' (s, m, h, d), None -
+# без ограничения. Значения из NOVA_FRIEND_THROTTLE_RATES дополняют и
+# переопределяют значения по умолчанию.
+THROTTLE_RATES: Dict[str, Optional[str]] = {
+    # Запросы в друзья одного пользователя.
+    'friend_request_user': '30/m',
+    # Запросы в друзья на один контакт от всех пользователей.
+    'friend_request_contact': '10/h',
+    # Ненайденные контакты (приглашения по SMS/e-mail) одного пользователя.
+    'friend_request_not_found_user': '20/h',
+    # Приглашения на один ненайденный контакт от всех пользователей.
+    'friend_request_not_found_contact': '3/d',
+    # Создание запросов по адресной книге одного пользователя.
+    'friend_request_bulk_user': '10/h',
+    # Проверка реферального кода с одного IP-адреса.
+    'referral_code_resolve': '30/m',
+    # Хэши контактов, проверенные одним пользователем.
+    'contact_hash_lookup_user': '20000/d',
+    **getattr(settings, 'NOVA_FRIEND_THROTTLE_RATES', {}),
+}
+THROTTLE_CACHE_PREFIX = 'nova_friend:throttle:'
+
+# Период лимита в секундах по первой букве.
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Лимит 'количество/период' в (количество, период в секундах)."""
+    if rate is None:
+        return None
+    num_requests, period = rate.split('/')
+    return int(num_requests), RATE_PERIODS[period[0]]
+
+
+def contact_ident(request: Request) -> Optional[str]:
+    """Хэш нормализованного контакта из тела запроса.
+
+    Контакт в ключ кэша не попадает. Для запроса ссылки (referral_link)
+    и пустого контакта - None.
+    """
+    contact = request.data.get('contact')
+    if not isinstance(contact, str) or contact in {'', 'referral_link'}:
+        return None
+    if '@' in contact:
+        normalized = normalize_email(contact)
+    else:
+        normalized = normalize_phone(
+            contact,
+            getattr(request, 'LANGUAGE_CODE', settings.LANGUAGE_CODE),
+        )
+    return contact_hash(normalized or contact.strip().lower())
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Ограничение частоты скользящим окном в кэше Django.
+
+    Счетчики хранятся по окнам длиной в период лимита. Оценка количества
+    запросов за последний период - счетчик текущего окна плюс доля
+    счетчика предыдущего окна, еще попадающая в период. Счетчик
+    увеличивается атомарно (cache.incr), поэтому параллельные запросы
+    не теряют обращения.
+
+    Наследник задает scope и get_idents - идентификаторы (пользователь,
+    контакт), для каждого из которых лимит считается отдельно. Запрос
+    отклоняется, если лимит исчерпан хотя бы по одному идентификатору;
+    wait - время до освобождения лимита, DRF возвращает его в заголовке
+    Retry-After. get_weight - сколько единиц лимита занимает запрос.
+    """
+
+    scope: str = ''
+    timer = time.time
+
+    def __init__(self):
+        """Лимит scope из THROTTLE_RATES."""
+        self.rate = parse_rate(THROTTLE_RATES.get(self.scope))
+        self.wait_seconds: Optional[float] = None
+
+    def get_idents(self, request: Request, view) -> List[str]:
+        """Идентификаторы, по которым считается лимит."""
+        raise NotImplementedError
+
+    def get_weight(self, request: Request, view) -> int:
+        """Единиц лимита на запрос."""
+        return 1
+
+    def _keys(self, ident: str, window: int) -> Tuple[str, str]:
+        """Ключи кэша предыдущего и текущего окна."""
+        prefix = f'{THROTTLE_CACHE_PREFIX}{self.scope}:{ident}:'
+        return f'{prefix}{window - 1}', f'{prefix}{window}'
+
+    def _wait(
+        self,
+        previous: int,
+        current: int,
+        elapsed: float,
+        weight: int = 1,
+    ) -> Optional[float]:
+        """Время до следующего разрешенного запроса или None, если можно.
+
+        elapsed - доля текущего окна, которая уже прошла. Запрос тяжелее
+        всего лимита не пройдет никогда, для него - два периода.
+        """
+        num_requests, duration = self.rate
+        allowed = num_requests - weight
+        if allowed < 0:
+            return duration * 2
+        if previous * (1 - elapsed) + current <= allowed:
+            return None
+        if current <= allowed:
+            # Освободится в текущем окне, когда уйдет часть предыдущего.
+            return duration * (1 - elapsed - (allowed - current) / previous)
+        # Только в следующем окне, когда уйдет часть текущего.
+        return duration * (2 - elapsed - allowed / max(current, 1))
+
+    def allow_request(self, request: Request, view) -> bool:
+        """Проверка лимита по всем идентификаторам и учет запроса."""
+        if self.rate is None:
+            return True
+        idents = self.get_idents(request, view)
+        if not idents:
+            return True
+
+        duration = self.rate[1]
+        now = self.timer()
+        window = int(now // duration)
+        elapsed = now / duration - window
+        weight = self.get_weight(request, view)
+        keys = [self._keys(ident, window) for ident in idents]
+        counts = cache.get_many([key for pair in keys for key in pair])
+        waits = [
+            self._wait(
+                counts.get(previous, 0),
+                counts.get(current, 0),
+                elapsed,
+                weight,
+            )
+            for previous, current in keys
+        ]
+        waits = [wait for wait in waits if wait is not None]
+        if waits:
+            self.wait_seconds = max(waits)
+            return False
+        if self.counts_request(request, view):
+            self.hit([current for _, current in keys], weight)
+        return True
+
+    def counts_request(self, request: Request, view) -> bool:
+        """Учитывается ли разрешенный запрос сразу при проверке."""
+        return True
+
+    def hit(self, keys: List[str], weight: int = 1) -> None:
+        """Увеличить счетчики текущих окон на weight.
+
+        Ключ живет два периода: текущий и следующий, где он - предыдущее
+        окно.
+        """
+        timeout = self.rate[1] * 2
+        for key in keys:
+            cache.add(key, 0, timeout)
+            try:
+                cache.incr(key, weight)
+            except ValueError:
+                # Ключ вытеснен из кэша между add и incr.
+                cache.set(key, weight, timeout)
+
+    def record(self, request: Request, view) -> None:
+        """Учесть запрос после проверки (см. counts_request)."""
+        if self.rate is None:
+            return
+        window = int(self.timer() // self.rate[1])
+        self.hit([
+            self._keys(ident, window)[1]
+            for ident in self.get_idents(request, view)
+        ])
+
+    def wait(self) -> Optional[float]:
+        """Секунды до освобождения лимита (заголовок Retry-After)."""
+        if self.wait_seconds is None:
+            return None
+        return max(math.ceil(self.wait_seconds), 1)
+
+
+class FriendRequestUserThrottle(SlidingWindowThrottle):
+    """Запросы в друзья одного пользователя."""
+
+    scope = 'friend_request_user'
+
+    def get_idents(self, request: Request, view) -> List[str]:
+        """Id пользователя."""
+        return [str(request.user.pk)]
+
+
+class FriendRequestContactThrottle(SlidingWindowThrottle):
+    """Запросы в друзья на один контакт от всех пользователей."""
+
+    scope = 'friend_request_contact'
+
+    def get_idents(self, request: Request, view) -> List[str]:
+        """Хэш контакта."""
+        ident = contact_ident(request)
+        return [] if ident is None else [ident]
+
+
+class NotFoundContactThrottle(FriendRequestContactThrottle):
+    """Приглашения на один ненайденный контакт от всех пользователей."""
+
+    scope = 'friend_request_not_found_contact'
+
+    def counts_request(self, request: Request, view) -> bool:
+        """Запрос учитывается только при ненайденном контакте."""
+        return False
+
+
+class FriendRequestNotFoundThrottle(SlidingWindowThrottle):
+    """Запросы в друзья на ненайденные контакты.
+
+    Исход запроса известен только после поиска получателя, поэтому
+    проверка только отклоняет запросы при исчерпанном лимите, а
+    ненайденный контакт учитывает view через record. Лимиты считаются по
+    пользователю (friend_request_not_found_user) и по контакту
+    (friend_request_not_found_contact): на каждый ненайденный контакт
+    отправляется приглашение по SMS или e-mail.
+    """
+
+    scope = 'friend_request_not_found_user'
+
+    def __init__(self):
+        """Лимиты по пользователю и по контакту."""
+        super().__init__()
+        self.contact_throttle = NotFoundContactThrottle()
+
+    def get_idents(self, request: Request, view) -> List[str]:
+        """Id пользователя."""
+        return [str(request.user.pk)]
+
+    def counts_request(self, request: Request, view) -> bool:
+        """Запрос учитывается только при ненайденном контакте."""
+        return False
+
+    def allow_request(self, request: Request, view) -> bool:
+        """Проверка лимитов по пользователю и по контакту."""
+        if not super().allow_request(request, view):
+            return False
+        if not self.contact_throttle.allow_request(request, view):
+            self.wait_seconds = self.contact_throttle.wait_seconds
+            return False
+        return True
+
+    def record(self, request: Request, view) -> None:
+        """Учесть ненайденный контакт в обоих лимитах."""
+        super().record(request, view)
+        self.contact_throttle.record(request, view)
+
+
+class FriendRequestBulkThrottle(FriendRequestUserThrottle):
+    """Создание запросов в друзья по адресной книге одного пользователя."""
+
+    scope = 'friend_request_bulk_user'
+
+
+class ReferralCodeResolveThrottle(SlidingWindowThrottle):
+    """Проверка реферального кода с одного IP-адреса.
+
+    Проверка доступна без авторизации, лимит ограничивает перебор кодов.
+    """
+
+    scope = 'referral_code_resolve'
+
+    def get_idents(self, request: Request, view) -> List[str]:
+        """IP-адрес клиента (с учетом NUM_PROXIES)."""
+        return [self.get_ident(request)]
+
+
+class ContactHashLookupThrottle(SlidingWindowThrottle):
+    """Хэши контактов, проверенные одним пользователем.
+
+    Лимит считается в хэшах, а не в запросах, иначе перебор номеров
+    шел бы пачками по LOOKUP_MAX_HASHES.
+    """
+
+    scope = 'contact_hash_lookup_user'
+
+    def get_idents(self, request: Request, view) -> List[str]:
+        """Id пользователя."""
+        return [str(request.user.pk)]
+
+    def get_weight(self, request: Request, view) -> int:
+        """Количество хэшей в запросе."""
+        hashes = None
+        if isinstance(request.data, dict):
+            hashes = request.data.get('hashes')
+        if not isinstance(hashes, list):
+            return 1
+        return max(len(hashes), 1)
@@ -0,0 +1,213 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import Field
+
+from nova_friend.services.serializer_queryset import (
+    is_single_relation,
+    model_field_or_none,
+)
+
+# Функция, которая по строке .values() возвращает значение поля ответа.
+Accessor = Callable[[Dict[str, Any]], Any]
+
+
+class NotCompilable(Exception):  # noqa: N818
+    """Сериализатор нельзя вывести из строк .values()."""
+
+
+class ValuesPlan(object):
+    """Скомпилированный сериализатор: поля .values() и функции доступа."""
+
+    def __init__(self, lookups: List[str], render: Accessor):
+        """Установка переменных."""
+        self.lookups = lookups
+        self.render = render
+
+    def render_many(self, rows: Iterable[Dict[str, Any]]) -> List[dict]:
+        """Данные ответа для строк .values()."""
+        render = self.render
+        return [render(row) for row in rows]
+
+
+def _converter(field: Field) -> Callable[[Any], Any]:
+    """Преобразование значения столбца в значение ответа."""
+    values_representation = getattr(field, 'values_representation', None)
+    if values_representation is not None:
+        return values_representation
+    if type(field).get_attribute is not Field.get_attribute:
+        raise NotCompilable(field.field_name)
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # .values() возвращает id связанного объекта.
+        return field.pk_field.to_representation if field.pk_field else None
+    if isinstance(field, serializers.RelatedField):
+        raise NotCompilable(field.field_name)
+    return field.to_representation
+
+
+def _leaf(lookup: str, field: Field) -> Accessor:
+    """Функция доступа к простому полю.
+
+    None выводится как None без вызова to_representation, как в DRF.
+    Поле с методом values_representation получает и None.
+    """
+    convert = _converter(field)
+    if convert is None:
+        return lambda row: row[lookup]
+    if getattr(field, 'values_representation', None) is not None:
+        return lambda row: convert(row[lookup])
+
+    def accessor(row):  # noqa: WPS430
+        value = row[lookup]
+        return None if value is None else convert(value)
+    return accessor
+
+
+def _source_lookup(  # noqa: WPS231
+    field: Field,
+    model,
+    prefix: str,
+    annotations: Iterable[str],
+) -> str:
+    """Путь .values() для source вида 'relation.field'."""
+    attrs = field.source_attrs
+    if not prefix and len(attrs) == 1 and attrs[0] in annotations:
+        return attrs[0]
+    path = prefix
+    for index, name in enumerate(attrs):
+        model_field = model_field_or_none(model, name)
+        if model_field is None:
+            raise NotCompilable(field.field_name)
+        last = index == len(attrs) - 1
+        if last:
+            related_pk = isinstance(field, serializers.PrimaryKeyRelatedField)
+            if model_field.concrete and (
+                not model_field.is_relation or related_pk
+            ):
+                return f'{path}{name}'
+            raise NotCompilable(field.field_name)
+        if not is_single_relation(model_field):
+            raise NotCompilable(field.field_name)
+        path = f'{path}{name}__'
+        model = model_field.related_model
+    raise NotCompilable(field.field_name)
+
+
+def _compile(  # noqa: C901, WPS231
+    serializer: serializers.Serializer,
+    model,
+    prefix: str,
+    lookups: List[str],
+    annotations: Iterable[str] = (),
+) -> List[Tuple[str, Accessor]]:
+    """Пары (ключ ответа, функция доступа) для полей сериализатора."""
+    if type(serializer).to_representation is not (
+        serializers.Serializer.to_representation
+    ) and not getattr(
+        getattr(serializer, 'Meta', None), 'values_compatible', False,
+    ):
+        raise NotCompilable(type(serializer).__name__)
+
+    accessors = []
+    for field in serializer._readable_fields:  # noqa: WPS437
+        if isinstance(field, serializers.ListSerializer) or (
+            field.source == '*'
+        ):
+            raise NotCompilable(field.field_name)
+        if isinstance(field, serializers.Serializer):
+            accessors.append((
+                field.field_name,
+                _nested(field, model, prefix, lookups),
+            ))
+            continue
+        lookup = _source_lookup(field, model, prefix, annotations)
+        lookups.append(lookup)
+        accessors.append((field.field_name, _leaf(lookup, field)))
+    return accessors
+
+
+def _nested(
+    serializer: serializers.Serializer,
+    model,
+    prefix: str,
+    lookups: List[str],
+) -> Accessor:
+    """Функция доступа к вложенному сериализатору связи.
+
+    Если связанного объекта нет (NULL), выводится None, как в DRF.
+    """
+    if len(serializer.source_attrs) != 1:
+        raise NotCompilable(serializer.field_name)
+    model_field = model_field_or_none(model, serializer.source)
+    if model_field is None or not is_single_relation(model_field):
+        raise NotCompilable(serializer.field_name)
+
+    related_model = model_field.related_model
+    path = f'{prefix}{serializer.source}__'
+    pk_lookup = f'{path}{related_model._meta.pk.name}'  # noqa: WPS437
+    lookups.append(pk_lookup)
+    accessors = _compile(serializer, related_model, path, lookups)
+
+    def accessor(row):  # noqa: WPS430
+        if row[pk_lookup] is None:
+            return None
+        return {key: field_accessor(row) for key, field_accessor in accessors}
+    return accessor
+
+
+_plans: Dict[tuple, Optional[ValuesPlan]] = {}
+
+
+def values_plan(
+    serializer_class,
+    queryset: models.QuerySet,
+) -> Optional[ValuesPlan]:
+    """Сериализатор, скомпилированный для строк queryset.values().
+
+    Поля модели, source вида 'relation.field', аннотации queryset и
+    вложенные сериализаторы ForeignKey/OneToOne превращаются в пути
+    .values(), значения выводятся to_representation полей сериализатора -
+    ответ совпадает с serializer_class(many=True).data.
+
+    Возвращает None, если сериализатор читает то, что нельзя получить из
+    .values(): SerializerMethodField, свойства, source='*', many=True,
+    переопределенные get_attribute и to_representation. Планы кэшируются
+    по сериализатору, модели и именам аннотаций.
+
+    Meta.values_extra сериализатора - ключи, которые view добавляет в
+    строки страницы после .values() (см. ValuesListMixin.extend_page): поля
+    с таким source читаются из строки, но не запрашиваются у БД.
+    """
+    annotations = tuple(sorted(queryset.query.annotations))
+    key = (serializer_class, queryset.model, annotations)
+    if key not in _plans:
+        extra = tuple(getattr(
+            getattr(serializer_class, 'Meta', None),
+            'values_extra',
+            (),
+        ))
+        lookups = [queryset.model._meta.pk.name]  # noqa: WPS437
+        try:
+            accessors = _compile(
+                serializer_class(),
+                queryset.model,
+                '',
+                lookups,
+                annotations=annotations + extra,
+            )
+        except NotCompilable:
+            _plans[key] = None
+        else:
+            _plans[key] = ValuesPlan(
+                lookups=[
+                    lookup
+                    for lookup in dict.fromkeys(lookups)
+                    if lookup not in extra
+                ],
+                render=lambda row: {
+                    field_key: accessor(row)
+                    for field_key, accessor in accessors
+                },
+            )
+    return _plans[key]
@@ -1,13 +1,23 @@
-import uuid
-from typing import Optional, Type
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+)
 
-from rest_framework.exceptions import NotFound
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.serializers import Serializer
 
-from server.apps.nova_account.models import FriendRequest
-from server.apps.nova_account.services.enums import FriendRequestStatus
-from server.apps.nova_notification.models import Notification
-from server.apps.nova_notification.models.notification import TypeNotification
+from nova_friend.services.export import csv_stream, export_rows, xlsx_stream
+from nova_friend.services.values_serializer import values_plan
 
 
 class ViewSetSerializerMixin:  # noqa: WPS306, WPS338
@@ -47,3 +57,138 @@ class ViewSetSerializerMixin:  # noqa: WPS306, WPS338
         if serializer_class:
             return serializer_class
         return super().get_serializer_class()  # type: ignore
+
+
+class CachedObjectMixin:  # noqa: WPS306, WPS338
+    """Миксин загружает объект detail-запроса один раз.
+
+    AutoPermissionViewSetMixin вызывает get_object() для проверки прав,
+    после чего действие вызывает его повторно.
+    """
+
+    def get_object(self):
+        """Объект запроса, загруженный при первом обращении."""
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = super().get_object()  # type: ignore
+        return self._cached_object
+
+
+class ValuesListMixin:  # noqa: WPS306, WPS338
+    """Миксин строит ответ list из строк .values().
+
+    Сериализатор списка компилируется values_plan: вместо объектов модели
+    загружаются только нужные столбцы, значения выводятся заранее
+    подготовленными функциями доступа, JSON ответа не меняется. Если
+    сериализатор нельзя скомпилировать, используется обычный list().
+    """
+
+    def list(self, request, *args, **kwargs):  # noqa: WPS125
+        """Список объектов через .values()."""
+        queryset = self.filter_queryset(self.get_queryset())  # type: ignore
+        plan = values_plan(
+            self.get_serializer_class(),  # type: ignore
+            queryset,
+        )
+        if plan is None:
+            return super().list(request, *args, **kwargs)  # type: ignore
+
+        rows = queryset.values(
+            *dict.fromkeys([
+                *plan.lookups,
+                *self._ordering_lookups(queryset),
+                *self.get_page_lookups(),
+            ]),
+        )
+        page = self.paginate_queryset(rows)  # type: ignore
+        if page is not None:
+            self.extend_page(page)
+            return self.get_paginated_response(  # type: ignore
+                plan.render_many(page),
+            )
+        rows = list(rows)
+        self.extend_page(rows)
+        return Response(plan.render_many(rows))
+
+    def get_page_lookups(self) -> Sequence[str]:
+        """Дополнительные поля .values(), которые нужны extend_page."""
+        return ()
+
+    def extend_page(self, rows: List[Dict[str, Any]]) -> None:
+        """Добавить в строки страницы значения Meta.values_extra.
+
+        Вызывается один раз на страницу: значения всех строк получаются
+        одним запросом, а не запросом на строку.
+        """
+
+    def _ordering_lookups(self, queryset) -> List[str]:
+        """Поля сортировки keyset-пагинации: курсор читает их из строки."""
+        paginator = self.paginator  # type: ignore
+        if not hasattr(paginator, 'get_ordering'):
+            return []
+        ordering = paginator.get_ordering(
+            self.request,  # type: ignore
+            queryset,
+            self,
+        )
+        return [name.lstrip('-') for name in ordering]
+
+
+class ExportMixin:  # noqa: WPS306, WPS338
+    """Миксин добавляет выгрузку списка в CSV и XLSX.
+
+    Выгружаются столбцы export_fields (пути values_list) отфильтрованного
+    queryset без пагинации. Строки читаются серверным курсором и пишутся
+    в StreamingHttpResponse, поэтому память не зависит от размера выгрузки.
+    Права - как у list (permission_type_map во ViewSet).
+    """
+
+    export_fields: Sequence[str] = ()
+    export_filename = 'export'
+
+    def _export_response(
+        self,
+        stream: Callable[[Sequence[str], Iterable[tuple]], Iterator],
+        content_type: str,
+        extension: str,
+    ) -> StreamingHttpResponse:
+        """Потоковый ответ с файлом выгрузки."""
+        queryset = self.filter_queryset(self.get_queryset())  # type: ignore
+        response = StreamingHttpResponse(
+            stream(
+                self.export_fields,
+                export_rows(queryset, self.export_fields),
+            ),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.export_filename}.{extension}"'
+        )
+        return response
+
+    @action(
+        methods=['GET'],
+        url_path='export-csv',
+        detail=False,
+    )  # type: ignore
+    def export_csv(self, request: Request) -> StreamingHttpResponse:
+        """Выгрузка списка в CSV.
+
+        Фильтры, поиск и сортировка - как у списка.
+        """
+        return self._export_response(csv_stream, 'text/csv', 'csv')
+
+    @action(
+        methods=['GET'],
+        url_path='export-xlsx',
+        detail=False,
+    )  # type: ignore
+    def export_xlsx(self, request: Request) -> StreamingHttpResponse:
+        """Выгрузка списка в XLSX.
+
+        Фильтры, поиск и сортировка - как у списка.
+        """
+        return self._export_response(
+            xlsx_stream,
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            'xlsx',
+        )
@@ -7,10 +7,16 @@ from rest_framework.viewsets import (
 from rest_framework_extensions.mixins import NestedViewSetMixin
 from rules.contrib.rest_framework import AutoPermissionViewSetMixin
 
-from nova_friend.services.views import ViewSetSerializerMixin
+from nova_friend.services.views import (
+    CachedObjectMixin,
+    ValuesListMixin,
+    ViewSetSerializerMixin,
+)
 
 
 class BaseReadOnlyViewSet(  # noqa: WPS215
+    CachedObjectMixin,
+    ValuesListMixin,
     AutoPermissionViewSetMixin,
     NestedViewSetMixin,
     ViewSetSerializerMixin,
@@ -27,6 +33,8 @@ class BaseReadOnlyViewSet(  # noqa: WPS215
 
 class BaseRetrieveListCreateUpdateViewSet(  # noqa: WPS215
     ViewSetSerializerMixin,
+    CachedObjectMixin,
+    ValuesListMixin,
     AutoPermissionViewSetMixin,
     NestedViewSetMixin,
     mixins.RetrieveModelMixin,
@@ -46,6 +54,8 @@ class BaseRetrieveListCreateUpdateViewSet(  # noqa: WPS215
 
 class BaseRetrieveListCreateDestroyViewSet(  # noqa: WPS215
     ViewSetSerializerMixin,
+    CachedObjectMixin,
+    ValuesListMixin,
     AutoPermissionViewSetMixin,
     NestedViewSetMixin,
     mixins.RetrieveModelMixin,
@@ -13,3 +13,9 @@ inviting_new_user_by_phone = dispatch.Signal()
 # - в момент отказа от дружбы со стороны получателя запроса.
 # - в момент отказа от дружбы со стороны отправителя запроса.
 friend_request_action = dispatch.Signal()
+
+# Определяем сигнал, который срабатывает один раз на массовое действие с
+# запросами в друзья (подтверждение, отказ, отмена). Передает status и
+# friend_requests - список словарей с friend_request_id, sending_user_id и
+# receiving_user_id.
+friend_request_bulk_action = dispatch.Signal()
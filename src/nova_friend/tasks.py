@@ -0,0 +1,67 @@
+import logging
+from typing import Any, Dict, List
+
+from celery import shared_task
+from django.utils.module_loading import import_string
+
+from nova_friend import signals
+from nova_friend.services import signal_dispatch
+from nova_friend.services.friend_counters import reconcile_friend_counters
+from nova_friend.services.friend_suggestions import refresh_friend_suggestions
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='nova_friend.send_signals', ignore_result=True)
+def send_signals(signal_name: str, payloads: List[Dict[str, Any]]) -> None:
+    """Отправка сигнала nova_friend для каждого payload.
+
+    Payload формируется в services.signal_dispatch: sender, sender_is_class
+    и kwargs сигнала. Ошибка одного получателя не прерывает отправку
+    остальных сигналов пачки.
+    """
+    signal = getattr(signals, signal_name)
+    for payload in payloads:
+        sender = payload['sender']
+        if payload['sender_is_class']:
+            sender = import_string(sender)
+        responses = signal.send_robust(sender=sender, **payload['kwargs'])
+        for receiver, response in responses:
+            if isinstance(response, Exception):
+                logger.error(
+                    'Ошибка получателя %s сигнала %s.',
+                    receiver,
+                    signal_name,
+                    exc_info=response,
+                )
+
+
+@shared_task(name='nova_friend.flush_signals', ignore_result=True)
+def flush_signals(signal_name: str, window: int) -> None:
+    """Отправка сигналов окна объединения (NOVA_FRIEND_SIGNAL_COALESCE)."""
+    send_signals(
+        signal_name,
+        signal_dispatch.pop_coalesced(signal_name, window),
+    )
+
+
+@shared_task(name='nova_friend.reconcile_friend_counters', ignore_result=True)
+def reconcile_counters(chunk_size: int = 1000) -> None:
+    """Периодическая сверка счетчиков друзей (FriendCounters)."""
+    corrected = reconcile_friend_counters(chunk_size=chunk_size)
+    if corrected:
+        logger.warning('Исправлено счетчиков друзей: %s.', corrected)
+
+
+@shared_task(name='nova_friend.refresh_friend_suggestions', ignore_result=True)
+def refresh_suggestions(chunk_size: int = 1000, full: bool = False) -> None:
+    """Пересчет возможных друзей (FriendSuggestion).
+
+    По умолчанию пересчитываются только пользователи, у которых менялась
+    дружба после предыдущего запуска.
+    """
+    run = refresh_friend_suggestions(chunk_size=chunk_size, full=full)
+    logger.info(
+        'Пересчитаны возможные друзья пользователей: %s.',
+        run.users_count,
+    )
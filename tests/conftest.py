@@ -29,10 +29,17 @@ def _password_hashers(settings) -> None:
 def _auth_backends(settings) -> None:
     """Deactivates security backend from Axes app."""
     settings.AUTHENTICATION_BACKENDS = (
+        'rules.permissions.ObjectPermissionBackend',
         'django.contrib.auth.backends.ModelBackend',
     )
 
 
+@pytest.fixture(autouse=True)
+def _contact_hash_key(settings) -> None:
+    """Ключ хэшей контактов не зависит от окружения."""
+    settings.NOVA_FRIEND_CONTACT_HASH_KEY = 'test-contact-hash-key'
+
+
 @pytest.fixture(autouse=True)
 def _debug(settings) -> None:
     """Sets proper DEBUG and TEMPLATE debug mode for coverage."""
@@ -1 +1,49 @@
 """Conftest."""
+from typing import Callable, Tuple
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+
+@pytest.fixture()
+def api_request() -> Callable[..., Response]:
+    """Вызов action viewset от имени пользователя."""
+    def factory(  # noqa: WPS211
+        viewset,
+        actions,
+        user,
+        method='get',
+        data=None,
+        **kwargs,
+    ) -> Response:
+        request = getattr(APIRequestFactory(), method)(
+            '/',
+            data,
+            format=None if method == 'get' else 'json',
+        )
+        force_authenticate(request, user)
+        response = viewset.as_view(actions)(request, **kwargs)
+        if not response.streaming:
+            response.render()
+        return response
+    return factory
+
+
+@pytest.fixture()
+def count_queries(api_request) -> Callable[..., Tuple[Response, int]]:
+    """Ответ action viewset и количество выполненных запросов к БД."""
+    def counter(*args, **kwargs) -> Tuple[Response, int]:
+        with CaptureQueriesContext(connection) as context:
+            response = api_request(*args, **kwargs)
+        return response, len(context)
+    return counter
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache() -> None:
+    """Счетчики ограничений частоты и кэши не переходят между тестами."""
+    cache.clear()
@@ -1 +0,0 @@
-"""Conftest."""
@@ -0,0 +1,144 @@
+"""Потоковая выгрузка списков в CSV и XLSX."""
+import csv
+import io
+
+import pytest
+from openpyxl import load_workbook
+from rest_framework import status
+
+from nova_friend.api.views.friend_request import FriendRequestViewSet
+from nova_friend.api.views.referral_invite import ReferralInviteViewSet
+from nova_friend.models import FriendRequest, ReferralInvite
+from nova_friend.services import export
+
+ROWS_COUNT = 30
+
+
+@pytest.fixture()
+def user(django_user_model):
+    """Пользователь, от имени которого выполняется выгрузка."""
+    return django_user_model.objects.create(
+        username='user',
+        email='user@example.com',
+    )
+
+
+@pytest.fixture()
+def other_users(django_user_model):
+    """Пользователи для строк выгрузки."""
+    return django_user_model.objects.bulk_create([
+        django_user_model(
+            username=f'other{index}',
+            email=f'other{index}@example.com',
+        )
+        for index in range(ROWS_COUNT)
+    ])
+
+
+@pytest.fixture()
+def friend_requests(user, other_users):
+    """Входящие запросы в друзья пользователя."""
+    return FriendRequest.objects.bulk_create([
+        FriendRequest(
+            sending_user=other_user,
+            receiving_user=user,
+            contact=user.email,
+        )
+        for other_user in other_users
+    ])
+
+
+@pytest.fixture()
+def referral_invites(user, other_users):
+    """Пользователи, приглашенные пользователем."""
+    return ReferralInvite.objects.bulk_create([
+        ReferralInvite(referral_user=user, invited_user=other_user)
+        for other_user in other_users
+    ])
+
+
+def _content(response) -> bytes:
+    """Тело потокового ответа."""
+    assert response.streaming
+    return b''.join(
+        chunk.encode() if isinstance(chunk, str) else chunk
+        for chunk in response.streaming_content
+    )
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('friend_requests')
+def test_friend_request_csv(api_request, user, monkeypatch):
+    """CSV: заголовок и по строке на запрос, чтение пачками."""
+    monkeypatch.setattr(export, 'EXPORT_BLOCK_SIZE', 100)
+    response = api_request(
+        FriendRequestViewSet,
+        {'get': 'export_csv'},
+        user,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Disposition'] == (
+        'attachment; filename="friend_requests.csv"'
+    )
+    rows = list(csv.reader(io.StringIO(_content(response).decode())))
+    assert rows[0] == list(FriendRequestViewSet.export_fields)
+    assert len(rows) == ROWS_COUNT + 1
+    assert {row[9] for row in rows[1:]} == {user.email}
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('referral_invites')
+def test_referral_invite_xlsx(api_request, user):
+    """XLSX открывается и содержит все строки."""
+    response = api_request(
+        ReferralInviteViewSet,
+        {'get': 'export_xlsx'},
+        user,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    sheet = load_workbook(io.BytesIO(_content(response))).active
+    rows = list(sheet.values)
+    assert rows[0] == ReferralInviteViewSet.export_fields
+    assert len(rows) == ROWS_COUNT + 1
+    assert {row[3] for row in rows[1:]} == {user.email}
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('referral_invites')
+def test_export_only_visible_rows(api_request, other_users):
+    """Пользователь выгружает только то, что видит в списке."""
+    response = api_request(
+        ReferralInviteViewSet,
+        {'get': 'export_csv'},
+        other_users[0],
+    )
+
+    rows = list(csv.reader(io.StringIO(_content(response).decode())))
+    assert len(rows) == 1
+
+
+def test_formula_injection():
+    """Значения, похожие на формулы, не выполняются редактором."""
+    fields = ('contact', 'count')
+    rows = [('=HYPERLINK("http://ex.com")', 1), ('+79161234567', -1)]
+
+    csv_rows = list(
+        csv.reader(io.StringIO(''.join(export.csv_stream(fields, rows)))),
+    )
+    sheet = load_workbook(
+        io.BytesIO(b''.join(export.xlsx_stream(fields, rows))),
+    ).active
+
+    assert csv_rows[1:] == [
+        ['\'=HYPERLINK("http://ex.com")', '1'],
+        ["'+79161234567", '-1'],
+    ]
+    assert [
+        [(cell.value, cell.data_type) for cell in row]
+        for row in sheet.iter_rows(min_row=2)
+    ] == [
+        [('=HYPERLINK("http://ex.com")', 's'), (1, 'n')],
+        [('+79161234567', 's'), (-1, 'n')],
+    ]
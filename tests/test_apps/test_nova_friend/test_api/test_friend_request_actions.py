@@ -0,0 +1,117 @@
+"""Подтверждение, отказ и отмена запроса в друзья."""
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from nova_friend.api.views.friend_request import FriendRequestViewSet
+from nova_friend.models import FriendRequest
+from nova_friend.services.enums import FriendRequestStatus
+
+
+@pytest.fixture()
+def users(django_user_model):
+    """Отправитель, получатель и посторонний пользователь."""
+    return [
+        django_user_model.objects.create(
+            username=f'user{index}',
+            email=f'user{index}@ex.com',
+        )
+        for index in range(3)
+    ]
+
+
+@pytest.fixture()
+def friend_request(users):
+    """Ожидающий запрос user0 -> user1."""
+    return FriendRequest.objects.create(
+        sending_user=users[0],
+        receiving_user=users[1],
+        contact=users[1].email,
+    )
+
+
+@pytest.fixture()
+def transition(api_request):
+    """Действие с запросом в друзья от имени пользователя."""
+    def factory(action, user, token):
+        method = 'post' if action == 'confirm' else 'delete'
+        return api_request(
+            FriendRequestViewSet,
+            {method: action},
+            user,
+            method=method,
+            token=token,
+        )
+    return factory
+
+
+@pytest.mark.django_db()
+def test_confirm(transition, friend_request, users):
+    """Подтверждение не загружает запрос до изменения.
+
+    Повторное подтверждение запрещено, как и раньше.
+    """
+    table = FriendRequest._meta.db_table  # noqa: WPS437
+    with CaptureQueriesContext(connection) as context:
+        response = transition('confirm', users[1], friend_request.token)
+
+    assert response.status_code == status.HTTP_200_OK
+    friend_request_queries = [
+        query['sql'] for query in context if table in query['sql']
+    ]
+    assert friend_request_queries[0].startswith('UPDATE')
+    friend_request.refresh_from_db()
+    assert friend_request.status == FriendRequestStatus.CONFIRMED
+
+    response = transition('confirm', users[1], friend_request.token)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize(('action', 'user_index'), [
+    ('reject', 1),
+    ('cancel', 0),
+])
+def test_delete(transition, friend_request, users, action, user_index):
+    """Отказ получателя и отмена отправителя удаляют запрос."""
+    response = transition(action, users[user_index], friend_request.token)
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not FriendRequest.objects.exists()
+
+    response = transition(action, users[user_index], friend_request.token)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize(('action', 'user_index', 'status_code'), [
+    ('confirm', 0, status.HTTP_403_FORBIDDEN),
+    ('reject', 0, status.HTTP_403_FORBIDDEN),
+    ('cancel', 1, status.HTTP_403_FORBIDDEN),
+    ('confirm', 2, status.HTTP_404_NOT_FOUND),
+    ('cancel', 2, status.HTTP_404_NOT_FOUND),
+])
+def test_denied(  # noqa: WPS211
+    transition,
+    friend_request,
+    users,
+    action,
+    user_index,
+    status_code,
+):
+    """Чужой запрос не найден, недоступное действие запрещено."""
+    response = transition(action, users[user_index], friend_request.token)
+
+    assert response.status_code == status_code
+    assert FriendRequest.objects.get().status == FriendRequestStatus.PENDING
+
+
+@pytest.mark.django_db()
+def test_unknown_token(transition, users):
+    """Несуществующий token - 404."""
+    response = transition('confirm', users[1], uuid.uuid4())
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,219 @@
+"""Пагинация списков: limit/offset по умолчанию, keyset по параметру."""
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from django.utils import timezone
+from rest_framework import status
+
+from nova_friend.api.views.friend_request import FriendRequestViewSet
+from nova_friend.api.views.referral_invite import ReferralInviteViewSet
+from nova_friend.models import FriendRequest
+from nova_friend.services.pagination import (
+    KeysetPagination,
+    OptionalKeysetPagination,
+)
+
+ROWS_COUNT = 7
+
+
+@pytest.fixture()
+def user(django_user_model):
+    """Получатель запросов в друзья."""
+    return django_user_model.objects.create(
+        username='user',
+        email='user@ex.com',
+    )
+
+
+@pytest.fixture()
+def friend_request_ids(django_user_model, user):
+    """Id входящих запросов в друзья в порядке создания."""
+    return [
+        FriendRequest.objects.create(
+            sending_user=django_user_model.objects.create(
+                username=f'other{index}',
+                email=f'other{index}@ex.com',
+            ),
+            receiving_user=user,
+            contact=user.email,
+        ).id
+        for index in range(ROWS_COUNT)
+    ]
+
+
+@pytest.fixture()
+def friend_request_list(api_request, user):
+    """Страница списка запросов в друзья."""
+    def factory(**params):
+        response = api_request(
+            FriendRequestViewSet,
+            {'get': 'list'},
+            user,
+            data=params,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+    return factory
+
+
+def _cursor(url):
+    """Курсор из ссылки next/previous."""
+    return parse_qs(urlparse(url).query)['cursor'][0]
+
+
+@pytest.mark.django_db()
+def test_limit_offset_by_default(friend_request_list, friend_request_ids):
+    """Без параметра ответ с count и offset, как раньше."""
+    page = friend_request_list(limit=3, offset=3)
+
+    assert page['count'] == ROWS_COUNT
+    assert 'offset=6' in page['next']
+    assert len(page['results']) == 3
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('friend_request_ids')
+def test_limit_offset_referral_invites(api_request, user):
+    """Список приглашенных по умолчанию тоже с count."""
+    response = api_request(ReferralInviteViewSet, {'get': 'list'}, user)
+
+    assert response.data['count'] == 0
+
+
+@pytest.mark.django_db()
+def test_keyset_order(friend_request_list, friend_request_ids):
+    """Страницы по курсору идут по убыванию id без пропусков и повторов."""
+    page = friend_request_list(limit=3, pagination='keyset')
+    assert 'count' not in page
+    assert page['previous'] is None
+    assert 'pagination=keyset' in page['next']
+
+    ids = []
+    while True:
+        ids.extend(row['id'] for row in page['results'])
+        if page['next'] is None:
+            break
+        # Курсор включает keyset и без параметра pagination.
+        page = friend_request_list(limit=3, cursor=_cursor(page['next']))
+
+    assert ids == sorted(friend_request_ids, reverse=True)
+
+    previous = friend_request_list(limit=3, cursor=_cursor(page['previous']))
+    assert [row['id'] for row in previous['results']] == ids[3:6]
+
+
+def _keyset_ids(friend_request_list, **params):
+    """Id всех страниц keyset по порядку."""
+    page = friend_request_list(limit=3, pagination='keyset', **params)
+    ids = [row['id'] for row in page['results']]
+    while page['next'] is not None:
+        page = friend_request_list(
+            limit=3,
+            cursor=_cursor(page['next']),
+            **params,
+        )
+        ids.extend(row['id'] for row in page['results'])
+    return ids
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize(('ordering', 'reverse'), [
+    ('created_at', False),
+    ('-created_at', True),
+])
+def test_keyset_ordering_tie_break(
+    friend_request_list,
+    friend_request_ids,
+    ordering,
+    reverse,
+):
+    """Равные значения неуникального поля упорядочены по id.
+
+    Страницы не теряют и не повторяют строки с одинаковым created_at.
+    """
+    FriendRequest.objects.update(created_at=timezone.now())
+
+    ids = _keyset_ids(friend_request_list, ordering=ordering)
+
+    assert ids == sorted(friend_request_ids, reverse=reverse)
+
+
+@pytest.mark.django_db()
+def test_keyset_ordering_by_annotation(
+    friend_request_list,
+    friend_request_ids,
+):
+    """Аннотация не подходит для курсора - сортировка по умолчанию."""
+    ids = _keyset_ids(friend_request_list, ordering='request_mode')
+
+    assert ids == sorted(friend_request_ids, reverse=True)
+
+
+@pytest.mark.django_db()
+def test_keyset_new_rows(
+    friend_request_list,
+    friend_request_ids,
+    django_user_model,
+    user,
+):
+    """Новые записи не сдвигают следующую страницу."""
+    page = friend_request_list(limit=3, pagination='keyset')
+    FriendRequest.objects.create(
+        sending_user=django_user_model.objects.create(username='late'),
+        receiving_user=user,
+        contact=user.email,
+    )
+
+    page = friend_request_list(limit=3, cursor=_cursor(page['next']))
+
+    assert [row['id'] for row in page['results']] == sorted(
+        friend_request_ids,
+        reverse=True,
+    )[3:6]
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('friend_request_ids')
+@pytest.mark.parametrize(('limit', 'page_size'), [
+    (2, 2),
+    # Больше max_page_size - max_page_size.
+    (5, 4),
+    # Некорректный limit - размер страницы по умолчанию (PAGE_SIZE).
+    (0, ROWS_COUNT),
+    (-1, ROWS_COUNT),
+    ('many', ROWS_COUNT),
+])
+def test_keyset_limit(friend_request_list, monkeypatch, limit, page_size):
+    """Размер страницы keyset ограничен max_page_size."""
+    monkeypatch.setattr(KeysetPagination, 'max_page_size', 4)
+
+    page = friend_request_list(limit=limit, pagination='keyset')
+
+    assert len(page['results']) == page_size
+
+
+@pytest.mark.django_db()
+def test_invalid_cursor(api_request, user):
+    """Неизвестный курсор - 404."""
+    response = api_request(
+        FriendRequestViewSet,
+        {'get': 'list'},
+        user,
+        data={'cursor': 'invalid'},
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_schema_parameters():
+    """В схеме параметры обеих пагинаций и переключатель."""
+    parameters = OptionalKeysetPagination().get_schema_operation_parameters(
+        FriendRequestViewSet(),
+    )
+
+    assert {parameter['name'] for parameter in parameters} == {
+        'limit',
+        'offset',
+        'cursor',
+        'pagination',
+    }
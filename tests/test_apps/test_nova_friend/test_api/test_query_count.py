@@ -0,0 +1,273 @@
+"""Количество запросов к БД не зависит от размера страницы.
+
+Ленивые загрузки связей в списках ловит nplusone.
+"""
+import nplusone.ext.django  # noqa: F401
+import pytest
+from nplusone.core import profiler
+from rest_framework import status
+
+from nova_friend.api.views.friend_request import FriendRequestViewSet
+from nova_friend.api.views.referral_code import ReferralCodeViewSet
+from nova_friend.api.views.referral_invite import ReferralInviteViewSet
+from nova_friend.models import FriendRequest, ReferralCode
+from nova_friend.services.friend_counters import reconcile_friend_counters
+from nova_friend.services.friendship import add_friendships
+from nova_friend.services.record_referral_invite import (
+    ReferralAttribution,
+    record_referral_invites,
+)
+
+ROWS_COUNT = 20
+MUTUAL_FRIENDS_ROWS_COUNT = 100
+PAGE_SIZES = (1, ROWS_COUNT)
+LIST_VIEWSETS = (
+    FriendRequestViewSet,
+    ReferralCodeViewSet,
+    ReferralInviteViewSet,
+)
+
+
+@pytest.fixture()
+def user(django_user_model):
+    """Пользователь, от имени которого выполняются запросы."""
+    return django_user_model.objects.create(
+        username='user',
+        email='user@example.com',
+    )
+
+
+@pytest.fixture()
+def friend_requests(django_user_model, user):
+    """Входящие и исходящие запросы в друзья пользователя."""
+    friend_requests = []
+    for index in range(ROWS_COUNT):
+        other_user = django_user_model.objects.create(
+            username=f'other{index}',
+            email=f'other{index}@example.com',
+        )
+        sending_user, receiving_user = (other_user, user)
+        if index % 2:
+            sending_user, receiving_user = (user, other_user)
+        friend_requests.append(
+            FriendRequest.objects.create(
+                sending_user=sending_user,
+                receiving_user=receiving_user,
+                contact=receiving_user.email,
+            ),
+        )
+    # Счетчики друзей всех участников уже есть, как после сверки.
+    reconcile_friend_counters(chunk_size=ROWS_COUNT)
+    return friend_requests
+
+
+@pytest.fixture()
+def referral_codes(user):
+    """Реферальные коды пользователя."""
+    return ReferralCode.objects.bulk_create([
+        ReferralCode(user=user, code=f'CODE{index}', note='')
+        for index in range(ROWS_COUNT)
+    ])
+
+
+@pytest.fixture()
+def referral_invites(django_user_model, user, referral_codes):
+    """Пользователи, приглашенные по коду и по ссылке."""
+    invited_users = django_user_model.objects.bulk_create([
+        django_user_model(
+            username=f'invited{index}',
+            email=f'invited{index}@example.com',
+        )
+        for index in range(ROWS_COUNT)
+    ])
+    return record_referral_invites(
+        ReferralAttribution(
+            invited_user_id=invited_user.id,
+            referral_code=None if index % 2 else referral_codes[index].code,
+            referral_user_email=user.email if index % 2 else None,
+        )
+        for index, invited_user in enumerate(invited_users)
+    )
+
+
+@pytest.fixture()
+def incoming_tokens(friend_requests, user):
+    """Token входящих запросов пользователя."""
+    return [
+        str(friend_request.token)
+        for friend_request in friend_requests
+        if friend_request.receiving_user_id == user.id
+    ]
+
+
+def _page_queries(count_queries, viewset, user):
+    """Количество запросов для каждого размера страницы."""
+    queries = set()
+    for page_size in PAGE_SIZES:
+        response, queries_count = count_queries(
+            viewset,
+            {'get': 'list'},
+            user,
+            data={'limit': page_size},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == page_size
+        queries.add(queries_count)
+    return queries
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('friend_requests')
+def test_friend_request_list(count_queries, user):
+    """Список запросов в друзья."""
+    assert len(_page_queries(count_queries, FriendRequestViewSet, user)) == 1
+
+
+@pytest.mark.django_db()
+def test_friend_request_list_mutual_friends(
+    count_queries,
+    django_user_model,
+    user,
+):
+    """Общие друзья для страницы из 100 запросов - один запрос к БД."""
+    others = django_user_model.objects.bulk_create([
+        django_user_model(username=f'other{index}', email=f'o{index}@ex.com')
+        for index in range(MUTUAL_FRIENDS_ROWS_COUNT)
+    ])
+    friends = django_user_model.objects.bulk_create([
+        django_user_model(username=f'friend{index}', email=f'f{index}@ex.com')
+        for index in range(3)
+    ])
+    friend_requests = FriendRequest.objects.bulk_create([
+        FriendRequest(
+            sending_user=other,
+            receiving_user=user,
+            contact=user.email,
+        )
+        for other in others
+    ])
+    # У other{index} общих друзей с user: index % 4.
+    add_friendships([
+        *((user.id, friend.id) for friend in friends),
+        *(
+            (other.id, friend.id)
+            for index, other in enumerate(others)
+            for friend in friends[:index % 4]
+        ),
+    ])
+
+    response, queries_count = count_queries(
+        FriendRequestViewSet,
+        {'get': 'list'},
+        user,
+        data={
+            'limit': MUTUAL_FRIENDS_ROWS_COUNT,
+            'mutual_friends': 'true',
+            'pagination': 'keyset',
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    # Страница и один GROUP BY по общим друзьям.
+    assert queries_count == 2
+    assert {
+        row['id']: row['mutual_friends_count']
+        for row in response.data['results']
+    } == {
+        friend_request.id: index % 4
+        for index, friend_request in enumerate(friend_requests)
+    }
+
+    response, queries_count = count_queries(
+        FriendRequestViewSet,
+        {'get': 'list'},
+        user,
+        data={'limit': MUTUAL_FRIENDS_ROWS_COUNT, 'pagination': 'keyset'},
+    )
+    assert queries_count == 1
+    assert 'mutual_friends_count' not in response.data['results'][0]
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('referral_codes')
+def test_referral_code_list(count_queries, user):
+    """Список реферальных кодов."""
+    assert len(_page_queries(count_queries, ReferralCodeViewSet, user)) == 1
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('referral_invites')
+def test_referral_invite_list(count_queries, user):
+    """Список приглашенных: пользователи и код со статистикой в JOIN."""
+    assert len(_page_queries(count_queries, ReferralInviteViewSet, user)) == 1
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('friend_requests', 'referral_invites')
+@pytest.mark.parametrize('viewset', LIST_VIEWSETS)
+def test_list_without_lazy_loads(api_request, user, viewset):
+    """Списки не загружают связи построчно."""
+    with profiler.Profiler(whitelist=[{'label': 'unused_eager_load'}]):
+        response = api_request(
+            viewset,
+            {'get': 'list'},
+            user,
+            data={'limit': ROWS_COUNT},
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db()
+def test_friend_request_retrieve(count_queries, friend_requests, user):
+    """Запрос в друзья загружается один раз, включая проверку прав."""
+    response, queries_count = count_queries(
+        FriendRequestViewSet,
+        {'get': 'retrieve'},
+        user,
+        token=friend_requests[0].token,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert queries_count == 1
+
+
+@pytest.mark.django_db()
+def test_bulk_confirm(count_queries, incoming_tokens, user):
+    """Массовое подтверждение: права проверяются в SQL."""
+    queries = set()
+    for tokens in (incoming_tokens[:1], incoming_tokens[1:]):
+        response, queries_count = count_queries(
+            FriendRequestViewSet,
+            {'post': 'bulk_confirm'},
+            user,
+            method='post',
+            data={'tokens': tokens},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert all(
+            result['success'] for result in response.data['results']
+        )
+        queries.add(queries_count)
+
+    assert len(queries) == 1
+
+
+@pytest.mark.django_db()
+def test_bulk_confirm_foreign(api_request, friend_requests, django_user_model):
+    """Чужие запросы не подтверждаются."""
+    stranger = django_user_model.objects.create(
+        username='stranger',
+        email='stranger@example.com',
+    )
+
+    response = api_request(
+        FriendRequestViewSet,
+        {'post': 'bulk_confirm'},
+        stranger,
+        method='post',
+        data={'tokens': [str(friend_requests[0].token)]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert not response.data['results'][0]['success']
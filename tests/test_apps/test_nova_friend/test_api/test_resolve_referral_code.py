@@ -0,0 +1,62 @@
+"""Проверка реферального кода без авторизации."""
+import pytest
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from nova_friend.api.views.referral_code import ReferralCodeViewSet
+from nova_friend.models import ReferralCode
+from nova_friend.services import throttling
+
+
+@pytest.fixture()
+def resolve():
+    """GET resolve от анонимного пользователя.
+
+    Параметры action (permission_classes, throttle_classes) передаются
+    так же, как их передает router.
+    """
+    view = ReferralCodeViewSet.as_view(
+        {'get': 'resolve'},
+        **ReferralCodeViewSet.resolve.kwargs,
+    )
+
+    def factory(code):
+        return view(APIRequestFactory().get('/', {'code': code}))
+    return factory
+
+
+@pytest.mark.django_db()
+def test_resolve(resolve, django_user_model):
+    """В ответе только нормализованный код, без владельца."""
+    owner = django_user_model.objects.create(username='owner')
+    ReferralCode.objects.create(user=owner, code='ABC12')
+
+    response = resolve('abc12')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {'code': 'ABC12'}
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize('code', ['MISSING', 'not a code', ''])
+def test_resolve_not_found(resolve, code):
+    """Несуществующий и невозможный код - 404."""
+    assert resolve(code).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db()
+def test_resolve_throttle(resolve, monkeypatch):
+    """Перебор кодов с одного IP-адреса ограничен."""
+    monkeypatch.setitem(
+        throttling.THROTTLE_RATES,
+        'referral_code_resolve',
+        '3/m',
+    )
+
+    for index in range(3):
+        response = resolve(f'CODE{index}')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = resolve('CODE3')
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response['Retry-After']) > 0
@@ -0,0 +1,227 @@
+"""Ограничение частоты создания запросов в друзья."""
+import pytest
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.throttling import BaseThrottle
+
+from nova_friend import signals
+from nova_friend.api.views.contact_hash import ContactHashViewSet
+from nova_friend.api.views.friend_request import FriendRequestViewSet
+from nova_friend.services import throttling
+from nova_friend.services.throttling import FriendRequestUserThrottle
+
+
+@pytest.fixture()
+def sender(django_user_model):
+    """Отправитель запросов в друзья."""
+    return django_user_model.objects.create(
+        username='sender',
+        email='sender@ex.com',
+    )
+
+
+@pytest.fixture()
+def rates(monkeypatch):
+    """Переопределение лимитов по scope."""
+    def factory(**scope_rates):
+        for scope, rate in scope_rates.items():
+            monkeypatch.setitem(throttling.THROTTLE_RATES, scope, rate)
+    return factory
+
+
+@pytest.fixture()
+def invites():
+    """Отправленные приглашения по e-mail."""
+    sent = []
+
+    def receiver(sender, new_user_email, **kwargs):
+        sent.append(new_user_email)
+
+    signals.inviting_new_user_by_email.connect(receiver)
+    yield sent
+    signals.inviting_new_user_by_email.disconnect(receiver)
+
+
+def _create(user, contact, action='create', data=None):
+    """POST запроса в друзья от имени user."""
+    request = APIRequestFactory().post(
+        '/',
+        data or {'contact': contact},
+        format='json',
+    )
+    request.LANGUAGE_CODE = 'ru'
+    force_authenticate(request, user)
+    view = FriendRequestViewSet.as_view({'post': action})
+    return view(request)
+
+
+@pytest.mark.django_db()
+def test_user_throttle(rates, sender, django_user_model):
+    """Запросы одного пользователя ограничены.
+
+    Retry-After - в секундах, не больше двух периодов лимита.
+    """
+    rates(friend_request_user='2/m')
+    for index in range(2):
+        django_user_model.objects.create(
+            username=f'user{index}',
+            email=f'user{index}@ex.com',
+        )
+        response = _create(sender, f'user{index}@ex.com')
+        assert response.status_code == status.HTTP_201_CREATED
+
+    response = _create(sender, 'user0@ex.com')
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert 0 < int(response['Retry-After']) <= 120
+
+
+@pytest.mark.django_db()
+def test_contact_throttle(rates, django_user_model):
+    """Запросы на один контакт ограничены для всех пользователей."""
+    rates(friend_request_contact='2/h')
+    django_user_model.objects.create(username='target', email='t@ex.com')
+    senders = [
+        django_user_model.objects.create(username=f'sender{index}')
+        for index in range(3)
+    ]
+
+    codes = [
+        _create(user, contact).status_code
+        for user, contact in zip(senders, ('t@ex.com', 'T@EX.com', 't@Ex.com'))
+    ]
+
+    assert codes == [
+        status.HTTP_201_CREATED,
+        status.HTTP_201_CREATED,
+        status.HTTP_429_TOO_MANY_REQUESTS,
+    ]
+
+
+@pytest.mark.django_db()
+def test_not_found_throttle(rates, invites, sender, django_user_model):
+    """Приглашения ограничены отдельно от остальных запросов."""
+    rates(friend_request_not_found_user='2/h')
+    django_user_model.objects.create(username='known', email='known@ex.com')
+
+    codes = [
+        _create(sender, contact).status_code
+        for contact in ('new0@ex.com', 'new1@ex.com', 'new2@ex.com')
+    ]
+
+    assert codes == [
+        status.HTTP_404_NOT_FOUND,
+        status.HTTP_404_NOT_FOUND,
+        status.HTTP_429_TOO_MANY_REQUESTS,
+    ]
+    assert invites == ['new0@ex.com', 'new1@ex.com']
+    assert _create(sender, 'known@ex.com').status_code == (
+        status.HTTP_429_TOO_MANY_REQUESTS
+    )
+
+
+@pytest.mark.django_db()
+def test_not_found_contact_throttle(rates, invites, django_user_model):
+    """Один ненайденный контакт приглашается ограниченное число раз."""
+    rates(friend_request_not_found_contact='1/d')
+    senders = [
+        django_user_model.objects.create(username=f'sender{index}')
+        for index in range(2)
+    ]
+
+    codes = [_create(user, 'new@ex.com').status_code for user in senders]
+
+    assert codes == [
+        status.HTTP_404_NOT_FOUND,
+        status.HTTP_429_TOO_MANY_REQUESTS,
+    ]
+    assert invites == ['new@ex.com']
+
+
+@pytest.mark.django_db()
+def test_bulk_throttle(rates, sender):
+    """Создание по адресной книге ограничено по пользователю."""
+    rates(friend_request_bulk_user='1/h')
+    data = {'contacts': ['new@ex.com']}
+
+    codes = [
+        _create(sender, None, 'bulk_create', data).status_code
+        for _ in range(2)
+    ]
+
+    assert codes == [
+        status.HTTP_201_CREATED,
+        status.HTTP_429_TOO_MANY_REQUESTS,
+    ]
+
+
+class DenyThrottle(BaseThrottle):
+    """Отклоняет все запросы."""
+
+    def allow_request(self, request, view):
+        """Запрос не разрешен."""
+        return False
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize('action', ['create', 'bulk_create'])
+def test_default_throttles_kept(monkeypatch, sender, action):
+    """Ограничения action дополняют общие, а не заменяют их."""
+    monkeypatch.setattr(FriendRequestViewSet, 'throttle_classes', (
+        DenyThrottle,
+    ))
+    data = {'contacts': ['new@ex.com']} if action == 'bulk_create' else None
+
+    response = _create(sender, 'new@ex.com', action, data)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.django_db()
+def test_contact_hash_lookup_throttle(rates, sender):
+    """Проверка хэшей контактов ограничена числом хэшей, а не запросов."""
+    rates(contact_hash_lookup_user='5/h')
+    view = ContactHashViewSet.as_view(
+        {'post': 'lookup'},
+        **ContactHashViewSet.lookup.kwargs,
+    )
+
+    def lookup(count):
+        request = APIRequestFactory().post(
+            '/',
+            {'hashes': [f'{index:064x}' for index in range(count)]},
+            format='json',
+        )
+        force_authenticate(request, sender)
+        return view(request).status_code
+
+    assert lookup(3) == status.HTTP_200_OK
+    assert lookup(3) == status.HTTP_429_TOO_MANY_REQUESTS
+    assert lookup(2) == status.HTTP_200_OK
+    assert lookup(1) == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_sliding_window(rates, monkeypatch):
+    """Запросы предыдущего окна учитываются пропорционально."""
+    rates(friend_request_user='10/m')
+    now = [600]
+    monkeypatch.setattr(
+        FriendRequestUserThrottle,
+        'timer',
+        staticmethod(lambda: now[0]),
+    )
+    request = type('Request', (), {'user': type('User', (), {'pk': 1})})
+
+    def allow():
+        return FriendRequestUserThrottle().allow_request(request, None)
+
+    assert all(allow() for _ in range(10))
+    throttle = FriendRequestUserThrottle()
+    assert not throttle.allow_request(request, None)
+    # Первое место освободится, когда уйдет десятая часть окна.
+    assert throttle.wait() == 66
+
+    # Через 90 секунд в периоде осталась половина предыдущего окна.
+    now[0] += 90
+    assert all(allow() for _ in range(5))
+    assert not allow()
@@ -0,0 +1,238 @@
+"""Списки через .values() совпадают с сериализаторами и быстрее их.
+
+Запуск с выводом результатов:
+pytest tests/test_apps/test_nova_friend/test_api/ -s -k values
+"""
+import time
+
+import pytest
+from django.db import connection
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from rest_framework import serializers, status
+from rest_framework.test import APIRequestFactory
+
+from nova_friend.api.serializers import (
+    FriendRequestSerializer,
+    ReferralCodeSerializer,
+    ReferralInviteSerializer,
+)
+from nova_friend.api.views.friend_request import FriendRequestViewSet
+from nova_friend.models import (
+    FriendRequest,
+    ReferralCode,
+    ReferralInvite,
+    ReferralStats,
+)
+from nova_friend.services.friend_request_mode import with_request_mode
+from nova_friend.services.serializer_queryset import queryset_for_serializer
+from nova_friend.services.values_serializer import values_plan
+
+ROWS_COUNTS = (1000, 10000)
+
+
+@pytest.fixture()
+def user(django_user_model):
+    """Пользователь, от имени которого выполняются запросы."""
+    return django_user_model.objects.create(
+        username='user',
+        email='user@example.com',
+    )
+
+
+def _users(django_user_model, rows_count, prefix):
+    """Пользователи для строк списка."""
+    return django_user_model.objects.bulk_create([
+        django_user_model(
+            username=f'{prefix}{index}',
+            email=f'{prefix}{index}@example.com',
+        )
+        for index in range(rows_count)
+    ])
+
+
+def _friend_requests(django_user_model, user, rows_count):
+    """Запросы в друзья: каждый второй - исходящий."""
+    requests = []
+    for index, other_user in enumerate(
+        _users(django_user_model, rows_count, 'other'),
+    ):
+        sending_user, receiving_user = (other_user, user)
+        if index % 2:
+            sending_user, receiving_user = (user, other_user)
+        requests.append(
+            FriendRequest(
+                sending_user=sending_user,
+                receiving_user=receiving_user,
+                contact=receiving_user.email,
+            ),
+        )
+    FriendRequest.objects.bulk_create(requests)
+    request = APIRequestFactory().get('/')
+    request.user = user
+    queryset = with_request_mode(FriendRequest.objects.defer('message'), user)
+    return queryset, FriendRequestSerializer, {'request': request}
+
+
+def _referral_codes(user, rows_count):
+    """Реферальные коды: у каждого второго есть статистика."""
+    codes = ReferralCode.objects.bulk_create([
+        ReferralCode(user=user, code=f'C{index}', note='')
+        for index in range(rows_count)
+    ])
+    ReferralStats.objects.bulk_create([
+        ReferralStats(
+            user=user,
+            referral_code=code,
+            invite_count=1,
+            last_invite_at=code.created_at,
+        )
+        for code in codes[::2]
+    ])
+    queryset = queryset_for_serializer(
+        ReferralCode.objects.all(),
+        ReferralCodeSerializer,
+    )
+    return queryset, ReferralCodeSerializer, {}
+
+
+def _referral_invites(django_user_model, user, rows_count):
+    """Приглашенные: каждый второй - без реферального кода."""
+    queryset, _, _ = _referral_codes(user, rows_count)
+    codes = list(queryset.order_by('id'))
+    ReferralInvite.objects.bulk_create([
+        ReferralInvite(
+            referral_user=user,
+            invited_user=invited_user,
+            referral_code=None if index % 2 else codes[index],
+        )
+        for index, invited_user in enumerate(
+            _users(django_user_model, rows_count, 'invited'),
+        )
+    ])
+    queryset = queryset_for_serializer(
+        ReferralInvite.objects.all(),
+        ReferralInviteSerializer,
+    )
+    return queryset, ReferralInviteSerializer, {}
+
+
+@pytest.fixture(params=['friend_request', 'referral_code', 'referral_invite'])
+def list_data(request, django_user_model, user):
+    """Queryset, сериализатор и контекст списка на rows_count строк."""
+    def factory(rows_count):
+        if request.param == 'friend_request':
+            return _friend_requests(django_user_model, user, rows_count)
+        if request.param == 'referral_code':
+            return _referral_codes(user, rows_count)
+        return _referral_invites(django_user_model, user, rows_count)
+    return factory
+
+
+ROUNDS = 3
+
+
+def _serialized(queryset, serializer_class, context):
+    """Ответ через сериализатор."""
+    return serializer_class(
+        list(queryset.all()),
+        many=True,
+        context=context,
+    ).data
+
+
+def _compiled(queryset, serializer_class):
+    """Ответ через values_plan."""
+    plan = values_plan(serializer_class, queryset)
+    return plan.render_many(queryset.values(*plan.lookups))
+
+
+def _best_time(function, *args):
+    """Результат и лучшее время из ROUNDS запусков в секундах."""
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - started)
+    return result, min(timings)
+
+
+@pytest.mark.django_db()
+def test_same_json(list_data):
+    """JSON ответа совпадает, camel case включительно."""
+    queryset, serializer_class, context = list_data(10)
+    queryset = queryset.order_by('id')
+    renderer = CamelCaseJSONRenderer()
+
+    serialized = _serialized(queryset, serializer_class, context)
+    compiled = _compiled(queryset, serializer_class)
+
+    assert renderer.render(compiled) == renderer.render(serialized)
+
+
+class MethodFieldSerializer(ReferralCodeSerializer):
+    """Сериализатор, значение которого вычисляет метод."""
+
+    code = serializers.SerializerMethodField()
+
+    def get_code(self, referral_code):  # noqa: WPS615
+        """Код в нижнем регистре."""
+        return referral_code.code.lower()  # pragma: no cover
+
+
+def test_not_compilable_serializer():
+    """Сериализатор с SerializerMethodField не компилируется."""
+    assert values_plan(
+        MethodFieldSerializer,
+        ReferralCode.objects.all(),
+    ) is None
+
+
+@pytest.mark.django_db()
+def test_list_uses_values(api_request, user, django_user_model):
+    """list() строит страницу из .values() с пагинацией по умолчанию."""
+    _friend_requests(django_user_model, user, 3)
+    response = api_request(
+        FriendRequestViewSet,
+        {'get': 'list'},
+        user,
+        data={'limit': 2},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['results']) == 2
+    assert response.data['next']
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize('rows_count', ROWS_COUNTS)
+def test_rows_per_second(list_data, rows_count):
+    """Строк в секунду: сериализатор и values_plan на одной странице.
+
+    Время включает запрос к БД, из ROUNDS запусков берется лучшее.
+    """
+    queryset, serializer_class, context = list_data(rows_count)
+    queryset = queryset.order_by('id')
+    if connection.vendor == 'postgresql':
+        # Статистика планировщика для только что вставленных строк.
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    serialized, serializer_time = _best_time(
+        _serialized,
+        queryset,
+        serializer_class,
+        context,
+    )
+    compiled, compiled_time = _best_time(
+        _compiled,
+        queryset,
+        serializer_class,
+    )
+
+    assert compiled == serialized
+    print(  # noqa: WPS421
+        f'\n{serializer_class.__name__}, {rows_count} строк: ' +
+        f'сериализатор {rows_count / serializer_time:.0f} строк/с, ' +
+        f'values {rows_count / compiled_time:.0f} строк/с ' +
+        f'(x{serializer_time / compiled_time:.1f}).',
+    )
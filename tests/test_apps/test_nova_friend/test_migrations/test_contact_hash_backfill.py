@@ -0,0 +1,37 @@
+"""Заполнение индекса контактов существующими пользователями (0009)."""
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+
+from nova_friend.models import ContactHash
+from nova_friend.services.contact_index import contact_hash
+from nova_friend.services.enums import ContactKind
+
+migration = import_module('nova_friend.migrations.0009_contact_hash')
+
+
+@pytest.mark.django_db()
+def test_backfill_contact_hashes(django_user_model, monkeypatch):
+    """Контакты всех пользователей попадают в индекс пачками."""
+    monkeypatch.setattr(migration, 'BACKFILL_BATCH_SIZE', 2)
+    users = django_user_model.objects.bulk_create([
+        django_user_model(username=f'user{index}', email=f'User{index}@ex.com')
+        for index in range(5)
+    ])
+    django_user_model.objects.filter(pk=users[0].pk).update(
+        phone='+79161234567',
+    )
+    assert not ContactHash.objects.exists()
+
+    migration.backfill_contact_hashes(apps, None)
+    migration.backfill_contact_hashes(apps, None)
+
+    entries = ContactHash.objects.values_list('user_id', 'kind', 'digest')
+    assert set(entries) == {
+        *(
+            (user.pk, ContactKind.EMAIL, contact_hash(f'user{index}@ex.com'))
+            for index, user in enumerate(users)
+        ),
+        (users[0].pk, ContactKind.PHONE, contact_hash('+79161234567')),
+    }
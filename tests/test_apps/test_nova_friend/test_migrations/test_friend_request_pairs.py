@@ -0,0 +1,48 @@
+"""Удаление повторных запросов в друзья пары (миграция 0003)."""
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.db import connection
+
+from nova_friend.models import FriendRequest
+from nova_friend.services.enums import FriendRequestStatus
+
+migration = import_module(
+    'nova_friend.migrations.0003_friend_request_user_pair_unique',
+)
+
+
+@pytest.mark.django_db()
+def test_delete_duplicate_pairs(django_user_model):
+    """Для пары остается подтвержденный или самый ранний запрос."""
+    users = [
+        django_user_model.objects.create(username=f'user{index}')
+        for index in range(5)
+    ]
+    with connection.cursor() as cursor:
+        # Состояние БД до миграции: уникального индекса пары еще нет.
+        cursor.execute('DROP INDEX friend_request_user_pair_unique')
+    requests = [
+        FriendRequest.objects.create(
+            sending_user=users[sending],
+            receiving_user=users[receiving],
+            status=request_status,
+        )
+        for sending, receiving, request_status in (
+            (0, 1, FriendRequestStatus.PENDING),
+            (1, 0, FriendRequestStatus.CONFIRMED),
+            (0, 1, FriendRequestStatus.PENDING),
+            (2, 3, FriendRequestStatus.PENDING),
+            (3, 2, FriendRequestStatus.PENDING),
+            (0, 4, FriendRequestStatus.PENDING),
+        )
+    ]
+
+    migration.delete_duplicate_pairs(apps, None)
+
+    assert set(FriendRequest.objects.values_list('id', flat=True)) == {
+        requests[1].id,
+        requests[3].id,
+        requests[5].id,
+    }
@@ -0,0 +1,56 @@
+"""Заполнение Friendship существующей дружбой (миграция 0002)."""
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+
+from nova_friend.models import FriendRequest, Friendship
+from nova_friend.services.enums import FriendRequestStatus
+
+migration = import_module('nova_friend.migrations.0002_friendship')
+
+
+@pytest.fixture()
+def users(django_user_model):
+    """Пользователи."""
+    return [
+        django_user_model.objects.create(username=f'user{index}')
+        for index in range(6)
+    ]
+
+
+def _pairs():
+    """Пары (user_id, friend_id) таблицы Friendship."""
+    return set(Friendship.objects.values_list('user_id', 'friend_id'))
+
+
+@pytest.mark.django_db()
+def test_backfill_friendships(users, monkeypatch):
+    """Дружба из подтвержденных запросов и поля friends пользователя."""
+    monkeypatch.setattr(migration, 'BACKFILL_BATCH_SIZE', 1)
+    FriendRequest.objects.create(
+        sending_user=users[0],
+        receiving_user=users[1],
+        status=FriendRequestStatus.CONFIRMED,
+    )
+    FriendRequest.objects.create(
+        sending_user=users[4],
+        receiving_user=users[5],
+    )
+    if hasattr(users[2], 'friends'):
+        users[2].friends.add(users[3])
+    Friendship.objects.all().delete()
+
+    migration.backfill_friendships(apps, None)
+    migration.backfill_friendships(apps, None)
+
+    expected = {
+        (users[0].id, users[1].id),
+        (users[1].id, users[0].id),
+    }
+    if hasattr(users[2], 'friends'):
+        expected |= {
+            (users[2].id, users[3].id),
+            (users[3].id, users[2].id),
+        }
+    assert _pairs() == expected
@@ -0,0 +1,74 @@
+"""Создание запросов в друзья по адресной книге."""
+import pytest
+
+from nova_friend.models import FriendCounters, FriendRequest
+from nova_friend.services import bulk_create_friend_request as service
+from nova_friend.services.enums import FriendRequestContactResult
+
+
+@pytest.fixture()
+def users(django_user_model):
+    """Отправитель и два получателя."""
+    return [
+        django_user_model.objects.create(
+            username=f'user{index}',
+            email=f'user{index}@ex.com',
+        )
+        for index in range(3)
+    ]
+
+
+def _pending_outgoing(user):
+    """Счетчик ожидающих исходящих запросов пользователя."""
+    return FriendCounters.objects.get(user=user).pending_outgoing
+
+
+@pytest.mark.django_db()
+def test_created_tokens(users):
+    """token созданного запроса есть в БД."""
+    results = service.bulk_create_friend_requests(
+        ['user1@ex.com', 'USER2@ex.com', 'user1@ex.com'],
+        sending_user=users[0],
+        locale='ru',
+    )
+
+    assert [result['result'] for result in results] == [
+        FriendRequestContactResult.CREATED,
+        FriendRequestContactResult.CREATED,
+        FriendRequestContactResult.PENDING,
+    ]
+    assert {result['token'] for result in results[:2]} == {
+        str(token)
+        for token in FriendRequest.objects.values_list('token', flat=True)
+    }
+    assert _pending_outgoing(users[0]) == 2
+
+
+@pytest.mark.django_db()
+def test_concurrent_request(monkeypatch, users):
+    """Строка, пропущенная из-за параллельного запроса, - pending."""
+    FriendRequest.objects.create(
+        sending_user=users[1],
+        receiving_user=users[0],
+    )
+    # Параллельный запрос создан после чтения существующих запросов.
+    monkeypatch.setattr(
+        service,
+        '_related_user_ids',
+        lambda sending_user, user_ids: (set(), set()),
+    )
+
+    results = service.bulk_create_friend_requests(
+        ['user1@ex.com', 'user2@ex.com'],
+        sending_user=users[0],
+        locale='ru',
+    )
+
+    assert [(result['result'], result['token']) for result in results] == [
+        (FriendRequestContactResult.PENDING, None),
+        (
+            FriendRequestContactResult.CREATED,
+            str(FriendRequest.objects.get(receiving_user=users[2]).token),
+        ),
+    ]
+    assert _pending_outgoing(users[0]) == 1
@@ -0,0 +1,240 @@
+"""Индекс хэшей контактов."""
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from nova_friend import signals
+from nova_friend.api.views.contact_hash import ContactHashViewSet
+from nova_friend.checks import check_contact_hash_key
+from nova_friend.models import ContactHash
+from nova_friend.services.bulk_create_friend_request import (
+    bulk_create_friend_requests,
+)
+from nova_friend.services.contact_index import (
+    backfill_contact_index,
+    contact_hash,
+)
+from nova_friend.services.create_friend_request import create_friend_request
+from nova_friend.services.enums import ContactKind, FriendRequestContactResult
+
+
+@pytest.fixture()
+def sender(django_user_model):
+    """Отправитель запросов в друзья."""
+    return django_user_model.objects.create(
+        username='sender',
+        email='sender@ex.com',
+    )
+
+
+@pytest.fixture()
+def receiver(django_user_model):
+    """Пользователь с email в смешанном регистре и телефоном."""
+    return django_user_model.objects.create(
+        username='receiver',
+        email='Receiver@Ex.com',
+        phone='+79161234567',
+    )
+
+
+@pytest.fixture()
+def invites():
+    """Отправленные приглашения по e-mail и SMS."""
+    sent = []
+
+    def receiver(sender, **kwargs):
+        sent.append(kwargs)
+
+    for signal in (
+        signals.inviting_new_user_by_email,
+        signals.inviting_new_user_by_phone,
+    ):
+        signal.connect(receiver)
+    yield sent
+    for signal in (
+        signals.inviting_new_user_by_email,
+        signals.inviting_new_user_by_phone,
+    ):
+        signal.disconnect(receiver)
+
+
+def _digests(user):
+    """Хэши контактов пользователя по виду контакта."""
+    return dict(
+        ContactHash.objects.filter(user=user).values_list('kind', 'digest'),
+    )
+
+
+def test_key_required(settings):
+    """Без отдельного ключа хэши не считаются, проверка - ошибка."""
+    assert check_contact_hash_key(None) == []
+
+    settings.NOVA_FRIEND_CONTACT_HASH_KEY = ''
+
+    with pytest.raises(ImproperlyConfigured):
+        contact_hash('receiver@ex.com')
+    assert [error.id for error in check_contact_hash_key(None)] == [
+        'nova_friend.E001',
+    ]
+
+
+def test_key_not_secret_key(settings):
+    """Хэш зависит от ключа контактов, а не от SECRET_KEY."""
+    digest = contact_hash('receiver@ex.com')
+
+    settings.SECRET_KEY = 'other-secret-key'
+    assert contact_hash('receiver@ex.com') == digest
+
+    settings.NOVA_FRIEND_CONTACT_HASH_KEY = 'other-contact-hash-key'
+    assert contact_hash('receiver@ex.com') != digest
+
+
+@pytest.mark.django_db()
+def test_post_save(receiver):
+    """Контакты индексируются при создании и изменении пользователя."""
+    assert _digests(receiver) == {
+        ContactKind.EMAIL: contact_hash('receiver@ex.com'),
+        ContactKind.PHONE: contact_hash('+79161234567'),
+    }
+
+    receiver.phone = ''
+    receiver.email = 'new@ex.com'
+    receiver.save()
+
+    assert _digests(receiver) == {ContactKind.EMAIL: contact_hash('new@ex.com')}
+
+
+@pytest.mark.django_db()
+def test_save_without_contacts(receiver):
+    """Сохранение без контактов в update_fields не обращается к индексу."""
+    with CaptureQueriesContext(connection) as context:
+        receiver.save(update_fields=['first_name'])
+
+    assert len(context) == 1
+
+
+@pytest.mark.django_db()
+def test_receiver_lookup(sender, receiver):
+    """Email ищется без учета регистра, телефон - в любом формате."""
+    by_email = create_friend_request(
+        {'contact': 'RECEIVER@ex.com'},
+        sender,
+        'ru',
+    )
+    assert by_email.receiving_user_id == receiver.id
+
+    results = bulk_create_friend_requests(
+        ['receiver@EX.com', '8 (916) 123-45-67'],
+        sending_user=sender,
+        locale='ru',
+    )
+    assert [result['result'] for result in results] == [
+        FriendRequestContactResult.PENDING,
+        FriendRequestContactResult.PENDING,
+    ]
+
+
+@pytest.mark.django_db()
+def test_lookup_without_index(sender, django_user_model, invites):
+    """Пользователь в обход post_save находится по столбцам.
+
+    Приглашение ему не отправляется, после поиска он есть в индексе.
+    """
+    receiver = django_user_model.objects.bulk_create([
+        django_user_model(username='receiver', email='Receiver@Ex.com'),
+    ])[0]
+    django_user_model.objects.filter(pk=receiver.pk).update(
+        phone='+79161234567',
+    )
+    assert not ContactHash.objects.filter(user=receiver).exists()
+
+    by_email = create_friend_request(
+        {'contact': 'receiver@ex.com'},
+        sender,
+        'ru',
+    )
+
+    assert by_email.receiving_user_id == receiver.pk
+    assert invites == []
+    assert _digests(receiver) == {
+        ContactKind.EMAIL: contact_hash('receiver@ex.com'),
+        ContactKind.PHONE: contact_hash('+79161234567'),
+    }
+
+
+@pytest.mark.django_db()
+def test_bulk_lookup_without_index(sender, django_user_model):
+    """Пакетный поиск тоже находит пользователей без записей индекса."""
+    receivers = django_user_model.objects.bulk_create([
+        django_user_model(username='by_email', email='by_email@ex.com'),
+        django_user_model(username='by_phone', phone='+79161234567'),
+    ])
+
+    results = bulk_create_friend_requests(
+        ['BY_EMAIL@ex.com', '8 (916) 123-45-67', 'nobody@ex.com'],
+        sending_user=sender,
+        locale='ru',
+    )
+
+    assert [result['result'] for result in results] == [
+        FriendRequestContactResult.CREATED,
+        FriendRequestContactResult.CREATED,
+        FriendRequestContactResult.NOT_FOUND,
+    ]
+    assert all(_digests(receiver) for receiver in receivers)
+
+
+@pytest.mark.django_db()
+def test_backfill(django_user_model):
+    """Пользователи, созданные в обход post_save, попадают в индекс."""
+    users = django_user_model.objects.bulk_create([
+        django_user_model(username=f'user{index}', email=f'user{index}@ex.com')
+        for index in range(5)
+    ])
+    assert not ContactHash.objects.exists()
+
+    assert backfill_contact_index(chunk_size=2) == len(users)
+    assert backfill_contact_index(chunk_size=2) == 0
+    assert _digests(users[0]) == {
+        ContactKind.EMAIL: contact_hash('user0@ex.com'),
+    }
+
+
+@pytest.mark.django_db()
+def test_lookup_endpoint(count_queries, sender, receiver):
+    """Тысячи хэшей проверяются одним запросом к БД.
+
+    В ответе только найденные хэши, без id пользователей.
+    """
+    known = contact_hash('+79161234567')
+    hashes = [contact_hash(f'unknown{index}@ex.com') for index in range(2000)]
+
+    response, queries_count = count_queries(
+        ContactHashViewSet,
+        {'post': 'lookup'},
+        sender,
+        method='post',
+        data={'hashes': [*hashes, known.upper()]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {
+        'results': [{'hash': known}],
+    }
+    assert queries_count == 1
+
+
+@pytest.mark.django_db()
+def test_lookup_validation(api_request, sender):
+    """Хэш - 64 шестнадцатеричных символа."""
+    response = api_request(
+        ContactHashViewSet,
+        {'post': 'lookup'},
+        sender,
+        method='post',
+        data={'hashes': ['receiver@ex.com']},
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,91 @@
+"""Нормализация контактов и кэш номеров телефонов."""
+import logging
+
+import pytest
+from django.core.management import call_command
+
+from nova_friend.services.bulk_create_friend_request import (
+    bulk_create_friend_requests,
+)
+from nova_friend.services.contacts import (
+    PhoneError,
+    normalize_email,
+    normalize_phone,
+    normalize_phone_number,
+    phone_cache_info,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_phone_cache():
+    """Статистика кэша номеров считается с нуля."""
+    normalize_phone_number.cache_clear()
+
+
+@pytest.mark.parametrize(('contact', 'locale', 'phone'), [
+    ('8 (916) 123-45-67', 'ru', '+79161234567'),
+    (' +7 916 123 45 67 ', 'en', '+79161234567'),
+    ('(201) 555-0123', 'en-us', '+12015550123'),
+    ('(201) 555-0123', 'en_US', '+12015550123'),
+    ('12', 'ru', None),
+    ('no digits', 'ru', None),
+])
+def test_normalize_phone(contact, locale, phone):
+    """Номер приводится к E.164 с учетом региона из locale."""
+    assert normalize_phone(contact, locale) == phone
+
+
+@pytest.mark.parametrize(('contact', 'error'), [
+    ('no digits', PhoneError.NOT_A_NUMBER),
+    ('+7 000 000 00 00', PhoneError.INVALID_NUMBER),
+])
+def test_phone_error(contact, error):
+    """Причина, по которой номер некорректен."""
+    assert normalize_phone_number(contact, 'ru') == (None, error)
+
+
+def test_normalize_email():
+    """Email в нижнем регистре, некорректный - None."""
+    assert normalize_email(' User@Ex.COM ') == 'user@ex.com'
+    assert normalize_email('user@') is None
+
+
+def test_phone_cache():
+    """Повторный номер берется из кэша, locale - часть ключа."""
+    before = phone_cache_info()
+    for locale in ('ru', 'ru', 'en'):
+        normalize_phone('8 (916) 123-45-67', locale)
+
+    cache_info = phone_cache_info().since(before)
+
+    assert (cache_info.hits, cache_info.misses, cache_info.size) == (1, 2, 2)
+
+
+@pytest.mark.django_db()
+def test_bulk_create_reports_cache(caplog, django_user_model):
+    """Создание по адресной книге пишет статистику кэша в лог."""
+    sender = django_user_model.objects.create(username='sender')
+    caplog.set_level(logging.INFO)
+
+    bulk_create_friend_requests(
+        ['+79161234567', '8 916 123-45-67', '+79161234567', 'a@ex.com'],
+        sending_user=sender,
+        locale='ru',
+    )
+
+    assert (
+        'Нормализовано контактов: 4, кэш номеров: попаданий 1, промахов 2'
+    ) in caplog.text
+
+
+@pytest.mark.django_db()
+def test_backfill_reports_cache(capsys, django_user_model):
+    """Команда построения индекса выводит статистику кэша."""
+    django_user_model.objects.bulk_create([
+        django_user_model(username=f'user{index}', phone='+79161234567')
+        for index in range(3)
+    ])
+
+    call_command('backfill_contact_index')
+
+    assert 'Кэш номеров: попаданий 2, промахов 1' in capsys.readouterr().out
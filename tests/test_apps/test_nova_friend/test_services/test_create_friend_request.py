@@ -0,0 +1,65 @@
+"""Создание запроса в друзья."""
+import pytest
+from rest_framework.exceptions import ValidationError
+
+from nova_friend.models import FriendRequest
+from nova_friend.services import create_friend_request as service
+from nova_friend.services.check_friend_request import (
+    ALREADY_RECEIVED,
+    ALREADY_SENT,
+)
+
+
+@pytest.fixture()
+def users(django_user_model):
+    """Отправитель и получатель."""
+    return [
+        django_user_model.objects.create(
+            username=f'user{index}',
+            email=f'user{index}@ex.com',
+        )
+        for index in range(2)
+    ]
+
+
+def _concurrent_request(monkeypatch, sending_user, receiving_user):
+    """Запрос пары создается параллельно - после проверки пары."""
+    check_friend_request_pair = service.check_friend_request_pair
+    checks = []
+
+    def check_then_insert(**kwargs):
+        if not checks:
+            checks.append(kwargs)
+            FriendRequest.objects.create(
+                sending_user=sending_user,
+                receiving_user=receiving_user,
+            )
+            return
+        check_friend_request_pair(**kwargs)
+
+    monkeypatch.setattr(
+        service,
+        'check_friend_request_pair',
+        check_then_insert,
+    )
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize(('reverse', 'message'), [
+    (False, ALREADY_SENT),
+    (True, ALREADY_RECEIVED),
+])
+def test_concurrent_pair(monkeypatch, users, reverse, message):
+    """Конфликт уникального индекса пары - сообщение по направлению."""
+    sending_user, receiving_user = users[::-1] if reverse else users
+    _concurrent_request(monkeypatch, sending_user, receiving_user)
+
+    with pytest.raises(ValidationError) as error:
+        service.create_friend_request(
+            {'contact': users[1].email},
+            users[0],
+            'ru',
+        )
+
+    assert error.value.detail == [message]
+    assert FriendRequest.objects.count() == 1
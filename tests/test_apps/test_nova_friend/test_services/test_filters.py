@@ -0,0 +1,94 @@
+"""Множественный фильтр без SELECT DISTINCT и условие AnyLookup."""
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import QueryDict
+
+from nova_friend.api.views.referral_code import ReferralCodeFilter
+from nova_friend.api.views.referral_invite import ReferralInviteFilter
+from nova_friend.models import ReferralCode
+from nova_friend.services.filters import MultipleValueField
+
+
+@pytest.fixture()
+def referral_codes(django_user_model):
+    """Коды пользователей first, second и third."""
+    return {
+        username: ReferralCode.objects.create(
+            user=django_user_model.objects.create(
+                username=username,
+                email=f'{username}@ex.com',
+            ),
+            code=username.upper()[:8],
+        )
+        for username in ('first', 'second', 'third')
+    }
+
+
+def _filter(filterset_class, query):
+    """Фильтр по query-строке."""
+    return filterset_class(
+        QueryDict(query),
+        queryset=filterset_class._meta.model.objects.all(),  # noqa: WPS437
+    )
+
+
+@pytest.mark.django_db()
+def test_multiple_values(referral_codes, django_assert_num_queries):
+    """Несколько значений одного параметра - одно условие в запросе."""
+    filterset = _filter(
+        ReferralCodeFilter,
+        'user_email=first@ex.com&user_email=third@ex.com',
+    )
+
+    with django_assert_num_queries(1):
+        codes = {referral_code.code for referral_code in filterset.qs}
+
+    assert codes == {'FIRST', 'THIRD'}
+    sql = str(filterset.qs.query)
+    if connection.vendor == 'postgresql':
+        assert '= ANY(' in sql
+    else:
+        assert ' IN (' in sql
+    assert 'DISTINCT' not in sql
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('referral_codes')
+def test_without_value():
+    """Без параметра фильтр не применяется."""
+    assert _filter(ReferralCodeFilter, '').qs.count() == 3
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize('query', [
+    'user_email=',
+    # Длиннее max_length поля модели.
+    'user_username={0}'.format('a' * 200),
+    'referral_code_code=TOOLONGCODE',
+    '&'.join(
+        f'user_email=user{index}@ex.com'
+        for index in range(MultipleValueField.max_values + 1)
+    ),
+])
+def test_invalid(query):
+    """Пустые, слишком длинные и слишком многочисленные значения."""
+    filterset_class = ReferralInviteFilter
+    if query.startswith('user_'):
+        filterset_class = ReferralCodeFilter
+
+    assert not _filter(filterset_class, query).is_valid()
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('referral_codes')
+def test_lookup_not_registered():
+    """Фильтрация не регистрирует lookup на полях модели."""
+    user_model = get_user_model()
+    email = user_model._meta.get_field('email')  # noqa: WPS437
+
+    filterset = _filter(ReferralCodeFilter, 'user_email=first@ex.com')
+
+    assert filterset.qs.count() == 1
+    assert email.get_lookup('any') is None
+    assert 'any' not in type(email).get_lookups()
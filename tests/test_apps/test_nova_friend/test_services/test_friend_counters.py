@@ -0,0 +1,163 @@
+"""Счетчики друзей меняются вместе с запросами в друзья."""
+import pytest
+from django.core.cache import cache
+
+from nova_friend.api.views.friend_request import FriendRequestViewSet
+from nova_friend.models import FriendCounters
+from nova_friend.services.action_friend_request import (
+    bulk_friend_request_action,
+    delete_friend_request,
+    friend_request_action,
+)
+from nova_friend.services.bulk_create_friend_request import (
+    bulk_create_friend_requests,
+)
+from nova_friend.services.contact_index import index_users
+from nova_friend.services.create_friend_request import create_friend_request
+from nova_friend.services.enums import FriendRequestStatus
+from nova_friend.services.friend_counters import (
+    exact_friend_counters,
+    reconcile_friend_counters,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    """Счетчики не берутся из кэша предыдущих тестов."""
+    cache.clear()
+
+
+@pytest.fixture()
+def users(django_user_model):
+    """Пользователи user0..user3."""
+    users = django_user_model.objects.bulk_create([
+        django_user_model(username=f'user{index}', email=f'user{index}@ex.com')
+        for index in range(4)
+    ])
+    # bulk_create не отправляет post_save.
+    index_users(users)
+    return users
+
+
+def _counters(user):
+    """Значения записи счетчиков пользователя."""
+    counters = FriendCounters.objects.filter(pk=user.id).first()
+    if counters is None:
+        return (0, 0, 0)
+    return (
+        counters.pending_incoming,
+        counters.pending_outgoing,
+        counters.friends,
+    )
+
+
+def _assert_exact(users):
+    """Записи счетчиков совпадают с подсчетом по запросам и дружбе."""
+    exact = exact_friend_counters([user.id for user in users])
+    assert {user.id: _counters(user) for user in users} == exact
+
+
+def _request(sending_user, receiving_user):
+    """Запрос в друзья по email получателя."""
+    return create_friend_request(
+        {'contact': receiving_user.email},
+        sending_user,
+        'ru',
+    )
+
+
+@pytest.mark.django_db()
+def test_create_and_confirm(users):
+    """Создание и подтверждение запроса."""
+    sender, receiver = users[:2]
+    friend_request = _request(sender, receiver)
+
+    assert _counters(sender) == (0, 1, 0)
+    assert _counters(receiver) == (1, 0, 0)
+
+    friend_request_action(
+        token=friend_request.token,
+        status=FriendRequestStatus.CONFIRMED,
+    )
+
+    assert _counters(sender) == (0, 0, 1)
+    assert _counters(receiver) == (0, 0, 1)
+
+    friend_request.refresh_from_db()
+    delete_friend_request(friend_request)
+
+    _assert_exact(users)
+    assert _counters(sender) == (0, 0, 0)
+
+
+@pytest.mark.django_db()
+def test_reject_and_cancel(users):
+    """Отказ и отмена уменьшают ожидающие запросы."""
+    rejected = _request(users[0], users[1])
+    canceled = _request(users[0], users[2])
+
+    friend_request_action(
+        token=rejected.token,
+        status=FriendRequestStatus.REJECTED,
+    )
+    friend_request_action(
+        token=canceled.token,
+        status=FriendRequestStatus.CANCELED,
+    )
+
+    _assert_exact(users)
+    assert _counters(users[0]) == (0, 0, 0)
+
+
+@pytest.mark.django_db()
+def test_bulk_paths(users):
+    """Создание по адресной книге и массовое подтверждение."""
+    sender, *receivers = users
+    results = bulk_create_friend_requests(
+        [receiver.email for receiver in receivers],
+        sending_user=sender,
+        locale='ru',
+    )
+
+    _assert_exact(users)
+    assert _counters(sender) == (0, 3, 0)
+
+    for receiver, result in zip(receivers[:2], results):
+        bulk_friend_request_action(
+            tokens=[result['token']],
+            status=FriendRequestStatus.CONFIRMED,
+            user=receiver,
+        )
+
+    _assert_exact(users)
+    assert _counters(sender) == (0, 1, 2)
+
+
+@pytest.mark.django_db()
+def test_reconcile(users):
+    """Сверка исправляет расхождения и создает недостающие записи."""
+    _request(users[0], users[1])
+    FriendCounters.objects.filter(pk=users[0].id).update(pending_outgoing=5)
+    FriendCounters.objects.filter(pk=users[1].id).delete()
+
+    assert reconcile_friend_counters(chunk_size=2) == 2
+    _assert_exact(users)
+    assert reconcile_friend_counters(chunk_size=2) == 0
+
+
+@pytest.mark.django_db()
+def test_counters_endpoint(api_request, count_queries, users):
+    """Одно чтение по первичному ключу, повторный запрос - из кэша."""
+    _request(users[0], users[1])
+    actions = {'get': 'counters'}
+
+    response, queries = count_queries(FriendRequestViewSet, actions, users[1])
+    assert response.data == {
+        'pending_incoming': 1,
+        'pending_outgoing': 0,
+        'friends': 0,
+    }
+    assert queries == 1
+
+    _, queries = count_queries(FriendRequestViewSet, actions, users[1])
+    assert queries == 0
@@ -0,0 +1,183 @@
+"""Аннотации with_request_mode совпадают с set_request_mode."""
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from nova_friend.api.serializers import FriendRequestSerializer
+from nova_friend.models import FriendRequest
+from nova_friend.services import friend_request_mode
+from nova_friend.services.enums import FriendRequestMode
+from nova_friend.services.friend_request_mode import (
+    set_request_mode,
+    with_request_mode,
+)
+
+ANNOTATIONS = (
+    'request_mode',
+    'counterpart_id',
+    'counterpart_full_name',
+    'counterpart_avatar',
+)
+
+NAMES = (
+    ('Ivan', 'Petrov'),
+    ('', 'Petrov'),
+    ('Ivan', ''),
+    ('', ''),
+    (' Ivan ', ' Petrov '),
+)
+
+
+@pytest.fixture()
+def users(django_user_model):
+    """Пользователь user и участники его запросов с разными именами."""
+    user = django_user_model.objects.create(username='user')
+    others = [
+        django_user_model.objects.create(
+            username=f'other{index}',
+            first_name=first_name,
+            last_name=last_name,
+            avatar=f'avatars/{index}.png' if index % 2 else '',
+        )
+        for index, (first_name, last_name) in enumerate(NAMES)
+    ]
+    return user, others
+
+
+@pytest.fixture()
+def friend_requests(users):
+    """Входящие и исходящие запросы user и запрос без его участия."""
+    user, others = users
+    friend_requests = [
+        FriendRequest.objects.create(
+            sending_user=other if index % 2 else user,
+            receiving_user=user if index % 2 else other,
+            contact='contact',
+        )
+        for index, other in enumerate(others)
+    ]
+    friend_requests.append(
+        FriendRequest.objects.create(
+            sending_user=others[0],
+            receiving_user=others[1],
+            contact='contact',
+        ),
+    )
+    return friend_requests
+
+
+def _annotated(user):
+    """Значения аннотаций with_request_mode по id запроса."""
+    return {
+        row['id']: tuple(row[name] for name in ANNOTATIONS)
+        for row in with_request_mode(FriendRequest.objects.all(), user).values(
+            'id',
+            *ANNOTATIONS,
+        )
+    }
+
+
+def _fallback(user):
+    """Значения set_request_mode по id запроса."""
+    values = {}
+    for friend_request in FriendRequest.objects.all():
+        set_request_mode(friend_request, user)
+        values[friend_request.id] = tuple(
+            # Поле avatar - файл, в аннотации - путь к нему.
+            getattr(getattr(friend_request, name), 'name', None) or None
+            if name == 'counterpart_avatar'
+            else getattr(friend_request, name)
+            for name in ANNOTATIONS
+        )
+    return values
+
+
+def _normalize(values):
+    """Пустой путь к аватарке считается отсутствием аватарки."""
+    return {
+        friend_request_id: (*row[:3], row[3] or None)
+        for friend_request_id, row in values.items()
+    }
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('friend_requests')
+def test_without_full_name_column(users):
+    """Имя и фамилия объединяются одинаково в SQL и в Python."""
+    user, others = users
+
+    annotated = _annotated(user)
+
+    assert _normalize(annotated) == _normalize(_fallback(user))
+    names = {row[1]: row[2] for row in annotated.values()}
+    assert [names[other.id] for other in others] == [
+        'Ivan Petrov',
+        'Petrov',
+        'Ivan',
+        '',
+        'Ivan   Petrov',
+    ]
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('friend_requests')
+def test_with_full_name_column(users, monkeypatch):
+    """Столбец полного имени читается одинаково в SQL и в Python.
+
+    Вместо full_name используется существующий столбец username.
+    """
+    monkeypatch.setattr(friend_request_mode, 'FULL_NAME_FIELD', 'username')
+    user, others = users
+
+    annotated = _annotated(user)
+
+    assert _normalize(annotated) == _normalize(_fallback(user))
+    assert {row[2] for row in annotated.values()} == {
+        *(other.username for other in others),
+        None,
+    }
+
+
+@pytest.mark.django_db()
+def test_without_counterpart(users, friend_requests):
+    """Запрос без участия пользователя - пустые значения."""
+    user, _ = users
+    other_request = friend_requests[-1]
+
+    annotated = _annotated(user)[other_request.id]
+    set_request_mode(other_request, user)
+
+    assert annotated == (None, None, None, None)
+    assert tuple(getattr(other_request, name) for name in ANNOTATIONS) == (
+        None,
+        None,
+        None,
+        None,
+    )
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures('friend_requests')
+def test_serializer(users):
+    """Ответ сериализатора не зависит от способа вычисления."""
+    user, _ = users
+    request = APIRequestFactory().get('/')
+    request.user = user
+    context = {'request': request}
+
+    annotated = FriendRequestSerializer(
+        with_request_mode(FriendRequest.objects.order_by('id'), user),
+        many=True,
+        context=context,
+    ).data
+    loaded = FriendRequestSerializer(
+        FriendRequest.objects.order_by('id'),
+        many=True,
+        context=context,
+    ).data
+
+    assert annotated == loaded
+    assert {row['request_mode'] for row in annotated} == {
+        FriendRequestMode.INCOMING.value,
+        FriendRequestMode.OUTCOMING.value,
+        None,
+    }
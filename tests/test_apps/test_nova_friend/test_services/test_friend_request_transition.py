@@ -0,0 +1,177 @@
+"""Смена статуса запросов в друзья одним запросом к БД."""
+import uuid
+
+import pytest
+from django.db.models import signals
+
+from nova_friend.models import FriendRequest
+from nova_friend.permissions.friend_request import (
+    friend_request_action_filters,
+)
+from nova_friend.services.enums import FriendRequestStatus
+from nova_friend.services.friend_request_transition import (
+    transition_friend_request,
+    transition_friend_requests,
+)
+
+
+@pytest.fixture()
+def users(django_user_model):
+    """Отправитель, получатель и посторонний пользователь."""
+    return [
+        django_user_model.objects.create(
+            username=f'user{index}',
+            email=f'user{index}@ex.com',
+        )
+        for index in range(3)
+    ]
+
+
+@pytest.fixture()
+def friend_request(users):
+    """Ожидающий запрос user0 -> user1."""
+    return FriendRequest.objects.create(
+        sending_user=users[0],
+        receiving_user=users[1],
+        contact=users[1].email,
+    )
+
+
+@pytest.fixture()
+def delete_receivers():
+    """Вызовы pre_delete и post_delete для FriendRequest."""
+    calls = []
+
+    def receiver(sender, instance, signal, **kwargs):
+        calls.append((signal, instance.token))
+
+    for signal in (signals.pre_delete, signals.post_delete):
+        signal.connect(receiver, sender=FriendRequest)
+    yield calls
+    for signal in (signals.pre_delete, signals.post_delete):
+        signal.disconnect(receiver, sender=FriendRequest)
+
+
+@pytest.mark.django_db()
+def test_confirm(friend_request, users, django_assert_num_queries):
+    """Подтверждение - один UPDATE, повторное ничего не меняет."""
+    with django_assert_num_queries(1):
+        transitioned = transition_friend_request(
+            friend_request.token,
+            FriendRequestStatus.CONFIRMED,
+        )
+
+    assert transitioned.id == friend_request.id
+    assert transitioned.token == friend_request.token
+    assert transitioned.sending_user_id == users[0].id
+    assert transitioned.receiving_user_id == users[1].id
+    friend_request.refresh_from_db()
+    assert friend_request.status == FriendRequestStatus.CONFIRMED
+    updated_at = friend_request.updated_at
+
+    for status in FriendRequestStatus:
+        assert transition_friend_request(friend_request.token, status) is None
+    friend_request.refresh_from_db()
+    assert friend_request.status == FriendRequestStatus.CONFIRMED
+    assert friend_request.updated_at == updated_at
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize('status', [
+    FriendRequestStatus.REJECTED,
+    FriendRequestStatus.CANCELED,
+])
+def test_delete(friend_request, status, django_assert_num_queries):
+    """Отказ и отмена - один DELETE, повторный ничего не делает."""
+    with django_assert_num_queries(1):
+        transitioned = transition_friend_request(friend_request.token, status)
+
+    assert transitioned.id == friend_request.id
+    assert not FriendRequest.objects.exists()
+    assert transition_friend_request(friend_request.token, status) is None
+
+
+@pytest.mark.django_db()
+def test_unknown_token():
+    """Несуществующий token - None."""
+    assert transition_friend_request(
+        uuid.uuid4(),
+        FriendRequestStatus.CONFIRMED,
+    ) is None
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize(('status', 'allowed_user'), [
+    (FriendRequestStatus.CONFIRMED, 1),
+    (FriendRequestStatus.REJECTED, 1),
+    (FriendRequestStatus.CANCELED, 0),
+])
+def test_permission_filter(friend_request, users, status, allowed_user):
+    """Фильтр прав проверяется в том же запросе."""
+    for index, user in enumerate(users):
+        if index == allowed_user:
+            continue
+        assert transition_friend_request(
+            friend_request.token,
+            status,
+            friend_request_action_filters[status](user),
+        ) is None
+    assert FriendRequest.objects.get().status == FriendRequestStatus.PENDING
+
+    assert transition_friend_request(
+        friend_request.token,
+        status,
+        friend_request_action_filters[status](users[allowed_user]),
+    ) is not None
+
+
+@pytest.mark.django_db()
+def test_bulk(friend_request, users):
+    """Из пачки меняются только ожидающие запросы."""
+    confirmed = FriendRequest.objects.create(
+        sending_user=users[2],
+        receiving_user=users[1],
+        contact=users[1].email,
+        status=FriendRequestStatus.CONFIRMED,
+    )
+
+    transitioned = transition_friend_requests(
+        [friend_request.token, confirmed.token, uuid.uuid4()],
+        FriendRequestStatus.REJECTED,
+    )
+
+    assert [row.token for row in transitioned] == [friend_request.token]
+    assert list(FriendRequest.objects.values_list('id', flat=True)) == [
+        confirmed.id,
+    ]
+    assert transition_friend_requests([], FriendRequestStatus.REJECTED) == []
+
+
+@pytest.mark.django_db()
+def test_delete_receivers(friend_request, users, delete_receivers):
+    """С получателями pre_delete/post_delete удаление идет через ORM."""
+    other = FriendRequest.objects.create(
+        sending_user=users[2],
+        receiving_user=users[1],
+        contact=users[1].email,
+    )
+
+    transitioned = transition_friend_requests(
+        [friend_request.token, other.token],
+        FriendRequestStatus.REJECTED,
+        friend_request_action_filters[FriendRequestStatus.CANCELED](users[0]),
+    )
+
+    assert [row.id for row in transitioned] == [friend_request.id]
+    assert delete_receivers == [
+        (signals.pre_delete, friend_request.token),
+        (signals.post_delete, friend_request.token),
+    ]
+    assert list(FriendRequest.objects.values_list('id', flat=True)) == [
+        other.id,
+    ]
+    assert transition_friend_request(
+        friend_request.token,
+        FriendRequestStatus.REJECTED,
+    ) is None
+    assert len(delete_receivers) == 2
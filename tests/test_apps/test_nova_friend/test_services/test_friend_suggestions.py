@@ -0,0 +1,110 @@
+"""Возможные друзья по числу общих друзей."""
+import pytest
+
+from nova_friend.api.views.friend_suggestion import FriendSuggestionViewSet
+from nova_friend.models import FriendSuggestion
+from nova_friend.services.action_friend_request import friend_request_action
+from nova_friend.services.contact_index import index_users
+from nova_friend.services.create_friend_request import create_friend_request
+from nova_friend.services.enums import FriendRequestStatus
+from nova_friend.services.friend_suggestions import refresh_friend_suggestions
+from nova_friend.services.friendship import add_friendships
+
+
+@pytest.fixture()
+def users(django_user_model):
+    """Пользователи user0..user5.
+
+    Друзья: 0-1, 0-2, 1-3, 2-3, 1-4. Для user0 кандидаты user3 (два общих
+    друга) и user4 (один общий друг).
+    """
+    users = django_user_model.objects.bulk_create([
+        django_user_model(username=f'user{index}', email=f'user{index}@ex.com')
+        for index in range(6)
+    ])
+    # bulk_create не отправляет post_save.
+    index_users(users)
+    add_friendships([
+        (users[first].id, users[second].id)
+        for first, second in ((0, 1), (0, 2), (1, 3), (2, 3), (1, 4))
+    ])
+    return users
+
+
+def _suggested(user):
+    """Возможные друзья пользователя: (индекс, общих друзей)."""
+    return [
+        (suggestion.suggested_user.username, suggestion.mutual_friends_count)
+        for suggestion in FriendSuggestion.objects.filter(
+            user=user,
+        ).select_related('suggested_user').order_by('id')
+    ]
+
+
+def _request(sending_user, receiving_user):
+    """Запрос в друзья по email получателя."""
+    return create_friend_request(
+        {'contact': receiving_user.email},
+        sending_user,
+        'ru',
+    )
+
+
+@pytest.mark.django_db()
+def test_ranking_and_limit(users):
+    """Кандидаты по убыванию общих друзей, не больше limit."""
+    run = refresh_friend_suggestions(chunk_size=2)
+
+    assert run.full
+    assert run.users_count == len(users)
+    assert _suggested(users[0]) == [('user3', 2), ('user4', 1)]
+    assert _suggested(users[3]) == [('user0', 2), ('user4', 1)]
+    assert _suggested(users[5]) == []
+
+    refresh_friend_suggestions(chunk_size=10, full=True, limit=1)
+    assert _suggested(users[0]) == [('user3', 2)]
+
+
+@pytest.mark.django_db()
+def test_pending_request_excluded(users):
+    """Пользователи с ожидающим запросом в любом направлении исключаются."""
+    _request(users[4], users[0])
+    refresh_friend_suggestions(chunk_size=10)
+
+    assert _suggested(users[0]) == [('user3', 2)]
+    assert _suggested(users[4]) == [('user3', 1)]
+
+
+@pytest.mark.django_db()
+def test_incremental_refresh(users):
+    """Пересчитываются участники новой дружбы и их друзья."""
+    refresh_friend_suggestions(chunk_size=10)
+    friend_request = _request(users[5], users[3])
+    friend_request_action(
+        token=friend_request.token,
+        status=FriendRequestStatus.CONFIRMED,
+    )
+
+    run = refresh_friend_suggestions(chunk_size=1)
+
+    assert not run.full
+    # user5, user3 и друзья user3: user1, user2.
+    assert run.users_count == 4
+    assert _suggested(users[5]) == [('user1', 1), ('user2', 1)]
+    assert ('user5', 1) in _suggested(users[1])
+    # user0 не пересчитывался, хотя user5 теперь друг его друга user3.
+    assert _suggested(users[0]) == [('user3', 2), ('user4', 1)]
+
+
+@pytest.mark.django_db()
+def test_suggestions_endpoint(api_request, users):
+    """Список возможных друзей без кандидатов с новым запросом."""
+    refresh_friend_suggestions(chunk_size=10)
+    _request(users[0], users[3])
+
+    response = api_request(FriendSuggestionViewSet, {'get': 'list'}, users[0])
+
+    assert [
+        (suggestion['suggested_user']['id'], suggestion['mutual_friends_count'])
+        for suggestion in response.data['results']
+    ] == [(users[4].id, 1)]
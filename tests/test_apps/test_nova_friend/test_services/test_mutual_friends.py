@@ -0,0 +1,105 @@
+"""Общие друзья через разреженную матрицу смежности."""
+import random
+
+import pytest
+
+from nova_friend.models import FriendSuggestion
+from nova_friend.services.contact_index import index_users
+from nova_friend.services.create_friend_request import create_friend_request
+from nova_friend.services.friend_suggestions import refresh_friend_suggestions
+from nova_friend.services.friendship import (
+    add_friendships,
+    are_friends,
+    friend_ids,
+    remove_friendship,
+)
+
+pytest.importorskip('numpy')
+mutual_friends = pytest.importorskip('nova_friend.services.mutual_friends')
+
+USERS_COUNT = 40
+EDGES_COUNT = 150
+
+
+@pytest.fixture()
+def users(django_user_model):
+    """Случайный граф друзей и несколько ожидающих запросов."""
+    users = django_user_model.objects.bulk_create([
+        django_user_model(username=f'user{index}', email=f'user{index}@ex.com')
+        for index in range(USERS_COUNT)
+    ])
+    # bulk_create не отправляет post_save.
+    index_users(users)
+    generator = random.Random(0)
+    add_friendships(
+        (first.id, second.id)
+        for first, second in (
+            generator.sample(users, 2) for _ in range(EDGES_COUNT)
+        )
+    )
+    for first, second in (generator.sample(users, 2) for _ in range(10)):
+        if not are_friends(first.id, second.id):
+            create_friend_request({'contact': second.email}, first, 'ru')
+    return users
+
+
+def _suggestions():
+    """Все возможные друзья в порядке выдачи."""
+    return list(
+        FriendSuggestion.objects.order_by('id').values_list(
+            'user_id',
+            'suggested_user_id',
+            'mutual_friends_count',
+        ),
+    )
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize('memory_budget', [1, None])
+def test_same_as_sql(users, memory_budget):
+    """Результат совпадает с SQL-пересчетом при любом размере блока."""
+    refresh_friend_suggestions(chunk_size=7, full=True, limit=5)
+    expected = _suggestions()
+
+    run = mutual_friends.refresh_friend_suggestions_csr(
+        chunk_size=7,
+        limit=5,
+        memory_budget=memory_budget,
+    )
+
+    assert run.full
+    assert expected
+    assert _suggestions() == expected
+
+
+@pytest.mark.django_db()
+def test_stale_suggestions_removed(users):
+    """Кандидаты пользователя, у которого не осталось друзей, удаляются."""
+    add_friendships([(users[0].id, users[1].id), (users[1].id, users[2].id)])
+    mutual_friends.refresh_friend_suggestions_csr(chunk_size=10)
+    for friend_id in list(friend_ids(users[0].id)):
+        remove_friendship(users[0].id, friend_id)
+
+    mutual_friends.refresh_friend_suggestions_csr(chunk_size=10)
+
+    assert not FriendSuggestion.objects.filter(user=users[0]).exists()
+
+
+def test_benchmark_memory_budget():
+    """Пиковая память блоков держится около бюджета.
+
+    Граф 1 млн пользователей / 50 млн ребер проверяется командой
+    benchmark_mutual_friends, здесь - уменьшенный граф.
+    """
+    memory_budget = 2 * 1024 * 1024
+    graph = mutual_friends.synthetic_friend_graph(5000, 50000)
+
+    stats = mutual_friends.benchmark_friend_graph(
+        graph,
+        limit=50,
+        memory_budget=memory_budget,
+    )
+
+    assert stats['blocks'] > 1
+    assert stats['candidates'] == 5000 * 50
+    assert stats['blocks_peak'] < memory_budget * 1.5
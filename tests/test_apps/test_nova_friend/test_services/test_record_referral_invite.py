@@ -0,0 +1,204 @@
+"""Запись приглашений по реферальной системе одним INSERT."""
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from nova_friend.models import ReferralCode, ReferralInvite, ReferralStats
+from nova_friend.services.record_referral_invite import (
+    ReferralAttribution,
+    record_referral_invite,
+    record_referral_invites,
+)
+
+
+@pytest.fixture()
+def users(django_user_model):
+    """Пригласивший (с кодом ABC12) и приглашенные пользователи."""
+    referrer = django_user_model.objects.create(
+        username='referrer',
+        email='referrer@ex.com',
+    )
+    ReferralCode.objects.create(user=referrer, code='ABC12')
+    invited = [
+        django_user_model.objects.create(
+            username=f'invited{index}',
+            email=f'invited{index}@ex.com',
+        )
+        for index in range(4)
+    ]
+    return referrer, invited
+
+
+def _invites():
+    """Записанные приглашения: (пригласивший, приглашенный, код)."""
+    return set(ReferralInvite.objects.values_list(
+        'referral_user_id',
+        'invited_user_id',
+        'referral_code__code',
+    ))
+
+
+def _stats():
+    """Статистика: (пригласивший, код) -> количество приглашений."""
+    return {
+        (stats.user_id, stats.referral_code and stats.referral_code.code): (
+            stats.invite_count
+        )
+        for stats in ReferralStats.objects.select_related('referral_code')
+    }
+
+
+@pytest.mark.django_db()
+def test_record_by_code(users):
+    """Приглашение по коду (в любом регистре) записывается со статистикой."""
+    referrer, invited = users
+
+    recorded = record_referral_invite(invited[0], referral_code=' abc12 ')
+
+    assert recorded.referral_user_id == referrer.id
+    assert recorded.invited_user_id == invited[0].id
+    assert recorded.referral_code_id == ReferralCode.objects.get().id
+    assert _invites() == {(referrer.id, invited[0].id, 'ABC12')}
+    assert _stats() == {(referrer.id, 'ABC12'): 1}
+
+
+@pytest.mark.django_db()
+def test_record_by_email(users):
+    """Приглашение по email из ссылки записывается без кода."""
+    referrer, invited = users
+
+    recorded = record_referral_invite(
+        invited[0],
+        referral_user_email='referrer@ex.com',
+    )
+
+    assert recorded.referral_code_id is None
+    assert _invites() == {(referrer.id, invited[0].id, None)}
+    assert _stats() == {(referrer.id, None): 1}
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize(('code', 'email'), [
+    ('MISSING', None),
+    ('not a code', None),
+    (None, 'unknown@ex.com'),
+    (None, None),
+    # При указанном коде email не используется.
+    ('MISSING', 'referrer@ex.com'),
+])
+def test_referrer_not_found(users, code, email):
+    """Неизвестный код или email - приглашение не записывается."""
+    _, invited = users
+
+    assert record_referral_invite(
+        invited[0],
+        referral_code=code,
+        referral_user_email=email,
+    ) is None
+    assert not ReferralInvite.objects.exists()
+    assert not ReferralStats.objects.exists()
+
+
+@pytest.mark.django_db()
+def test_self_invite(users):
+    """Приглашение самого себя не записывается."""
+    referrer, _ = users
+
+    assert record_referral_invite(referrer, referral_code='ABC12') is None
+    assert not ReferralInvite.objects.exists()
+
+
+@pytest.mark.django_db()
+def test_duplicate_invited_user(users, django_user_model):
+    """Повторное приглашение пользователя ничего не меняет."""
+    referrer, invited = users
+    other = django_user_model.objects.create(
+        username='other',
+        email='other@ex.com',
+    )
+    record_referral_invite(invited[0], referral_code='ABC12')
+
+    assert record_referral_invite(invited[0], referral_code='ABC12') is None
+    assert record_referral_invite(
+        invited[0],
+        referral_user_email='other@ex.com',
+    ) is None
+
+    assert _invites() == {(referrer.id, invited[0].id, 'ABC12')}
+    assert _stats() == {(referrer.id, 'ABC12'): 1}
+    assert not other.referral_stats.exists()
+
+
+@pytest.mark.django_db()
+def test_mixed_batch(users):
+    """Пачка с корректными и некорректными строками.
+
+    Записываются только приглашения с найденным пригласившим, повтор
+    пользователя в пачке учитывается один раз (первая строка).
+    """
+    referrer, invited = users
+    record_referral_invite(invited[3], referral_code='ABC12')
+    attributions = [
+        ReferralAttribution(invited[0].id, referral_code='ABC12'),
+        ReferralAttribution(invited[0].id, referral_user_email='x@ex.com'),
+        ReferralAttribution(invited[1].id, referral_code='MISSING'),
+        ReferralAttribution(
+            invited[2].id,
+            referral_user_email='referrer@ex.com',
+        ),
+        ReferralAttribution(invited[3].id, referral_code='ABC12'),
+        ReferralAttribution(referrer.id, referral_code='ABC12'),
+        ReferralAttribution(invited[1].id),
+    ]
+
+    recorded = record_referral_invites(attributions)
+
+    assert {invite.invited_user_id for invite in recorded} == {
+        invited[0].id,
+        invited[2].id,
+    }
+    assert _invites() == {
+        (referrer.id, invited[0].id, 'ABC12'),
+        (referrer.id, invited[2].id, None),
+        (referrer.id, invited[3].id, 'ABC12'),
+    }
+    assert _stats() == {(referrer.id, 'ABC12'): 2, (referrer.id, None): 1}
+
+
+@pytest.mark.django_db()
+def test_empty_batch():
+    """Пачка без кодов и email ничего не записывает."""
+    assert record_referral_invites([ReferralAttribution(1)]) == []
+    assert not ReferralInvite.objects.exists()
+
+
+@pytest.mark.django_db()
+def test_backfill_command(users, tmp_path, capsys):
+    """Импорт из CSV пачками, повторный импорт ничего не создает."""
+    referrer, invited = users
+    csv_path = tmp_path / 'invites.csv'
+    csv_path.write_text(
+        'invited_user_id,referral_code,referral_user_email\n' +
+        f'{invited[0].id},ABC12,\n' +
+        f'{invited[1].id},,referrer@ex.com\n' +
+        f'{invited[2].id},MISSING,\n' +
+        f'{invited[3].id},,unknown@ex.com\n' +
+        f'{referrer.id},ABC12,\n',
+    )
+
+    call_command('backfill_referral_invites', str(csv_path), batch_size=2)
+    assert 'Обработано: 5, создано приглашений: 2.' in capsys.readouterr().out
+    assert _invites() == {
+        (referrer.id, invited[0].id, 'ABC12'),
+        (referrer.id, invited[1].id, None),
+    }
+
+    call_command('backfill_referral_invites', str(csv_path))
+    assert 'Обработано: 5, создано приглашений: 0.' in capsys.readouterr().out
+    assert _stats() == {(referrer.id, 'ABC12'): 1, (referrer.id, None): 1}
+
+
+def test_backfill_command_batch_size():
+    """Размер пачки должен быть положительным."""
+    with pytest.raises(CommandError):
+        call_command('backfill_referral_invites', '-', batch_size=0)
@@ -0,0 +1,143 @@
+"""Генератор реферальных кодов: перестановка Фейстеля и отсутствие коллизий."""
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from nova_friend.models import ReferralCode
+from nova_friend.services import create_referral_code as service
+from nova_friend.services.referral_code_generator import (  # noqa: WPS450
+    CODE_LENGTH,
+    CROCKFORD_ALPHABET,
+    FEISTEL_ROUNDS,
+    HALF_BITS,
+    HALF_MASK,
+    MAX_SEQUENCE_VALUE,
+    _round_value,
+    feistel_permute,
+    random_codes_collision_rate,
+    referral_code_for,
+    referral_code_key,
+)
+
+CODES_COUNT = 20000
+KEY = referral_code_key('test')
+
+# Значения в начале, в середине и в конце диапазона последовательности.
+SEQUENCE_VALUES = (
+    *range(CODES_COUNT),
+    *range(MAX_SEQUENCE_VALUE // 2, MAX_SEQUENCE_VALUE // 2 + CODES_COUNT),
+    *range(MAX_SEQUENCE_VALUE - CODES_COUNT + 1, MAX_SEQUENCE_VALUE + 1),
+)
+
+
+def feistel_inverse(number, key):
+    """Обратная перестановка: feistel_inverse(feistel_permute(n)) == n."""
+    left, right = number >> HALF_BITS, number & HALF_MASK
+    for round_number in reversed(range(FEISTEL_ROUNDS)):
+        left, right = right ^ _round_value(key, round_number, left), left
+    return (left << HALF_BITS) | right
+
+
+def decode_code(code):
+    """Код алфавита Крокфорда в 40-битное число."""
+    base = len(CROCKFORD_ALPHABET)
+    number = 0
+    for char in code:
+        number = number * base + CROCKFORD_ALPHABET.index(char)
+    return number
+
+
+def test_feistel_round_trip():
+    """Обратная перестановка восстанавливает значение - перестановка биекция."""
+    permuted = [feistel_permute(number, KEY) for number in SEQUENCE_VALUES]
+
+    assert len(set(permuted)) == len(SEQUENCE_VALUES)
+    assert all(0 <= number <= MAX_SEQUENCE_VALUE for number in permuted)
+    assert [
+        feistel_inverse(number, KEY) for number in permuted
+    ] == list(SEQUENCE_VALUES)
+
+
+def test_key_changes_permutation():
+    """Перестановка зависит от ключа."""
+    other_key = referral_code_key('other')
+
+    assert [feistel_permute(number, KEY) for number in range(100)] != [
+        feistel_permute(number, other_key) for number in range(100)
+    ]
+
+
+def test_codes_alphabet_and_length():
+    """Коды - 8 символов алфавита Крокфорда, код обратим в значение."""
+    codes = [referral_code_for(number, KEY) for number in SEQUENCE_VALUES]
+
+    assert len(set(codes)) == len(codes)
+    assert {len(code) for code in codes} == {CODE_LENGTH}
+    assert set(''.join(codes)) <= set(CROCKFORD_ALPHABET)
+    assert not set(''.join(codes)) & set('ILOU')
+    assert [
+        feistel_inverse(decode_code(code), KEY) for code in codes
+    ] == list(SEQUENCE_VALUES)
+
+
+@pytest.mark.parametrize('sequence_value', [-1, MAX_SEQUENCE_VALUE + 1])
+def test_sequence_value_out_of_range(sequence_value):
+    """Значение вне 40 бит не превращается в код."""
+    with pytest.raises(ValueError, match='вне диапазона'):
+        referral_code_for(sequence_value, KEY)
+
+
+@pytest.mark.django_db()
+def test_bulk_create_skips_existing_codes(monkeypatch, django_user_model):
+    """Код, выданный ранее, заменяется следующим значением."""
+    user = django_user_model.objects.create(username='user')
+    values = iter(range(100))
+    monkeypatch.setattr(
+        service,
+        '_sequence_values',
+        lambda count: [next(values) for _ in range(count)],
+    )
+    key = referral_code_key()
+    ReferralCode.objects.create(user=user, code=referral_code_for(1, key))
+
+    referral_codes = service.bulk_create_referral_codes(user, 5)
+
+    assert [referral_code.code for referral_code in referral_codes] == [
+        referral_code_for(number, key) for number in (0, 2, 3, 4, 5)
+    ]
+    assert ReferralCode.objects.count() == 6
+
+
+@pytest.mark.django_db()
+def test_bulk_create_sequence(django_user_model):
+    """Коды из последовательности БД не повторяются."""
+    if connection.vendor != 'postgresql':
+        pytest.skip('Последовательность кодов есть только в PostgreSQL.')
+    user = django_user_model.objects.create(username='user')
+
+    first = service.bulk_create_referral_codes(user, 1000)
+    second = service.bulk_create_referral_codes(user, 1000)
+
+    codes = {referral_code.code for referral_code in (*first, *second)}
+    assert len(codes) == 2000
+    assert ReferralCode.objects.filter(code__in=codes).count() == 2000
+
+
+def test_benchmark_command():
+    """Команда выводит скорость генерации и коллизии обоих генераторов."""
+    stdout = StringIO()
+
+    call_command(
+        'benchmark_referral_codes',
+        codes=1000,
+        existing=[10 ** 6],
+        stdout=stdout,
+    )
+
+    output = stdout.getvalue()
+    assert 'collisions: 0' in output
+    assert 'codes_per_second:' in output
+    assert 'get_random_string, 1000000 кодов в БД' in output
+    assert random_codes_collision_rate(0) == 0
@@ -0,0 +1,148 @@
+"""Статистика приглашений по реферальным кодам."""
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from nova_friend.models import ReferralCode, ReferralInvite, ReferralStats
+from nova_friend.services.referral_stats import (
+    increment_referral_stats,
+    recompute_referral_stats,
+)
+
+
+@pytest.fixture()
+def referrers(django_user_model):
+    """Два пригласивших пользователя с кодами и приглашенные."""
+    users = [
+        django_user_model.objects.create(
+            username=f'user{index}',
+            email=f'user{index}@ex.com',
+        )
+        for index in range(7)
+    ]
+    codes = [
+        ReferralCode.objects.create(user=users[0], code='FIRST'),
+        ReferralCode.objects.create(user=users[0], code='SECOND'),
+        ReferralCode.objects.create(user=users[1], code='THIRD'),
+    ]
+    return users, codes
+
+
+def _stats():
+    """Статистика: (пригласивший, id кода) -> количество приглашений."""
+    return dict(
+        ((user_id, code_id), invite_count)
+        for user_id, code_id, invite_count in ReferralStats.objects.values_list(
+            'user_id',
+            'referral_code_id',
+            'invite_count',
+        )
+    )
+
+
+@pytest.mark.django_db()
+def test_increment(referrers):
+    """Недостающие записи создаются, повторы ключа суммируются."""
+    users, codes = referrers
+    invited_at = timezone.now()
+    first_key = (users[0].id, codes[0].id)
+    link_key = (users[0].id, None)
+
+    increment_referral_stats([first_key, first_key, link_key])
+    increment_referral_stats(
+        [first_key, (users[1].id, codes[2].id)],
+        invited_at=invited_at,
+    )
+    increment_referral_stats([])
+
+    assert _stats() == {
+        first_key: 3,
+        link_key: 1,
+        (users[1].id, codes[2].id): 1,
+    }
+    assert ReferralStats.objects.get(
+        referral_code=codes[0],
+    ).last_invite_at == invited_at
+
+
+@pytest.mark.django_db()
+def test_recompute(referrers):
+    """Пересчет исправляет, создает и удаляет записи пачками.
+
+    Существующие записи изменяются на месте.
+    """
+    users, codes = referrers
+    invited_at = timezone.now() - timedelta(days=1)
+    for invited, code in zip(users[2:], [codes[0], codes[0], None, codes[2]]):
+        ReferralInvite.objects.create(
+            referral_user=code.user if code else users[0],
+            invited_user=invited,
+            referral_code=code,
+        )
+    ReferralInvite.objects.filter(invited_user=users[2]).update(
+        created_at=invited_at,
+    )
+    # Неверный счетчик, запись без приглашений и пользователь без
+    # приглашений.
+    wrong = ReferralStats.objects.create(
+        user=users[0],
+        referral_code=codes[0],
+        invite_count=5,
+    )
+    ReferralStats.objects.create(user=users[0], referral_code=codes[1])
+    ReferralStats.objects.create(user=users[6], invite_count=1)
+
+    assert recompute_referral_stats(chunk_size=1) == 3
+
+    assert _stats() == {
+        (users[0].id, codes[0].id): 2,
+        (users[0].id, None): 1,
+        (users[1].id, codes[2].id): 1,
+    }
+    wrong.refresh_from_db()
+    assert wrong.invite_count == 2
+    assert wrong.last_invite_at == ReferralInvite.objects.get(
+        invited_user=users[3],
+    ).created_at
+
+
+@pytest.mark.django_db()
+def test_recompute_unchanged(referrers):
+    """Точная статистика не перезаписывается."""
+    users, codes = referrers
+    ReferralInvite.objects.create(
+        referral_user=users[0],
+        invited_user=users[2],
+        referral_code=codes[0],
+    )
+    recompute_referral_stats(chunk_size=10)
+    updated_at = ReferralStats.objects.get().updated_at
+
+    recompute_referral_stats(chunk_size=10)
+
+    assert ReferralStats.objects.get().updated_at == updated_at
+
+
+@pytest.mark.django_db()
+def test_recompute_command(referrers, capsys):
+    """Команда выводит количество записей статистики."""
+    users, codes = referrers
+    ReferralInvite.objects.create(
+        referral_user=users[1],
+        invited_user=users[2],
+        referral_code=codes[2],
+    )
+
+    call_command('recompute_referral_stats', chunk_size=1)
+
+    assert 'Записей статистики: 1.' in capsys.readouterr().out
+    assert _stats() == {(users[1].id, codes[2].id): 1}
+
+
+def test_recompute_command_chunk_size():
+    """Размер пачки должен быть положительным."""
+    with pytest.raises(CommandError):
+        call_command('recompute_referral_stats', chunk_size=0)
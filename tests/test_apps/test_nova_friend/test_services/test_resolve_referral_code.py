@@ -0,0 +1,125 @@
+"""Поиск реферального кода с кэшем и сброс кэша."""
+import pytest
+
+from nova_friend.models import ReferralCode
+from nova_friend.services.resolve_referral_code import (
+    ResolvedReferralCode,
+    normalize_referral_code,
+    resolve_referral_code,
+)
+
+
+@pytest.fixture()
+def owner(django_user_model):
+    """Владелец реферального кода."""
+    return django_user_model.objects.create(
+        username='owner',
+        email='owner@ex.com',
+    )
+
+
+@pytest.mark.parametrize(('code', 'normalized'), [
+    (' abc12 ', 'ABC12'),
+    ('ABCDEFGH', 'ABCDEFGH'),
+    ('ABCDEFGHI', None),
+    ('AB-12', None),
+    ('', None),
+])
+def test_normalize(code, normalized):
+    """Код приводится к верхнему регистру, невозможный код - None."""
+    assert normalize_referral_code(code) == normalized
+
+
+@pytest.mark.django_db()
+def test_resolve_cached(owner, django_assert_num_queries):
+    """Найденный код кэшируется, повторный поиск не обращается к БД."""
+    referral_code = ReferralCode.objects.create(user=owner, code='ABC12')
+    expected = ResolvedReferralCode(referral_code.id, owner.id)
+
+    with django_assert_num_queries(1):
+        assert resolve_referral_code('abc12') == expected
+    with django_assert_num_queries(0):
+        assert resolve_referral_code('ABC12') == expected
+
+
+@pytest.mark.django_db()
+def test_resolve_not_found_cached(django_assert_num_queries):
+    """Отсутствие кода кэшируется, невозможный код не ищется в БД."""
+    with django_assert_num_queries(1):
+        assert resolve_referral_code('MISSING') is None
+    with django_assert_num_queries(0):
+        assert resolve_referral_code('MISSING') is None
+        assert resolve_referral_code('not a code') is None
+
+
+@pytest.mark.django_db()
+def test_create_invalidates_not_found(owner):
+    """Созданный код сбрасывает кэш его отсутствия."""
+    assert resolve_referral_code('NEW1') is None
+
+    referral_code = ReferralCode.objects.create(user=owner, code='NEW1')
+
+    assert resolve_referral_code('NEW1') == ResolvedReferralCode(
+        referral_code.id,
+        owner.id,
+    )
+
+
+@pytest.mark.django_db()
+def test_change_invalidates_old_code(owner, django_assert_num_queries):
+    """Изменение кода сбрасывает кэш прежнего и нового кода.
+
+    Прежний код берется из загруженного экземпляра, сохранение не читает
+    его из БД.
+    """
+    ReferralCode.objects.create(user=owner, code='OLD1')
+    assert resolve_referral_code('OLD1') is not None
+    assert resolve_referral_code('NEW1') is None
+
+    referral_code = ReferralCode.objects.get(code='OLD1')
+    referral_code.code = 'NEW1'
+    with django_assert_num_queries(1):
+        referral_code.save(update_fields=['code'])
+
+    assert resolve_referral_code('OLD1') is None
+    assert resolve_referral_code('NEW1') == ResolvedReferralCode(
+        referral_code.id,
+        owner.id,
+    )
+
+
+@pytest.mark.django_db()
+def test_repeated_change_invalidates_previous_code(owner):
+    """После сохранения прежним считается уже сохраненный код."""
+    referral_code = ReferralCode.objects.create(user=owner, code='FIRST')
+    referral_code.code = 'SECOND'
+    referral_code.save()
+    assert resolve_referral_code('SECOND') is not None
+
+    referral_code.code = 'THIRD'
+    referral_code.save()
+
+    assert resolve_referral_code('SECOND') is None
+    assert resolve_referral_code('THIRD') is not None
+
+
+@pytest.mark.django_db()
+def test_deferred_code_not_loaded(owner, django_assert_num_queries):
+    """Загрузка без поля code не читает его для запоминания."""
+    ReferralCode.objects.create(user=owner, code='DEFER')
+
+    with django_assert_num_queries(1):
+        referral_code = ReferralCode.objects.only('id').get(user=owner)
+
+    assert 'code' not in referral_code.__dict__
+
+
+@pytest.mark.django_db()
+def test_delete_invalidates(owner):
+    """Удаленный код больше не находится."""
+    referral_code = ReferralCode.objects.create(user=owner, code='GONE')
+    assert resolve_referral_code('GONE') is not None
+
+    referral_code.delete()
+
+    assert resolve_referral_code('GONE') is None
@@ -0,0 +1,196 @@
+"""Отправка сигналов nova_friend."""
+import pytest
+from django.db import transaction
+from rest_framework.exceptions import NotFound
+
+from nova_friend import signals, tasks
+from nova_friend.services.receiver import Receiver
+from nova_friend.services.signal_dispatch import dispatch_signal
+
+
+@pytest.fixture()
+def queued(monkeypatch):
+    """Задачи send_signals, поставленные в очередь."""
+    calls = []
+    monkeypatch.setattr(
+        tasks.send_signals,
+        'delay',
+        lambda signal_name, payloads: calls.append((signal_name, payloads)),
+    )
+    return calls
+
+
+@pytest.fixture()
+def async_dispatch(settings):
+    """Отправка сигналов задачей Celery."""
+    settings.NOVA_FRIEND_SIGNAL_DISPATCH = 'async'
+    return settings
+
+
+def _action(friend_request_id):
+    """Отправка сигнала friend_request_action."""
+    dispatch_signal(
+        'friend_request_action',
+        sender='friend_request_action',
+        friend_request_id=friend_request_id,
+    )
+
+
+def _sent_ids(queued):
+    """Id запросов из поставленных задач по задачам."""
+    return [
+        [payload['kwargs']['friend_request_id'] for payload in payloads]
+        for _, payloads in queued
+    ]
+
+
+@pytest.mark.django_db()
+def test_sync(queued):
+    """По умолчанию сигнал отправляется сразу, без Celery."""
+    sent = []
+
+    def receiver(sender, friend_request_id, **kwargs):
+        sent.append(friend_request_id)
+
+    signals.friend_request_action.connect(receiver)
+    try:
+        _action(1)
+    finally:
+        signals.friend_request_action.disconnect(receiver)
+
+    assert sent == [1]
+    assert not queued
+
+
+@pytest.mark.django_db()
+def test_async_on_commit(
+    async_dispatch,
+    queued,
+    django_capture_on_commit_callbacks,
+):
+    """Задача ставится после фиксации, откат отбрасывает сигнал."""
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            _action(1)
+            assert not queued
+        with transaction.atomic():
+            _action(2)
+            transaction.set_rollback(True)
+
+    assert _sent_ids(queued) == [[1]]
+
+
+@pytest.mark.django_db()
+def test_async_invite_rollback(
+    async_dispatch,
+    queued,
+    django_user_model,
+    django_capture_on_commit_callbacks,
+):
+    """Приглашение не теряется при откате транзакции запроса."""
+    sender = django_user_model.objects.create(username='sender')
+    receiver = Receiver(
+        contact='new@ex.com',
+        sending_user=sender,
+        locale='ru',
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        # Так DRF завершает запрос с ошибкой при ATOMIC_REQUESTS.
+        with transaction.atomic():
+            with pytest.raises(NotFound):
+                receiver.receiving_user_by_contact()
+            transaction.set_rollback(True)
+
+    assert [signal_name for signal_name, _ in queued] == [
+        'inviting_new_user_by_email',
+    ]
+    assert queued[0][1][0]['kwargs']['new_user_email'] == 'new@ex.com'
+
+
+@pytest.fixture()
+def flushes(async_dispatch, monkeypatch):
+    """Задачи flush_signals, поставленные в очередь, при объединении."""
+    async_dispatch.NOVA_FRIEND_SIGNAL_COALESCE = True
+    # Окно не закончится во время теста.
+    async_dispatch.NOVA_FRIEND_SIGNAL_COALESCE_WINDOW = 60 * 60
+    calls = []
+    monkeypatch.setattr(
+        tasks.flush_signals,
+        'apply_async',
+        lambda args, countdown: calls.append((args, countdown)),
+    )
+    return calls
+
+
+@pytest.fixture()
+def received():
+    """Аргументы сигналов, полученных получателем, по имени сигнала."""
+    calls = []
+    connected = []
+
+    def connect(signal_name):
+        def receiver(sender, **kwargs):
+            calls.append(kwargs)
+        signal = getattr(signals, signal_name)
+        signal.connect(receiver)
+        connected.append((signal, receiver))
+        return calls
+
+    yield connect
+    for signal, receiver in connected:
+        signal.disconnect(receiver)
+
+
+@pytest.mark.django_db()
+def test_coalesce(
+    flushes,
+    queued,
+    received,
+    django_capture_on_commit_callbacks,
+):
+    """Сигналы окна - одной задачей, без откатанной точки сохранения."""
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            _action(1)
+            with transaction.atomic():
+                _action(2)
+                transaction.set_rollback(True)
+        _action(3)
+
+    assert not queued
+    assert len(flushes) == 1
+    (signal_name, window), countdown = flushes[0]
+    assert signal_name == 'friend_request_action'
+    assert 60 * 60 < countdown <= 2 * 60 * 60
+
+    sent = received(signal_name)
+    tasks.flush_signals(signal_name, window)
+
+    assert [kwargs['friend_request_id'] for kwargs in sent] == [1, 3]
+    # Окно удалено из кэша, следующий сигнал ставит новую задачу.
+    assert tasks.signal_dispatch.pop_coalesced(signal_name, window) == []
+
+
+@pytest.mark.django_db()
+def test_coalesce_invites(flushes, queued, received, django_user_model):
+    """Приглашения из разных запросов - одной задачей."""
+    sender = django_user_model.objects.create(username='sender')
+    for email in ('first@ex.com', 'second@ex.com'):
+        with pytest.raises(NotFound):
+            Receiver(
+                contact=email,
+                sending_user=sender,
+                locale='ru',
+            ).receiving_user_by_contact()
+
+    (signal_name, window), _ = flushes[0]
+    sent = received(signal_name)
+    tasks.flush_signals(signal_name, window)
+
+    assert not queued
+    assert len(flushes) == 1
+    assert [kwargs['new_user_email'] for kwargs in sent] == [
+        'first@ex.com',
+        'second@ex.com',
+    ]